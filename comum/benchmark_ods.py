@@ -0,0 +1,155 @@
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+import zipfile
+from datetime import date, timedelta
+from xml.sax.saxutils import escape
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from comum.leitor_ods import ler_ods
+
+
+# =========================
+# GERADOR DE ODS SINTÉTICO
+# =========================
+# Formato parecido com a exportação do sistema: funcional, data inicial,
+# quantidade de dias e descrição (+ colunas que não interessam).
+CABECALHO = ["FUNCIONÁRIO", "NOME", "DATA INICIAL", "QTDE DIAS", "DESCRIÇÃO", "OBSERVAÇÃO"]
+DESCRICOES = ["TRATAMENTO DE SAÚDE", "FALTA", "ABONO", "LICENÇA MÉDICA", "NOJO"]
+
+MANIFESTO = """<?xml version="1.0" encoding="UTF-8"?>
+<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0" manifest:version="1.2">
+ <manifest:file-entry manifest:full-path="/" manifest:media-type="application/vnd.oasis.opendocument.spreadsheet"/>
+ <manifest:file-entry manifest:full-path="content.xml" manifest:media-type="text/xml"/>
+</manifest:manifest>"""
+
+INICIO_CONTEUDO = """<?xml version="1.0" encoding="UTF-8"?>
+<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" office:version="1.2">
+<office:body><office:spreadsheet><table:table table:name="Planilha1">"""
+
+FIM_CONTEUDO = """<table:table-row table:number-rows-repeated="1048000"><table:table-cell table:number-columns-repeated="1024"/></table:table-row>
+</table:table></office:spreadsheet></office:body></office:document-content>"""
+
+
+def _celula(valor):
+    if valor is None:
+        return "<table:table-cell/>"
+
+    if isinstance(valor, date):
+        return (
+            f'<table:table-cell office:value-type="date" office:date-value="{valor.isoformat()}">'
+            f"<text:p>{valor:%d/%m/%Y}</text:p></table:table-cell>"
+        )
+
+    if isinstance(valor, (int, float)):
+        return (
+            f'<table:table-cell office:value-type="float" office:value="{valor}">'
+            f"<text:p>{valor}</text:p></table:table-cell>"
+        )
+
+    return f'<table:table-cell office:value-type="string"><text:p>{escape(str(valor))}</text:p></table:table-cell>'
+
+
+def escrever_ods(caminho, cabecalho, linhas):
+    """
+    Grava um ODS mínimo (uma planilha) direto em XML, sem odfpy.
+    """
+    partes = [INICIO_CONTEUDO]
+
+    for linha in [cabecalho, *linhas]:
+        partes.append("<table:table-row>")
+        partes.extend(_celula(v) for v in linha)
+        partes.append("</table:table-row>")
+
+    partes.append(FIM_CONTEUDO)
+
+    with zipfile.ZipFile(caminho, "w") as z:
+        z.writestr("mimetype", "application/vnd.oasis.opendocument.spreadsheet", zipfile.ZIP_STORED)
+        z.writestr("META-INF/manifest.xml", MANIFESTO, zipfile.ZIP_DEFLATED)
+        z.writestr("content.xml", "".join(partes), zipfile.ZIP_DEFLATED)
+
+
+def gerar_ods(caminho, linhas, semente=0):
+    rng = random.Random(semente)
+    inicio = date(2026, 4, 1)
+
+    dados = []
+    for i in range(linhas):
+        f = rng.randrange(1_000_000)
+        dados.append([
+            f"{f // 10000:02d}.{f // 10 % 1000:03d}-{f % 10}",
+            f"SERVIDOR {i}",
+            inicio + timedelta(days=rng.randrange(28)),
+            rng.randint(1, 15),
+            rng.choice(DESCRICOES),
+            "conferido" if i % 7 == 0 else None,
+        ])
+
+    escrever_ods(caminho, CABECALHO, dados)
+
+
+def medir(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    tempo = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return resultado, tempo, pico / 1024 / 1024
+
+
+def conferir_sem_linhas(caminho, colunas):
+    """
+    Planilha só com cabeçalho: as duas leituras devem devolver as mesmas
+    colunas, sem linhas.
+    """
+    escrever_ods(caminho, CABECALHO, [])
+    try:
+        df_odf = pd.read_excel(caminho, engine="odf", usecols=colunas)
+        df_novo = ler_ods(caminho, colunas=colunas)
+    finally:
+        os.remove(caminho)
+
+    return list(df_odf.columns) == list(df_novo.columns) and len(df_novo) == 0
+
+
+# =========================
+# EXECUÇÃO
+# =========================
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark leitor ODS em streaming x engine odf do pandas")
+    parser.add_argument("--linhas", type=int, default=50_000)
+    parser.add_argument("--arquivo", default="benchmark_sistema.ods")
+    args = parser.parse_args()
+
+    print(f"Gerando {args.arquivo} com {args.linhas:,} linhas...")
+    gerar_ods(args.arquivo, args.linhas)
+
+    colunas = ["FUNCIONÁRIO", "DATA INICIAL", "QTDE DIAS", "DESCRIÇÃO"]
+
+    print("Lendo com engine odf...")
+    df_odf, t_odf, m_odf = medir(lambda: pd.read_excel(args.arquivo, engine="odf", usecols=colunas))
+
+    print("Lendo em streaming...")
+    df_novo, t_novo, m_novo = medir(lambda: ler_ods(args.arquivo, colunas=colunas))
+
+    iguais = df_odf.astype(str).equals(df_novo.astype(str))
+    sem_linhas = conferir_sem_linhas(args.arquivo + ".vazio.ods", colunas)
+
+    print(f"{'leitor':<12}{'tempo (s)':>12}{'pico (MB)':>12}")
+    print(f"{'odf':<12}{t_odf:>12.2f}{m_odf:>12.1f}")
+    print(f"{'streaming':<12}{t_novo:>12.2f}{m_novo:>12.1f}")
+    print(f"ganho: {t_odf / t_novo:.1f}x  |  resultados iguais: {iguais}  |  só cabeçalho igual: {sem_linhas}")
+
+
+if __name__ == "__main__":
+    main()
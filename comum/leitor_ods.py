@@ -0,0 +1,216 @@
+import zipfile
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+
+
+# =========================
+# LEITOR ODS EM STREAMING
+# =========================
+# Lê o content.xml direto do zip com iterparse, uma linha por vez, sem
+# montar o DOM inteiro do odfpy (pd.read_excel(engine="odf")).
+NS_TABLE = "urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+NS_OFFICE = "urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+NS_TEXT = "urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+
+TABELA = f"{{{NS_TABLE}}}table"
+LINHA = f"{{{NS_TABLE}}}table-row"
+CELULA = f"{{{NS_TABLE}}}table-cell"
+CELULA_COBERTA = f"{{{NS_TABLE}}}covered-table-cell"
+NOME_TABELA = f"{{{NS_TABLE}}}name"
+REPETE_LINHAS = f"{{{NS_TABLE}}}number-rows-repeated"
+REPETE_COLUNAS = f"{{{NS_TABLE}}}number-columns-repeated"
+
+TIPO = f"{{{NS_OFFICE}}}value-type"
+VALOR = f"{{{NS_OFFICE}}}value"
+VALOR_DATA = f"{{{NS_OFFICE}}}date-value"
+VALOR_HORA = f"{{{NS_OFFICE}}}time-value"
+VALOR_BOOLEANO = f"{{{NS_OFFICE}}}boolean-value"
+
+PARAGRAFO = f"{{{NS_TEXT}}}p"
+ESPACO = f"{{{NS_TEXT}}}s"
+TAB = f"{{{NS_TEXT}}}tab"
+QUEBRA = f"{{{NS_TEXT}}}line-break"
+
+
+def _texto(elem):
+    partes = [elem.text or ""]
+
+    for filho in elem:
+        if filho.tag == ESPACO:
+            partes.append(" " * int(filho.get(f"{{{NS_TEXT}}}c", 1)))
+        elif filho.tag == TAB:
+            partes.append("\t")
+        elif filho.tag == QUEBRA:
+            partes.append("\n")
+        else:
+            partes.append(_texto(filho))
+        partes.append(filho.tail or "")
+
+    return "".join(partes)
+
+
+def _valor(celula):
+    tipo = celula.get(TIPO)
+
+    if tipo in ("float", "percentage", "currency"):
+        valor = float(celula.get(VALOR))
+        # mesmo comportamento do engine odf do pandas
+        return int(valor) if valor.is_integer() else valor
+
+    if tipo == "date":
+        return pd.Timestamp(celula.get(VALOR_DATA))
+
+    if tipo == "boolean":
+        return celula.get(VALOR_BOOLEANO) == "true"
+
+    if tipo == "time":
+        return celula.get(VALOR_HORA)
+
+    paragrafos = [_texto(p) for p in celula.iter(PARAGRAFO)]
+    if not paragrafos:
+        return None
+
+    return "\n".join(paragrafos)
+
+
+def _linha(elem, indices=None):
+    """
+    Valores da linha; com `indices` (set) só decodifica essas colunas.
+    """
+    valores = []
+    coluna = 0
+
+    for celula in elem:
+        if celula.tag not in (CELULA, CELULA_COBERTA):
+            continue
+
+        repete = int(celula.get(REPETE_COLUNAS, 1))
+
+        if indices is None or any(coluna <= i < coluna + repete for i in indices):
+            valor = _valor(celula)
+        else:
+            valor = None
+
+        valores.append((valor, repete))
+        coluna += repete
+
+    # células vazias no fim da linha (muitas vezes repetidas aos milhares)
+    # não viram colunas
+    while valores and valores[-1][0] is None:
+        valores.pop()
+
+    linha = []
+    for valor, repete in valores:
+        linha.extend([valor] * repete)
+
+    return linha
+
+
+def _linhas(caminho, planilha=None, opcoes=None):
+    """
+    Gera as linhas (listas de valores) da planilha escolhida, expandindo
+    table:number-rows-repeated e descartando linhas vazias do fim.
+    `opcoes["indices"]` pode ser definido depois do cabeçalho para
+    decodificar só as colunas pedidas.
+    """
+    if opcoes is None:
+        opcoes = {}
+
+    with zipfile.ZipFile(caminho) as z, z.open("content.xml") as xml:
+        pilha = []
+        na_tabela = False
+        tabela_lida = False
+        vazias = 0
+
+        for evento, elem in ET.iterparse(xml, events=("start", "end")):
+            if evento == "start":
+                if elem.tag == TABELA and not tabela_lida:
+                    na_tabela = planilha is None or elem.get(NOME_TABELA) == planilha
+                pilha.append(elem)
+                continue
+
+            pilha.pop()
+
+            if elem.tag == TABELA:
+                if na_tabela:
+                    tabela_lida = True
+                    na_tabela = False
+                    break
+                elem.clear()
+                continue
+
+            if elem.tag != LINHA or not na_tabela:
+                continue
+
+            linha = _linha(elem, opcoes.get("indices"))
+            repete = int(elem.get(REPETE_LINHAS, 1))
+
+            # libera a linha já lida
+            if pilha:
+                pilha[-1].remove(elem)
+
+            if not linha:
+                # só emite linhas vazias se vier dado depois
+                vazias += repete
+                continue
+
+            for _ in range(vazias):
+                yield []
+            vazias = 0
+
+            for _ in range(repete):
+                yield linha
+
+        if not tabela_lida:
+            raise ValueError(f"Planilha não encontrada em {caminho}: {planilha}")
+
+
+def ler_ods_lotes(caminho, colunas=None, planilha=None, tamanho_lote=10000):
+    """
+    Lê o ODS em DataFrames de até `tamanho_lote` linhas.
+
+    A primeira linha é o cabeçalho. `colunas` filtra pelo nome do
+    cabeçalho (comparado em maiúsculas, sem espaços nas pontas). Planilha
+    só com cabeçalho gera um lote vazio com as colunas.
+    """
+    opcoes = {}
+    linhas = _linhas(caminho, planilha, opcoes)
+
+    cabecalho = next(linhas, None)
+    if cabecalho is None:
+        return
+
+    cabecalho = ["" if c is None else str(c) for c in cabecalho]
+
+    if colunas is not None:
+        desejadas = {str(c).upper().strip() for c in colunas}
+        indices = [i for i, c in enumerate(cabecalho) if c.upper().strip() in desejadas]
+    else:
+        indices = list(range(len(cabecalho)))
+
+    nomes = [cabecalho[i] for i in indices]
+    opcoes["indices"] = set(indices)
+
+    lote = []
+    emitidos = 0
+    for linha in linhas:
+        lote.append([linha[i] if i < len(linha) else None for i in indices])
+
+        if len(lote) >= tamanho_lote:
+            yield pd.DataFrame(lote, columns=nomes)
+            emitidos += 1
+            lote = []
+
+    # só cabeçalho: devolve as colunas sem linhas, como o engine odf
+    if lote or not emitidos:
+        yield pd.DataFrame(lote, columns=nomes)
+
+
+def ler_ods(caminho, colunas=None, planilha=None):
+    lotes = list(ler_ods_lotes(caminho, colunas, planilha))
+
+    if not lotes:
+        return pd.DataFrame()
+
+    return pd.concat(lotes, ignore_index=True)
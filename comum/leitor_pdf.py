@@ -0,0 +1,413 @@
+import argparse
+import json
+from abc import ABC, abstractmethod
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+try:
+    import pdfplumber
+except ImportError:
+    pdfplumber = None
+
+try:
+    from pdfminer.layout import LTChar, LTContainer
+    from pdfminer.converter import PDFPageAggregator
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+except ImportError:
+    PDFPage = None
+
+try:
+    import pypdfium2
+except ImportError:
+    pypdfium2 = None
+
+try:
+    import PyPDF2
+except ImportError:
+    PyPDF2 = None
+
+
+# =========================
+# LEITURA DE PDF COM MOTORES TROCÁVEIS
+# =========================
+# Todos os motores devolvem páginas com o mesmo pedaço da API do
+# pdfplumber que os scripts usam: extract_text() e, menos o pypdf2,
+# extract_words().
+# `calibrar` mede os motores num arquivo de exemplo e grava, por tipo
+# de documento, o mais rápido cujas linhas batem com o pdfplumber.
+MOTORES = ["pdfplumber", "pdfminer", "pypdfium2", "pypdf2"]
+REFERENCIA = "pdfplumber"
+
+# motores com extract_words (posição das palavras); o pypdf2 só dá texto
+COM_PALAVRAS = {"pdfplumber", "pdfminer", "pypdfium2"}
+
+# tipos de documento lidos também por caixas de palavras (extrator_palavras);
+# o sistema (processar_pagina_sistema) só usa extract_text
+TIPOS_COM_PALAVRAS = {"secretaria"}
+
+ARQUIVO_CALIBRACAO = os.environ.get(
+    "PDF_CALIBRACAO", os.path.join(os.path.dirname(os.path.abspath(__file__)), "motores_pdf.json")
+)
+
+# mesmas tolerâncias padrão do pdfplumber
+TOLERANCIA_X = 3
+TOLERANCIA_Y = 3
+
+
+def disponiveis(palavras=False):
+    """
+    Motores instalados; com `palavras`, só os que têm extract_words.
+    """
+    instalados = {
+        "pdfplumber": pdfplumber is not None,
+        "pdfminer": PDFPage is not None,
+        "pypdfium2": pypdfium2 is not None,
+        "pypdf2": PyPDF2 is not None,
+    }
+    return [
+        motor for motor in MOTORES
+        if instalados[motor] and (not palavras or motor in COM_PALAVRAS)
+    ]
+
+
+def precisa_palavras(tipo):
+    return tipo in TIPOS_COM_PALAVRAS
+
+
+# =========================
+# CARACTERES -> PALAVRAS -> LINHAS
+# =========================
+def agrupar_caracteres(caracteres):
+    """
+    caracteres: (texto, x0, x1, top, bottom). Junta em palavras como o
+    extract_words do pdfplumber (quebra em espaço ou distância maior que
+    TOLERANCIA_X) e devolve a lista de linhas, cada uma com as palavras
+    da esquerda para a direita.
+    """
+    linhas = []
+
+    for c in sorted(caracteres, key=lambda c: c[3]):
+        if linhas and c[3] - linhas[-1][0] <= TOLERANCIA_Y:
+            linhas[-1][1].append(c)
+        else:
+            linhas.append((c[3], [c]))
+
+    resultado = []
+    for _, chars in linhas:
+        palavras = []
+        atual = None
+
+        for texto, x0, x1, top, bottom in sorted(chars, key=lambda c: c[1]):
+            if texto.isspace():
+                atual = None
+                continue
+
+            if atual is not None and x0 - atual["x1"] <= TOLERANCIA_X:
+                atual["text"] += texto
+                atual["x1"] = x1
+                atual["bottom"] = max(atual["bottom"], bottom)
+            else:
+                atual = {"text": texto, "x0": x0, "x1": x1, "top": top, "bottom": bottom}
+                palavras.append(atual)
+
+        if palavras:
+            resultado.append(palavras)
+
+    return resultado
+
+
+def _texto_linhas(linhas):
+    return "\n".join(" ".join(p["text"] for p in palavras) for palavras in linhas)
+
+
+# =========================
+# MOTORES
+# =========================
+class _PaginaCaracteres(ABC):
+    """
+    Página que só sabe listar os caracteres; texto e palavras saem de
+    agrupar_caracteres.
+    """
+
+    @abstractmethod
+    def caracteres(self):
+        """(texto, x0, x1, top, bottom) de cada caractere da página."""
+
+    def extract_words(self):
+        return [p for palavras in agrupar_caracteres(self.caracteres()) for p in palavras]
+
+    def extract_text(self):
+        return _texto_linhas(agrupar_caracteres(self.caracteres()))
+
+
+class _PaginaPdfminer(_PaginaCaracteres):
+    # pdfminer sem análise de layout (laparams=None): só os LTChar
+    def __init__(self, pagina, recursos):
+        self.pagina = pagina
+        self.recursos = recursos
+
+    def caracteres(self):
+        dispositivo = PDFPageAggregator(self.recursos, laparams=None)
+        PDFPageInterpreter(self.recursos, dispositivo).process_page(self.pagina)
+        layout = dispositivo.get_result()
+
+        altura = layout.y1
+        caracteres = []
+        pilha = [layout]
+        while pilha:
+            for objeto in pilha.pop():
+                if isinstance(objeto, LTChar):
+                    caracteres.append((objeto.get_text(), objeto.x0, objeto.x1, altura - objeto.y1, altura - objeto.y0))
+                elif isinstance(objeto, LTContainer):
+                    pilha.append(objeto)
+
+        return caracteres
+
+
+class _PaginaPdfium(_PaginaCaracteres):
+    def __init__(self, pagina):
+        self.pagina = pagina
+
+    def extract_text(self):
+        # texto direto do pdfium (C), bem mais rápido que montar pelos caracteres
+        textpage = self.pagina.get_textpage()
+        try:
+            return textpage.get_text_range().replace("\r\n", "\n")
+        finally:
+            textpage.close()
+
+    def caracteres(self):
+        textpage = self.pagina.get_textpage()
+        altura = self.pagina.get_height()
+
+        try:
+            caracteres = []
+            for i in range(textpage.count_chars()):
+                esquerda, baixo, direita, cima = textpage.get_charbox(i, loose=True)
+                caracteres.append((textpage.get_text_range(i, 1), esquerda, direita, altura - cima, altura - baixo))
+            return caracteres
+        finally:
+            textpage.close()
+
+
+class _PaginaPyPDF2:
+    def __init__(self, pagina):
+        self.pagina = pagina
+
+    def extract_text(self):
+        return self.pagina.extract_text()
+
+
+@contextmanager
+def _abrir_pdfminer(caminho):
+    with open(caminho, "rb") as f:
+        recursos = PDFResourceManager(caching=True)
+        yield [_PaginaPdfminer(pagina, recursos) for pagina in PDFPage.get_pages(f)]
+
+
+class _PaginasPdfium:
+    # carrega cada página só quando pedida (quem para na primeira não paga o resto)
+    def __init__(self, documento):
+        self.documento = documento
+
+    def __len__(self):
+        return len(self.documento)
+
+    def __getitem__(self, i):
+        return _PaginaPdfium(self.documento[i])
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+@contextmanager
+def _abrir_pdfium(caminho):
+    documento = pypdfium2.PdfDocument(caminho)
+    try:
+        yield _PaginasPdfium(documento)
+    finally:
+        documento.close()
+
+
+@contextmanager
+def _abrir_pypdf2(caminho):
+    with open(caminho, "rb") as f:
+        yield [_PaginaPyPDF2(pagina) for pagina in PyPDF2.PdfReader(f).pages]
+
+
+@contextmanager
+def abrir(caminho, motor=REFERENCIA, palavras=False):
+    """
+    Abre o PDF com o `motor` e devolve as páginas (cada uma com
+    extract_text() e, nos COM_PALAVRAS, extract_words()). Com `palavras`,
+    recusa logo um motor sem extract_words.
+    """
+    if palavras and motor in MOTORES and motor not in COM_PALAVRAS:
+        raise ValueError(f"motor de PDF sem extract_words: {motor!r} (ver COM_PALAVRAS)")
+
+    if motor == "pdfplumber":
+        with pdfplumber.open(caminho) as pdf:
+            yield pdf.pages
+    elif motor == "pdfminer":
+        with _abrir_pdfminer(caminho) as paginas:
+            yield paginas
+    elif motor == "pypdfium2":
+        with _abrir_pdfium(caminho) as paginas:
+            yield paginas
+    elif motor == "pypdf2":
+        with _abrir_pypdf2(caminho) as paginas:
+            yield paginas
+    else:
+        raise ValueError(f"motor de PDF desconhecido: {motor!r}")
+
+
+def texto_paginas(caminho, motor=REFERENCIA):
+    with abrir(caminho, motor) as paginas:
+        return [pagina.extract_text() or "" for pagina in paginas]
+
+
+def palavras_paginas(caminho, motor=REFERENCIA):
+    with abrir(caminho, motor, palavras=True) as paginas:
+        return [pagina.extract_words() for pagina in paginas]
+
+
+# =========================
+# CALIBRAÇÃO
+# =========================
+def carregar_calibracao(arquivo=ARQUIVO_CALIBRACAO):
+    if not os.path.exists(arquivo):
+        return {}
+
+    with open(arquivo, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def motor_para(tipo, padrao=REFERENCIA, arquivo=ARQUIVO_CALIBRACAO, palavras=None):
+    """
+    Motor escolhido na calibração para o tipo de documento (ou `padrao`
+    se o tipo não foi calibrado, o motor não está instalado ou não tem
+    extract_words e o tipo precisa; `palavras=None` decide pelo tipo).
+    """
+    if palavras is None:
+        palavras = precisa_palavras(tipo)
+
+    motor = carregar_calibracao(arquivo).get(tipo, {}).get("motor", padrao)
+    return motor if motor in disponiveis(palavras) else padrao
+
+
+def linhas_normalizadas(textos):
+    # por página, as linhas sem espaços repetidos e fora de ordem: o que
+    # os scripts usam é o conteúdo de cada linha, não a posição dela
+    return [
+        sorted(" ".join(linha.split()) for linha in texto.split("\n") if linha.strip())
+        for texto in textos
+    ]
+
+
+def palavras_equivalentes(paginas, referencia):
+    """
+    Mesmas palavras por página, com x0 e top dentro das tolerâncias
+    (cada motor mede as caixas dos caracteres de um jeito).
+    """
+    if len(paginas) != len(referencia):
+        return False
+
+    for palavras, esperadas in zip(paginas, referencia):
+        if len(palavras) != len(esperadas):
+            return False
+
+        ordem = lambda p: (p["text"], round(p["top"]), p["x0"])
+        for p, e in zip(sorted(palavras, key=ordem), sorted(esperadas, key=ordem)):
+            if (
+                p["text"] != e["text"]
+                or abs(p["x0"] - e["x0"]) > TOLERANCIA_X
+                or abs(p["top"] - e["top"]) > TOLERANCIA_Y
+            ):
+                return False
+
+    return True
+
+
+def calibrar(caminho, tipo, repeticoes=3, arquivo=ARQUIVO_CALIBRACAO, log=print, palavras=None):
+    """
+    Mede cada motor instalado no `caminho` e grava para `tipo` o mais
+    rápido com as mesmas linhas do pdfplumber. Tipos que precisam de
+    extract_words (ver precisa_palavras) só consideram COM_PALAVRAS, e as
+    palavras também têm de bater com as do pdfplumber.
+    """
+    if palavras is None:
+        palavras = precisa_palavras(tipo)
+
+    referencia = None
+    referencia_palavras = None
+    medicoes = {}
+
+    for motor in disponiveis(palavras):
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            textos = texto_paginas(caminho, motor)
+            caixas = palavras_paginas(caminho, motor) if palavras else None
+            tempos.append(time.perf_counter() - inicio)
+
+        linhas = linhas_normalizadas(textos)
+        if motor == REFERENCIA:
+            referencia = linhas
+            referencia_palavras = caixas
+
+        equivalente = referencia is None or linhas == referencia
+        if palavras and referencia_palavras is not None:
+            equivalente = equivalente and palavras_equivalentes(caixas, referencia_palavras)
+
+        medicoes[motor] = {
+            "segundos": round(min(tempos), 4),
+            "equivalente": equivalente,
+        }
+
+    equivalentes = {m: v for m, v in medicoes.items() if v["equivalente"]}
+    escolhido = min(equivalentes, key=lambda m: equivalentes[m]["segundos"])
+
+    for motor, medicao in medicoes.items():
+        marca = "→" if motor == escolhido else " "
+        situacao = "ok" if medicao["equivalente"] else "saída diferente"
+        log(f"{marca} {motor:12} {medicao['segundos']:8.3f}s  {situacao}")
+
+    calibracao = carregar_calibracao(arquivo)
+    calibracao[tipo] = {
+        "motor": escolhido,
+        "palavras": escolhido in COM_PALAVRAS,
+        "arquivo": os.path.basename(caminho),
+        "medicoes": medicoes,
+    }
+
+    with open(arquivo, "w", encoding="utf-8") as f:
+        json.dump(calibracao, f, ensure_ascii=False, indent=2)
+
+    log(f"\n{tipo}: {escolhido} (gravado em {arquivo})")
+    return escolhido
+
+
+# =========================
+# EXECUÇÃO
+# =========================
+def main():
+    parser = argparse.ArgumentParser(description="Escolhe o motor de leitura de PDF mais rápido por tipo de documento")
+    parser.add_argument("arquivo", help="PDF de exemplo")
+    parser.add_argument("--tipo", required=True, help='ex.: "sistema" (frequência), "email" (unimed)')
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument(
+        "--palavras", action="store_true",
+        help="só motores com extract_words (já vale para: " + ", ".join(sorted(TIPOS_COM_PALAVRAS)) + ")"
+    )
+    args = parser.parse_args()
+
+    calibrar(args.arquivo, args.tipo, args.repeticoes, palavras=args.palavras or None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from comum.leitor_ods import ler_ods
+from esquema import expandir
+from ocorrencias import classificar_serie
+
+
+# =========================
+# AVISO "FAVOR RETIFICAR AS SEGUINTES FREQUÊNCIAS"
+# =========================
+# Monta o texto do aviso a partir das divergências, no formato usado à mão:
+#   funcional - NOME - data - N dias - atual --> correto
+# "atual" é o que está no sistema e "correto" o que veio da secretaria.
+TITULO = "Favor retificar as seguintes frequências:"
+
+SEM_REGISTRO = "Sem registro"
+SEM_REGISTRO_SISTEMA = "sem registro em sistema"
+
+
+def _coalescer(df, coluna):
+    # merge do v2 devolve funcional_sec / funcional_sis
+    if coluna in df:
+        return df[coluna]
+    return df[f"{coluna}_sec"].fillna(df[f"{coluna}_sis"])
+
+
+def padronizar_divergencias(df):
+    """
+    Aceita as divergências do v2 (merge, calendário e intervalos) e as de
+    divergencias_por_dia e devolve funcional, data, atual, correto
+    (+ secretaria).
+    """
+    saida = pd.DataFrame({
+        "funcional": _coalescer(df, "funcional").astype(object),
+        "data": _coalescer(df, "data").astype(object),
+    }, index=df.index)
+
+    correto = df["ocorrencia_sec"] if "ocorrencia_sec" in df else df["ocorrencia"]
+    saida["atual"] = df["ocorrencia_sis"].to_numpy()
+    saida["correto"] = correto.to_numpy()
+
+    # ocorrência vazia (calendário) = sem registro daquele lado
+    for coluna in ["atual", "correto"]:
+        vazia = saida[coluna].fillna("").astype(str).str.strip() == ""
+        saida[coluna] = saida[coluna].where(~vazia, None)
+
+    if "secretaria" in df:
+        saida.insert(0, "secretaria", df["secretaria"])
+
+    return saida
+
+
+def chave_funcional(funcionais):
+    # "20.356-4" e "203564" são o mesmo servidor
+    return funcionais.astype(str).str.replace(r"\D", "", regex=True)
+
+
+def _dias_classificados(df):
+    """
+    Uma linha por funcional e dia com a categoria da ocorrência
+    (classificar_ocorrencia). Períodos do sistema (data_fim) viram um
+    dia por linha; duas categorias no mesmo dia ficam juntas.
+    """
+    df = expandir(df).reset_index(drop=True)
+
+    inicio = pd.to_datetime(df["data"].astype(str), format="%d/%m/%Y", errors="coerce")
+    fim = inicio
+    if "data_fim" in df:
+        fim = pd.to_datetime(df["data_fim"].astype(str), format="%d/%m/%Y", errors="coerce")
+        fim = fim.where(fim >= inicio, inicio)
+
+    dias = pd.DataFrame({
+        "funcional": chave_funcional(df["funcional"]),
+        "inicio": inicio,
+        "ocorrencia": classificar_serie(df["ocorrencia"]),
+        "dias": (fim - inicio).dt.days + 1,
+    }).dropna(subset=["inicio"])
+
+    dias = dias.loc[dias.index.repeat(dias["dias"].astype(int))]
+    dias["dia"] = dias["inicio"] + pd.to_timedelta(dias.groupby(level=0).cumcount(), unit="D")
+
+    return (
+        dias.drop_duplicates(subset=["funcional", "dia", "ocorrencia"])
+        .sort_values("ocorrencia")
+        .groupby(["funcional", "dia"], as_index=False)["ocorrencia"]
+        .agg(" / ".join)
+    )
+
+
+def divergencias_por_dia(df_sec, df_sis):
+    """
+    Divergências para o aviso a partir das linhas extraídas (sem
+    deduplicar): secretaria e sistema casados por funcional + data,
+    comparando a categoria da ocorrência. Devolve funcional, data,
+    ocorrencia_sec, ocorrencia_sis (None = sem registro daquele lado).
+    """
+    merge = pd.merge(
+        _dias_classificados(df_sec),
+        _dias_classificados(df_sis),
+        on=["funcional", "dia"],
+        how="outer",
+        suffixes=("_sec", "_sis"),
+    )
+
+    merge = merge[merge["ocorrencia_sec"].fillna("") != merge["ocorrencia_sis"].fillna("")]
+
+    return pd.DataFrame({
+        "funcional": merge["funcional"].to_numpy(),
+        "data": merge["dia"].dt.strftime("%d/%m/%Y").to_numpy(),
+        "ocorrencia_sec": merge["ocorrencia_sec"].astype(object).to_numpy(),
+        "ocorrencia_sis": merge["ocorrencia_sis"].astype(object).to_numpy(),
+    })
+
+
+def carregar_nomes(caminho, coluna_funcional=None, coluna_nome=None):
+    """
+    Tabela funcional -> nome (ODS do sistema, xlsx ou csv). Sem colunas
+    informadas, usa a primeira com "FUNCION" e a primeira com "NOME".
+    """
+    if caminho.lower().endswith(".ods"):
+        df = ler_ods(caminho)
+    elif caminho.lower().endswith((".xlsx", ".xls")):
+        df = pd.read_excel(caminho)
+    else:
+        df = pd.read_csv(caminho, dtype=str, sep=None, engine="python")
+
+    colunas = {str(c).upper(): c for c in df.columns}
+    coluna_funcional = coluna_funcional or next((c for u, c in colunas.items() if "FUNCION" in u), None)
+    coluna_nome = coluna_nome or next((c for u, c in colunas.items() if "NOME" in u), None)
+
+    if coluna_funcional is None or coluna_nome is None:
+        raise ValueError(f"{caminho}: não achei as colunas de funcional e nome ({list(df.columns)})")
+
+    df = df[[coluna_funcional, coluna_nome]].dropna()
+
+    nomes = pd.Series(
+        df[coluna_nome].astype(str).str.strip().to_numpy(),
+        index=chave_funcional(df[coluna_funcional]).to_numpy(),
+        name="nome",
+    )
+
+    return nomes[~nomes.index.duplicated()]
+
+
+def agrupar_periodos(df):
+    """
+    Junta datas consecutivas com o mesmo funcional/atual/correto em um
+    período (data inicial + quantidade de dias).
+    """
+    grupo = [c for c in ["secretaria", "funcional", "atual", "correto"] if c in df]
+
+    df = df.copy()
+    df["dia"] = pd.to_datetime(df["data"], format="%d/%m/%Y", errors="coerce")
+    df = df.dropna(subset=["dia"])
+
+    chaves = df[grupo].fillna("").astype(str)
+    df = df.assign(**{f"_{c}": chaves[c] for c in grupo}).sort_values([f"_{c}" for c in grupo] + ["dia"])
+
+    # começa período novo quando muda o grupo ou a data pula um dia
+    mudou_grupo = (df[[f"_{c}" for c in grupo]] != df[[f"_{c}" for c in grupo]].shift()).any(axis=1)
+    pulou_dia = df["dia"].diff() != pd.Timedelta(days=1)
+    df["periodo"] = (mudou_grupo | pulou_dia).cumsum()
+
+    periodos = df.groupby("periodo", sort=False).agg(
+        **{c: (c, "first") for c in grupo},
+        dia=("dia", "first"),
+        dias=("dia", "size"),
+    )
+
+    return periodos.reset_index(drop=True)
+
+
+def montar_linhas(periodos, nomes=None):
+    """
+    Uma linha de texto por período. A primeira linha de cada funcional
+    leva "funcional - NOME - "; as seguintes ficam alinhadas embaixo.
+    """
+    periodos = periodos.copy()
+    periodos["chave_funcional"] = chave_funcional(periodos["funcional"])
+
+    # `nomes`: Series ou dict chave_funcional -> nome (ver carregar_nomes)
+    periodos["nome"] = periodos["chave_funcional"].map(nomes) if nomes is not None else None
+
+    ordem = ["secretaria"] if "secretaria" in periodos else []
+    periodos = periodos.sort_values(ordem + ["chave_funcional", "dia"], kind="stable").reset_index(drop=True)
+
+    cabecalho = periodos["chave_funcional"] + " - "
+    cabecalho = cabecalho.where(periodos["nome"].isna(), cabecalho + periodos["nome"].fillna("") + " - ")
+
+    dias = periodos["dias"].astype(str) + np.where(periodos["dias"] == 1, " dia", " dias")
+
+    atual = periodos["atual"].fillna(SEM_REGISTRO).astype(str).str.strip().str.title()
+    correto = periodos["correto"].fillna(SEM_REGISTRO_SISTEMA).astype(str).str.strip()
+    correto = correto.where(periodos["correto"].isna(), correto.str.title())
+
+    corpo = periodos["dia"].dt.strftime("%d/%m/%Y") + " - " + dias + " - " + atual + " --> " + correto
+
+    primeira = ~periodos[ordem + ["chave_funcional"]].duplicated()
+    recuo = pd.Series(" ", index=periodos.index).str.repeat(cabecalho.str.len())
+
+    periodos["primeira"] = primeira
+    periodos["linha"] = cabecalho.where(primeira, recuo) + corpo
+
+    return periodos
+
+
+def _juntar(linhas):
+    # linha em branco entre funcionais
+    separador = pd.Series(np.where(linhas["primeira"], "\n\n", "\n"), index=linhas.index)
+    texto = (separador + linhas["linha"]).str.cat()
+    return TITULO + "\n" + texto.lstrip("\n")
+
+
+def montar_aviso(df_divergencias, nomes=None):
+    """
+    Texto do aviso de uma secretaria.
+    """
+    periodos = agrupar_periodos(padronizar_divergencias(df_divergencias))
+    if periodos.empty:
+        return ""
+
+    return _juntar(montar_linhas(periodos, nomes))
+
+
+def montar_avisos(df_divergencias, nomes=None):
+    """
+    Todos os avisos de um lote de uma vez: {secretaria: texto}.
+    `df_divergencias` precisa da coluna "secretaria".
+    """
+    periodos = agrupar_periodos(padronizar_divergencias(df_divergencias))
+    if periodos.empty:
+        return {}
+
+    linhas = montar_linhas(periodos, nomes)
+
+    return {
+        secretaria: _juntar(grupo)
+        for secretaria, grupo in linhas.groupby("secretaria", sort=False)
+    }
+
+
+def salvar_aviso(texto, caminho):
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(texto + "\n")
@@ -0,0 +1,108 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import frequencia_v2
+import frequencia_v5
+
+
+# =========================
+# VERSÕES ANTIGAS (linha a linha)
+# =========================
+def comparar_v2_apply(df_sec, df_sis):
+    merge = pd.merge(
+        df_sec, df_sis, on="chave", how="outer",
+        suffixes=("_sec", "_sis"), indicator=True
+    )
+
+    def classificar(row):
+        if row["_merge"] == "left_only":
+            return "SÓ_SECRETARIA"
+        elif row["_merge"] == "right_only":
+            return "SÓ_SISTEMA"
+        else:
+            if row["ocorrencia_sec"] != row["ocorrencia_sis"]:
+                return "DIVERGENCIA_OCORRENCIA"
+            return "OK"
+
+    merge["status"] = merge.apply(classificar, axis=1)
+    return merge
+
+
+def comparar_v5_apply(df_sec, df_sis):
+    iguais = set(df_sec["chave"]) & set(df_sis["chave"])
+
+    df_sec["status"] = df_sec["chave"].apply(lambda x: "OK" if x in iguais else "SÓ_SECRETARIA")
+    df_sis["status"] = df_sis["chave"].apply(lambda x: "OK" if x in iguais else "SÓ_SISTEMA")
+    return df_sec, df_sis
+
+
+# =========================
+# DADOS SINTÉTICOS
+# =========================
+OCORRENCIAS = ["TRATAMENTO DE SAÚDE", "FALTA", "ABONO", "LICENÇA MÉDICA", "NOJO"]
+
+
+def gerar(linhas, divergencia=0.05, semente=0):
+    rng = np.random.default_rng(semente)
+
+    funcional = rng.integers(0, 1_000_000, linhas)
+    dia = rng.integers(1, 29, linhas)
+    ocorrencia = rng.integers(0, len(OCORRENCIAS), linhas)
+
+    def montar(func, dias, ocorr, origem):
+        df = pd.DataFrame({
+            "funcional": [f"{f // 10000:02d}.{f // 10 % 1000:03d}-{f % 10}" for f in func],
+            "data": [f"{d:02d}/04/2026" for d in dias],
+            "ocorrencia": np.array(OCORRENCIAS)[ocorr],
+            "origem": origem,
+        })
+        df["chave"] = df["funcional"] + "_" + df["data"]
+        return df.drop_duplicates(subset=["chave"])
+
+    df_sec = montar(funcional, dia, ocorrencia, "secretaria")
+
+    # sistema = secretaria com uma fração de linhas trocadas/removidas
+    alterar = rng.random(linhas) < divergencia
+    ocorrencia_sis = np.where(alterar, (ocorrencia + 1) % len(OCORRENCIAS), ocorrencia)
+    manter = rng.random(linhas) >= divergencia / 2
+    df_sis = montar(funcional[manter], dia[manter], ocorrencia_sis[manter], "sistema")
+
+    return df_sec, df_sis
+
+
+def medir(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return time.perf_counter() - inicio, resultado
+
+
+# =========================
+# EXECUÇÃO
+# =========================
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de comparar() apply x vetorizado")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'versão':<8}{'linhas':>12}{'apply (s)':>12}{'vetor (s)':>12}{'ganho':>9}")
+
+    for linhas in args.linhas:
+        df_sec, df_sis = gerar(linhas)
+
+        t_antigo, antigo = medir(comparar_v2_apply, df_sec.copy(), df_sis.copy())
+        t_novo, novo = medir(frequencia_v2.comparar, df_sec.copy(), df_sis.copy())
+        assert antigo["status"].tolist() == novo["status"].tolist()
+        print(f"{'v2':<8}{linhas:>12,}{t_antigo:>12.3f}{t_novo:>12.3f}{t_antigo / t_novo:>8.1f}x")
+
+        t_antigo, (a_sec, a_sis) = medir(comparar_v5_apply, df_sec.copy(), df_sis.copy())
+        t_novo, (n_sec, n_sis) = medir(frequencia_v5.comparar, df_sec.copy(), df_sis.copy())
+        assert a_sec["status"].tolist() == n_sec["status"].tolist()
+        assert a_sis["status"].tolist() == n_sis["status"].tolist()
+        print(f"{'v5':<8}{linhas:>12,}{t_antigo:>12.3f}{t_novo:>12.3f}{t_antigo / t_novo:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
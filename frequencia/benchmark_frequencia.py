@@ -0,0 +1,194 @@
+import argparse
+import json
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import frequencia_v1
+import frequencia_v2
+import frequencia_v5
+from esquema import expandir, memoria_mb
+from gerar_sinteticos import gerar_conjunto
+from paralelo import contar_paginas
+
+
+# =========================
+# BENCHMARK PONTA A PONTA
+# =========================
+# Gera arquivos sintéticos e mede extração, normalização e comparação
+# das versões v1/v2/v5, em páginas/s e linhas/s.
+MINIMO_SEGUNDOS = 0.05
+
+
+def medir(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def registrar(resultados, tamanho, versao, etapa, segundos, linhas, paginas=None):
+    resultados.append({
+        "chave": f"{versao}:{etapa}:{tamanho}",
+        "funcionarios": tamanho,
+        "versao": versao,
+        "etapa": etapa,
+        "segundos": round(segundos, 4),
+        "linhas": linhas,
+        "paginas": paginas,
+        "linhas_s": round(linhas / segundos, 1) if segundos else None,
+        "paginas_s": round(paginas / segundos, 2) if paginas and segundos else None,
+    })
+
+
+def rodar(tamanho, divergencia, layout, workers, pasta):
+    caminhos = gerar_conjunto(pasta, str(tamanho), tamanho, divergencia, layout)
+    pag_sec = contar_paginas(caminhos["secretaria"])
+    pag_sis = contar_paginas(caminhos["sistema_pdf"])
+
+    resultados = []
+
+    # v1: secretaria PDF + sistema ODS, chave funcional + ocorrência
+    df_sec, t = medir(frequencia_v1.extrair_secretaria, caminhos["secretaria"])
+    registrar(resultados, tamanho, "v1", "extrair_secretaria", t, len(df_sec), pag_sec)
+    df_sis, t = medir(frequencia_v1.extrair_sistema_ods, caminhos["sistema_ods"])
+    registrar(resultados, tamanho, "v1", "extrair_sistema_ods", t, len(df_sis))
+    (df_sec, df_sis), t = medir(lambda: (frequencia_v1.normalizar(df_sec), frequencia_v1.normalizar(df_sis)))
+    registrar(resultados, tamanho, "v1", "normalizar", t, len(df_sec) + len(df_sis))
+    _, t = medir(frequencia_v1.comparar, df_sec, df_sis)
+    registrar(resultados, tamanho, "v1", "comparar", t, len(df_sec) + len(df_sis))
+
+    # v2: secretaria PDF + sistema ODS, merge por funcional + data
+    df_sec, t = medir(frequencia_v2.extrair_secretaria, caminhos["secretaria"], workers)
+    registrar(resultados, tamanho, "v2", "extrair_secretaria", t, len(df_sec), pag_sec)
+    df_sis, t = medir(frequencia_v2.extrair_sistema_ods, caminhos["sistema_ods"])
+    registrar(resultados, tamanho, "v2", "extrair_sistema_ods", t, len(df_sis))
+    (df_sec, df_sis), t = medir(lambda: (frequencia_v2.normalizar(df_sec), frequencia_v2.normalizar(df_sis)))
+    registrar(resultados, tamanho, "v2", "normalizar", t, len(df_sec) + len(df_sis))
+    merge, t = medir(frequencia_v2.comparar, df_sec, df_sis)
+    registrar(resultados, tamanho, "v2", "comparar", t, len(merge))
+
+    # v5: secretaria PDF + sistema PDF
+    df_sec, t = medir(frequencia_v5.extrair_secretaria, caminhos["secretaria"], workers)
+    registrar(resultados, tamanho, "v5", "extrair_secretaria", t, len(df_sec), pag_sec)
+    df_sis, t = medir(frequencia_v5.extrair_sistema, caminhos["sistema_pdf"], workers)
+    registrar(resultados, tamanho, "v5", "extrair_sistema", t, len(df_sis), pag_sis)
+    (df_sec, df_sis), t = medir(lambda: (frequencia_v5.normalizar(df_sec), frequencia_v5.normalizar(df_sis)))
+    registrar(resultados, tamanho, "v5", "normalizar", t, len(df_sec) + len(df_sis))
+    _, t = medir(frequencia_v5.comparar, df_sec, df_sis)
+    registrar(resultados, tamanho, "v5", "comparar", t, len(df_sec) + len(df_sis))
+
+    return resultados
+
+
+def medir_memoria(arquivo_secretaria, secretarias):
+    """
+    Memória do mês consolidado (a mesma secretaria repetida `secretarias`
+    vezes com funcionais diferentes): esquema tipado x DataFrame de texto
+    montado a partir de dicts, como antes.
+    """
+    df = frequencia_v5.extrair_secretaria(arquivo_secretaria)
+
+    partes = []
+    for i in range(secretarias):
+        parte = df.copy()
+        parte["funcional"] = parte["funcional"] + i * 1000
+        partes.append(parte)
+    tipado = pd.concat(partes, ignore_index=True)
+
+    normalizado = frequencia_v5.normalizar(tipado.copy())
+
+    linhas = []
+    for etapa, df_tipado in [("extraído", tipado), ("normalizado", normalizado)]:
+        texto = pd.DataFrame(expandir(df_tipado).to_dict("records"))
+        linhas.append((etapa, len(df_tipado), memoria_mb(texto), memoria_mb(df_tipado)))
+
+    return linhas
+
+
+def comparar_com_base(resultados, arquivo_base, tolerancia):
+    """
+    Lista as etapas que ficaram mais lentas (linhas/s) que a base além
+    da tolerância.
+    """
+    with open(arquivo_base, encoding="utf-8") as f:
+        base = {r["chave"]: r for r in json.load(f)["resultados"]}
+
+    regressoes = []
+    for r in resultados:
+        anterior = base.get(r["chave"])
+        if not anterior or not anterior["linhas_s"] or not r["linhas_s"]:
+            continue
+        # etapas muito curtas são só ruído
+        if max(anterior["segundos"], r["segundos"]) < MINIMO_SEGUNDOS:
+            continue
+        if r["linhas_s"] < anterior["linhas_s"] * (1 - tolerancia):
+            regressoes.append((r["chave"], anterior["linhas_s"], r["linhas_s"]))
+
+    return regressoes
+
+
+def imprimir(resultados):
+    print(f"{'funcs':>7} {'versão':<7}{'etapa':<22}{'seg':>9}{'linhas':>9}{'linhas/s':>12}{'pág/s':>9}")
+    for r in resultados:
+        paginas_s = "" if r["paginas_s"] is None else f"{r['paginas_s']:.2f}"
+        linhas_s = "" if r["linhas_s"] is None else f"{r['linhas_s']:,.0f}"
+        print(
+            f"{r['funcionarios']:>7} {r['versao']:<7}{r['etapa']:<22}{r['segundos']:>9.3f}"
+            f"{r['linhas']:>9}{linhas_s:>12}{paginas_s:>9}"
+        )
+
+
+# =========================
+# EXECUÇÃO
+# =========================
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sintético da frequência (v1/v2/v5)")
+    parser.add_argument("--funcionarios", type=int, nargs="+", default=[200, 1000])
+    parser.add_argument("--divergencia", type=float, default=0.05)
+    parser.add_argument("--layout", choices=["tabela", "texto", "misto"], default="misto")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--pasta", help="onde gerar os arquivos (padrão: pasta temporária)")
+    parser.add_argument("--saida", default="benchmark_frequencia.json")
+    parser.add_argument("--base", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.2)
+    parser.add_argument(
+        "--memoria", type=int, metavar="SECRETARIAS",
+        help="mede a memória de um mês consolidado com N secretarias (texto x esquema tipado)"
+    )
+    args = parser.parse_args()
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as temporaria:
+        pasta = args.pasta or temporaria
+        for tamanho in args.funcionarios:
+            print(f"Rodando com {tamanho} funcionários...")
+            resultados.extend(rodar(tamanho, args.divergencia, args.layout, args.workers, pasta))
+
+        if args.memoria:
+            maior = max(args.funcionarios)
+            memoria = medir_memoria(gerar_conjunto(pasta, str(maior), maior)["secretaria"], args.memoria)
+
+    imprimir(resultados)
+
+    if args.memoria:
+        print(f"\nMemória, mês consolidado com {args.memoria} secretarias:")
+        print(f"{'etapa':<14}{'linhas':>10}{'texto (MB)':>12}{'tipado (MB)':>13}{'redução':>10}")
+        for etapa, linhas, texto, tipado in memoria:
+            print(f"{etapa:<14}{linhas:>10}{texto:>12.1f}{tipado:>13.1f}{texto / tipado:>9.1f}x")
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump({"parametros": vars(args), "resultados": resultados}, f, ensure_ascii=False, indent=2)
+
+    if args.base:
+        regressoes = comparar_com_base(resultados, args.base, args.tolerancia)
+        for chave, antes, agora in regressoes:
+            print(f"✖ regressão em {chave}: {antes:,.0f} -> {agora:,.0f} linhas/s")
+        if regressoes:
+            sys.exit(1)
+        print("✔ Sem regressões")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import hashlib
+import os
+
+import pandas as pd
+
+
+# =========================
+# CACHE DE EXTRAÇÃO
+# =========================
+# Linhas extraídas ficam em parquet, uma entrada por
+# (hash do conteúdo, extrator, versão do extrator).
+PASTA_CACHE = os.environ.get("FREQUENCIA_CACHE", ".cache_frequencia")
+LIMITE_CACHE_MB = 500
+
+COLUNAS = ["funcional", "data", "ocorrencia", "origem"]
+
+
+def hash_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def caminho_entrada(hash_conteudo, extrator, versao, pasta=PASTA_CACHE):
+    return os.path.join(pasta, f"{hash_conteudo}_{extrator}_v{versao}.parquet")
+
+
+def ler_cache(entrada):
+    if not os.path.exists(entrada):
+        return None
+
+    # marca o acesso para a política LRU
+    os.utime(entrada)
+    df = pd.read_parquet(entrada)
+
+    # colunas de texto: devolve None onde a extração devolveu None (como
+    # sem cache); colunas tipadas (esquema compacto) ficam como estão
+    for coluna in df.columns:
+        if df[coluna].dtype == object or pd.api.types.is_string_dtype(df[coluna].dtype):
+            texto = df[coluna].astype(object)
+            df[coluna] = texto.where(texto.notna(), None)
+
+    return df
+
+
+def gravar_cache(df, entrada, pasta=PASTA_CACHE, limite_mb=LIMITE_CACHE_MB):
+    os.makedirs(pasta, exist_ok=True)
+
+    temporario = entrada + ".tmp"
+
+    df.reindex(columns=COLUNAS).to_parquet(temporario, index=False)
+    os.replace(temporario, entrada)
+
+    limitar_cache(limite_mb, pasta)
+
+
+def com_cache(caminho, extrator, versao, extrair, pasta=PASTA_CACHE, limite_mb=LIMITE_CACHE_MB):
+    """
+    Devolve as linhas do cache se o arquivo não mudou; senão chama
+    `extrair()`, grava o resultado e o devolve.
+    """
+    entrada = caminho_entrada(hash_arquivo(caminho), extrator, versao, pasta)
+
+    df = ler_cache(entrada)
+    if df is not None:
+        print(f"  (cache) {caminho}")
+        return df
+
+    df = extrair()
+    gravar_cache(df, entrada, pasta, limite_mb)
+    return df
+
+
+def entradas_cache(pasta=PASTA_CACHE):
+    if not os.path.isdir(pasta):
+        return []
+
+    entradas = []
+    for nome in os.listdir(pasta):
+        if not nome.endswith(".parquet"):
+            continue
+        caminho = os.path.join(pasta, nome)
+        info = os.stat(caminho)
+        entradas.append((info.st_mtime, info.st_size, caminho))
+
+    return sorted(entradas)
+
+
+def limitar_cache(limite_mb=LIMITE_CACHE_MB, pasta=PASTA_CACHE):
+    """
+    Remove as entradas menos usadas até o cache caber em `limite_mb`.
+    """
+    entradas = entradas_cache(pasta)
+    total = sum(tamanho for _, tamanho, _ in entradas)
+    limite = limite_mb * 1024 * 1024
+
+    removidas = 0
+    for _, tamanho, caminho in entradas:
+        if total <= limite:
+            break
+        os.remove(caminho)
+        total -= tamanho
+        removidas += 1
+
+    return removidas
+
+
+def invalidar_cache(caminho=None, pasta=PASTA_CACHE):
+    """
+    Remove as entradas de um arquivo (qualquer extrator/versão) ou,
+    sem argumento, o cache inteiro.
+    """
+    prefixo = hash_arquivo(caminho) + "_" if caminho else ""
+
+    removidas = 0
+    for _, _, entrada in entradas_cache(pasta):
+        if os.path.basename(entrada).startswith(prefixo):
+            os.remove(entrada)
+            removidas += 1
+
+    return removidas
+
@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+
+
+# =========================
+# CALENDÁRIO EM BITS
+# =========================
+# Um mês de frequência por (funcional, ocorrência) cabe em 31 bits:
+# o bit d-1 ligado = ocorrência no dia d. Os dois lados viram matrizes
+# uint32 (funcionais x ocorrências) e a comparação é XOR/AND em numpy.
+DIAS_MES = 31
+_BITS = np.arange(DIAS_MES, dtype=np.uint32)
+
+
+def montar_calendario(df, mes=None):
+    """
+    Converte linhas (funcional, data dd/mm/aaaa, ocorrencia) em
+    {"mes", "funcionais", "ocorrencias", "mascaras"}.
+
+    Sem `mes` ("mm/aaaa") usa o mês mais frequente; linhas de outros
+    meses (ou sem data válida) ficam fora das máscaras e voltam em
+    "fora" (funcional, data, ocorrencia) e na contagem "fora_do_mes".
+    """
+    datas = pd.to_datetime(df["data"], format="%d/%m/%Y", errors="coerce")
+
+    # competência como aaaamm numérico (strftime por linha é lento)
+    competencia = (datas.dt.year * 100 + datas.dt.month).to_numpy()
+
+    if mes is None:
+        validas = competencia[~np.isnan(competencia)]
+        if len(validas):
+            valores, contagem = np.unique(validas, return_counts=True)
+            aaaamm = int(valores[contagem.argmax()])
+            mes = f"{aaaamm % 100:02d}/{aaaamm // 100}"
+
+    if mes is not None:
+        m, a = mes.split("/")
+        no_mes = competencia == int(a) * 100 + int(m)
+    else:
+        no_mes = np.zeros(len(df), dtype=bool)
+
+    funcional = df["funcional"].astype(str).str.strip().to_numpy()[no_mes]
+    ocorrencia = df["ocorrencia"].astype(str).to_numpy()[no_mes]
+    dia = datas.dt.day.to_numpy()[no_mes].astype(np.uint32)
+
+    codigo_func, funcionais = pd.factorize(funcional)
+    codigo_ocorr, ocorrencias = pd.factorize(ocorrencia)
+
+    mascaras = np.zeros((len(funcionais), len(ocorrencias)), dtype=np.uint32)
+    np.bitwise_or.at(mascaras, (codigo_func, codigo_ocorr), np.uint32(1) << (dia - 1))
+
+    return {
+        "mes": mes,
+        "funcionais": pd.Index(funcionais),
+        "ocorrencias": pd.Index(ocorrencias),
+        "mascaras": mascaras,
+        "fora": df.loc[~no_mes, ["funcional", "data", "ocorrencia"]],
+        "fora_do_mes": int((~no_mes).sum()),
+    }
+
+
+def alinhar(cal_a, cal_b):
+    """
+    Reindexa as duas matrizes para as mesmas funcionais e ocorrências.
+    """
+    funcionais = cal_a["funcionais"].union(cal_b["funcionais"])
+    ocorrencias = cal_a["ocorrencias"].union(cal_b["ocorrencias"])
+
+    def reindexar(cal):
+        mascaras = np.zeros((len(funcionais), len(ocorrencias)), dtype=np.uint32)
+        linhas = funcionais.get_indexer(cal["funcionais"])
+        colunas = ocorrencias.get_indexer(cal["ocorrencias"])
+        mascaras[np.ix_(linhas, colunas)] = cal["mascaras"]
+        return mascaras
+
+    return funcionais, ocorrencias, reindexar(cal_a), reindexar(cal_b)
+
+
+def _bits_por_dia(mascaras):
+    # (..., 31) booleanos a partir das máscaras
+    return ((mascaras[..., None] >> _BITS) & 1).astype(bool)
+
+
+def _nomes(bits, ocorrencias):
+    # junta os nomes das ocorrências ligadas em cada linha
+    nomes = np.asarray(ocorrencias, dtype=object)
+    return [" / ".join(nomes[linha]) for linha in bits]
+
+
+def comparar_calendarios(cal_sec, cal_sis):
+    """
+    Divergências por (funcional, dia), com os mesmos status de comparar():
+    SÓ_SECRETARIA, SÓ_SISTEMA e DIVERGENCIA_OCORRENCIA.
+    """
+    funcionais, ocorrencias, sec, sis = alinhar(cal_sec, cal_sis)
+
+    # dias com qualquer ocorrência, por funcional
+    dias_sec = np.bitwise_or.reduce(sec, axis=1) if sec.size else np.zeros(len(funcionais), np.uint32)
+    dias_sis = np.bitwise_or.reduce(sis, axis=1) if sis.size else np.zeros(len(funcionais), np.uint32)
+    diferenca = np.bitwise_or.reduce(sec ^ sis, axis=1) if sec.size else np.zeros(len(funcionais), np.uint32)
+
+    so_sec = dias_sec & ~dias_sis
+    so_sis = dias_sis & ~dias_sec
+    divergente = dias_sec & dias_sis & diferenca
+
+    resultado = []
+    for status, mascara in [
+        ("SÓ_SECRETARIA", so_sec),
+        ("SÓ_SISTEMA", so_sis),
+        ("DIVERGENCIA_OCORRENCIA", divergente),
+    ]:
+        linha, dia = np.nonzero(_bits_por_dia(mascara))
+        if len(linha) == 0:
+            continue
+
+        bits_sec = (sec[linha] >> dia[:, None].astype(np.uint32)) & 1
+        bits_sis = (sis[linha] >> dia[:, None].astype(np.uint32)) & 1
+
+        resultado.append(pd.DataFrame({
+            "funcional": funcionais[linha],
+            "dia": dia + 1,
+            "ocorrencia_sec": _nomes(bits_sec.astype(bool), ocorrencias),
+            "ocorrencia_sis": _nomes(bits_sis.astype(bool), ocorrencias),
+            "status": status,
+        }))
+
+    colunas = ["funcional", "data", "ocorrencia_sec", "ocorrencia_sis", "status"]
+    if not resultado:
+        return pd.DataFrame(columns=colunas)
+
+    df = pd.concat(resultado, ignore_index=True)
+
+    mes = cal_sec["mes"] or cal_sis["mes"]
+    df["data"] = df["dia"].map("{:02d}".format) + "/" + mes
+
+    return df[colunas].sort_values(by=["funcional", "data"]).reset_index(drop=True)
+
+
+def divergencias_fora_do_mes(cal_sec, cal_sis):
+    """
+    Linhas fora do mês comparado (data errada no PDF, lançamento de outra
+    competência): entram nas divergências com status FORA_DO_MES.
+    """
+    partes = []
+    for fora, coluna in [(cal_sec["fora"], "ocorrencia_sec"), (cal_sis["fora"], "ocorrencia_sis")]:
+        if fora.empty:
+            continue
+        partes.append(pd.DataFrame({
+            "funcional": fora["funcional"].astype(str).str.strip().to_numpy(),
+            "data": fora["data"].astype(object).to_numpy(),
+            coluna: fora["ocorrencia"].astype(str).to_numpy(),
+        }))
+
+    colunas = ["funcional", "data", "ocorrencia_sec", "ocorrencia_sis", "status"]
+    if not partes:
+        return pd.DataFrame(columns=colunas)
+
+    df = pd.concat(partes, ignore_index=True).reindex(columns=colunas)
+    df["status"] = "FORA_DO_MES"
+    return df
+
+
+def comparar_calendario(df_sec, df_sis, mes=None, log=print):
+    cal_sec = montar_calendario(df_sec, mes)
+    cal_sis = montar_calendario(df_sis, mes or cal_sec["mes"])
+
+    df = comparar_calendarios(cal_sec, cal_sis)
+
+    fora = divergencias_fora_do_mes(cal_sec, cal_sis)
+    if fora.empty:
+        return df
+
+    log(
+        f"⚠ {len(fora)} linhas fora de {cal_sec['mes'] or cal_sis['mes']} "
+        f"(secretaria: {cal_sec['fora_do_mes']}, sistema: {cal_sis['fora_do_mes']}): "
+        "entram nas divergências como FORA_DO_MES"
+    )
+    return pd.concat([df, fora], ignore_index=True).sort_values(by=["funcional", "data"]).reset_index(drop=True)
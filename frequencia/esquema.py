@@ -0,0 +1,230 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_integer_dtype
+
+
+# =========================
+# ESQUEMA TIPADO
+# =========================
+# funcional  -> int32 (dd.ddd-d sem pontuação; -1 = sem funcional)
+# data       -> datetime64 (NaT = sem data)
+# ocorrencia, origem, status, ocorrencia_limpa -> Categorical
+# chave      -> int64 (funcional + código da ocorrência limpa)
+#
+# As planilhas continuam saindo em texto: `expandir` volta ao formato
+# antigo só na hora de gravar.
+SEM_FUNCIONAL = -1
+
+CATEGORICAS = ["ocorrencia", "origem", "status", "ocorrencia_limpa"]
+
+
+def funcional_para_int(funcional):
+    # "10.001-4" -> 100014 (formato garantido por PADRAO_FUNCIONAL)
+    if not funcional:
+        return SEM_FUNCIONAL
+    return int(funcional[:2] + funcional[3:6] + funcional[7:])
+
+
+def data_para_int(data):
+    # "05/04/2026" -> 20260405
+    if not data:
+        return 0
+    return int(data[6:10]) * 10000 + int(data[3:5]) * 100 + int(data[:2])
+
+
+def datas_int_para_datetime(datas):
+    datas = np.asarray(datas)
+    return pd.to_datetime(
+        pd.DataFrame({"year": datas // 10000, "month": datas // 100 % 100, "day": datas % 100}),
+        errors="coerce"
+    )
+
+
+def codificar_funcional(funcionais):
+    digitos = funcionais.astype(str).str.replace(r"\D", "", regex=True)
+    numeros = pd.to_numeric(digitos.where(digitos != ""), errors="coerce")
+    return numeros.fillna(SEM_FUNCIONAL).astype(np.int32).to_numpy()
+
+
+def decodificar_funcional(codigos):
+    """
+    100014 -> "10.001-4"; SEM_FUNCIONAL -> None.
+    """
+    codigos = pd.Series(np.asarray(codigos, dtype=np.int64))
+
+    texto = (
+        (codigos // 10000).astype(str).str.zfill(2) + "."
+        + (codigos // 10 % 1000).astype(str).str.zfill(3) + "-"
+        + (codigos % 10).astype(str)
+    )
+
+    return texto.astype(object).where(codigos != SEM_FUNCIONAL, None).to_numpy()
+
+
+def codificar_data(datas):
+    return pd.to_datetime(datas, format="%d/%m/%Y", errors="coerce")
+
+
+# =========================
+# ACUMULADOR DE LINHAS
+# =========================
+class Colunas:
+    """
+    Acumula as linhas extraídas direto em arrays numpy pré-alocados
+    (dobram quando enchem), em vez de uma lista de dicts.
+
+    Ocorrência e origem viram códigos inteiros na hora; o texto de cada
+    valor distinto é guardado uma vez só.
+    """
+
+    def __init__(self, capacidade=4096):
+        self.tamanho = 0
+        self.funcional = np.empty(capacidade, np.int32)
+        self.data = np.empty(capacidade, np.int32)
+        self.ocorrencia = np.empty(capacidade, np.int32)
+        self.origem = np.empty(capacidade, np.int8)
+        self._ocorrencias = {}
+        self._origens = {}
+
+    def _crescer(self):
+        for nome in ["funcional", "data", "ocorrencia", "origem"]:
+            atual = getattr(self, nome)
+            novo = np.empty(len(atual) * 2, atual.dtype)
+            novo[:self.tamanho] = atual[:self.tamanho]
+            setattr(self, nome, novo)
+
+    @staticmethod
+    def _codigo(valores, valor):
+        if valor is None:
+            return -1
+        return valores.setdefault(valor, len(valores))
+
+    def adicionar(self, funcional, data, ocorrencia, origem):
+        if self.tamanho == len(self.funcional):
+            self._crescer()
+
+        i = self.tamanho
+        self.funcional[i] = funcional_para_int(funcional)
+        self.data[i] = data_para_int(data)
+        self.ocorrencia[i] = self._codigo(self._ocorrencias, ocorrencia)
+        self.origem[i] = self._codigo(self._origens, origem)
+        self.tamanho += 1
+
+    def adicionar_linhas(self, linhas):
+        for linha in linhas:
+            self.adicionar(linha["funcional"], linha["data"], linha["ocorrencia"], linha["origem"])
+
+    def para_dataframe(self):
+        n = self.tamanho
+
+        return pd.DataFrame({
+            "funcional": self.funcional[:n].copy(),
+            "data": datas_int_para_datetime(self.data[:n]),
+            "ocorrencia": pd.Categorical.from_codes(self.ocorrencia[:n], categories=list(self._ocorrencias)),
+            "origem": pd.Categorical.from_codes(self.origem[:n], categories=list(self._origens)),
+        })
+
+
+def linhas_para_dataframe(paginas):
+    """
+    Resultado de extrair_paginas (lista de listas de dicts) -> DataFrame tipado.
+    """
+    colunas = Colunas(max(1, sum(len(p) for p in paginas)))
+    for pagina in paginas:
+        colunas.adicionar_linhas(pagina)
+    return colunas.para_dataframe()
+
+
+# =========================
+# CONVERSÕES
+# =========================
+def compactar(df):
+    """
+    DataFrame em texto (cache antigo, ODS) -> esquema tipado. Colunas que
+    já estão tipadas ficam como estão.
+    """
+    df = df.copy()
+
+    if "funcional" in df and not is_integer_dtype(df["funcional"]):
+        df["funcional"] = codificar_funcional(df["funcional"])
+
+    if "data" in df and not is_datetime64_any_dtype(df["data"]):
+        df["data"] = codificar_data(df["data"])
+
+    for coluna in CATEGORICAS:
+        if coluna in df and not isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].astype(object).astype("category")
+
+    return df
+
+
+def expandir(df):
+    """
+    Esquema tipado -> texto, no mesmo formato das planilhas antigas.
+    """
+    df = df.copy()
+
+    if "funcional" in df and is_integer_dtype(df["funcional"]):
+        df["funcional"] = decodificar_funcional(df["funcional"])
+
+    if "data" in df and is_datetime64_any_dtype(df["data"]):
+        df["data"] = df["data"].dt.strftime("%d/%m/%Y").astype(object).where(df["data"].notna(), None)
+
+    if "chave" in df and is_integer_dtype(df["chave"]):
+        limpa = df["ocorrencia_limpa"].astype(object).where(df["ocorrencia_limpa"].notna(), "")
+        df["chave"] = df["funcional"].astype(str) + "_" + limpa.astype(str)
+
+    for coluna in CATEGORICAS:
+        if coluna in df and isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].astype(object)
+
+    return df
+
+
+def transformar_categorias(serie, funcao):
+    """
+    Aplica `funcao` (Series de texto -> Series de texto) só nas
+    categorias distintas, juntando as que ficarem iguais.
+    """
+    categorias = pd.Series(serie.cat.categories, dtype=object)
+    novos_codigos, novas = pd.factorize(funcao(categorias))
+
+    codigos = serie.cat.codes.to_numpy()
+    codigos = np.where(codigos >= 0, novos_codigos[codigos], -1)
+
+    return pd.Categorical.from_codes(codigos, categories=novas)
+
+
+# bits da chave reservados para o hash da ocorrência limpa; a funcional
+# (até 999999, 20 bits) fica nos bits de cima, sem colisão entre funcionais
+_BITS_OCORRENCIA = 40
+
+
+def codigo_estavel(texto):
+    """
+    blake2b do texto truncado em _BITS_OCORRENCIA bits: o mesmo texto tem
+    o mesmo código em qualquer processo e execução (o estado incremental
+    guarda as chaves e compara com as da execução seguinte).
+    """
+    resumo = hashlib.blake2b(texto.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(resumo, "little") & ((1 << _BITS_OCORRENCIA) - 1)
+
+
+def chave_inteira(funcionais, ocorrencias_limpas):
+    """
+    Equivalente inteiro de funcional + "_" + ocorrencia_limpa.
+    """
+    # hash uma vez por categoria, não por linha
+    categorias = [str(c) for c in ocorrencias_limpas.cat.categories] + [""]
+    codigos_categoria = np.array([codigo_estavel(c) for c in categorias], dtype=np.int64)
+
+    # código -1 (sem ocorrência) usa o último item, o texto vazio
+    codigos = codigos_categoria[ocorrencias_limpas.cat.codes.to_numpy()]
+
+    return np.asarray(funcionais, dtype=np.int64) * (1 << _BITS_OCORRENCIA) + codigos
+
+
+def memoria_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
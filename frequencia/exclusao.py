@@ -0,0 +1,83 @@
+import numpy as np
+
+from ocorrencias import classificar_serie, resolver_categoria
+
+
+# =========================
+# EXCLUSÃO ANTES DA COMPARAÇÃO
+# =========================
+# procedimentos/Frequencia.md: retirar da conferência os tipos que não
+# impactam no salário. Cada regra é uma categoria do MAPA_OCORRENCIAS.
+REGRAS_EXCLUSAO = [
+    "NOJO",
+    "FÉRIAS",
+    "GALA",
+    "DOAÇÃO DE SANGUE",
+    "ABONO ELEITORAL",
+    "Férias prêmio",
+    "FÉRIAS REGULAMENTARES",
+]
+
+
+def resolver_regras(nomes):
+    """
+    Converte nomes digitados (sem acento, qualquer caixa) nas categorias
+    do mapa. Nome desconhecido é erro, para não filtrar nada em silêncio.
+    """
+    regras = []
+    for nome in nomes:
+        categoria = resolver_categoria(nome)
+        if categoria is None:
+            raise ValueError(f"categoria de exclusão desconhecida: {nome!r}")
+        regras.append(categoria)
+
+    return regras
+
+
+def regras_por_argumentos(excluir=None, sem_exclusao=False):
+    # --excluir / --sem-exclusao dos scripts
+    if sem_exclusao:
+        return []
+    if excluir:
+        return resolver_regras(excluir)
+    return REGRAS_EXCLUSAO
+
+
+def aplicar_exclusao(df, regras=REGRAS_EXCLUSAO, coluna="ocorrencia"):
+    """
+    Remove as linhas cuja ocorrência cai em alguma das `regras`.
+
+    Devolve (df filtrado, {regra: linhas removidas}).
+    """
+    if not regras or df.empty:
+        return df, {regra: 0 for regra in regras or []}
+
+    categorias = classificar_serie(df[coluna])
+
+    regras = list(regras)
+    codigos = np.full(len(categorias), -1)
+    for i, regra in enumerate(regras):
+        codigos[categorias == regra] = i
+
+    contagem = np.bincount(codigos[codigos >= 0], minlength=len(regras))
+
+    return df[codigos < 0].reset_index(drop=True), dict(zip(regras, contagem.tolist()))
+
+
+def resumo_exclusao(contagens, log=print):
+    """
+    contagens: {lado: {regra: removidas}}. Mostra antes as regras
+    aplicadas, já que a exclusão vem ligada por padrão.
+    """
+    regras = next(iter(contagens.values()), {})
+    if regras:
+        log(f"  regras: {', '.join(regras)} (--sem-exclusao para comparar tudo)")
+
+    for lado, contagem in contagens.items():
+        removidas = {regra: n for regra, n in contagem.items() if n}
+        if not removidas:
+            log(f"  {lado}: nenhuma linha excluída")
+            continue
+
+        detalhes = ", ".join(f"{regra}: {n}" for regra, n in removidas.items())
+        log(f"  {lado}: {sum(removidas.values())} linhas excluídas ({detalhes})")
@@ -0,0 +1,182 @@
+from functools import partial
+from statistics import median
+
+import pandas as pd
+import pdfplumber
+
+from frequencia_v2 import PADRAO_FUNCIONAL, PADRAO_DATA, IGNORAR_LINHAS, juntar_paginas_secretaria
+from ocorrencias import classificar_ocorrencia
+from paralelo import extrair_paginas
+
+
+# =========================
+# EXTRAÇÃO POR CAIXAS DE PALAVRAS
+# =========================
+# Uma única chamada extract_words() por página (em vez de
+# extract_tables() + extract_text()). As colunas funcional / data /
+# ocorrência são aprendidas pelas coordenadas x da primeira página com
+# dados e reaproveitadas no resto do documento.
+
+TOLERANCIA_LINHA = 3      # pontos de diferença no "top" para a mesma linha
+TOLERANCIA_COLUNA = 15    # pontos de folga em torno do x aprendido
+DISTANCIA_QUEBRA = 14     # linha sem funcional/data até essa distância continua a anterior
+
+
+def agrupar_linhas(palavras):
+    """
+    Agrupa as palavras em linhas pela coordenada vertical e ordena cada
+    linha da esquerda para a direita.
+    """
+    linhas = []
+
+    for palavra in sorted(palavras, key=lambda p: (p["top"], p["x0"])):
+        if linhas and abs(palavra["top"] - linhas[-1]["top"]) <= TOLERANCIA_LINHA:
+            linhas[-1]["palavras"].append(palavra)
+        else:
+            linhas.append({"top": palavra["top"], "palavras": [palavra]})
+
+    for linha in linhas:
+        linha["palavras"].sort(key=lambda p: p["x0"])
+
+    return linhas
+
+
+def aprender_layout(pagina):
+    """
+    x inicial das colunas funcional, data e ocorrência numa página, ou
+    None se a página não tiver linhas com funcional e data.
+    """
+    x_funcional = []
+    x_data = []
+    x_ocorrencia = []
+
+    for linha in agrupar_linhas(pagina.extract_words()):
+        palavras = linha["palavras"]
+
+        funcional = next((p for p in palavras if PADRAO_FUNCIONAL.fullmatch(p["text"])), None)
+        data = next((p for p in palavras if PADRAO_DATA.fullmatch(p["text"])), None)
+
+        if not funcional or not data:
+            continue
+
+        x_funcional.append(funcional["x0"])
+        x_data.append(data["x0"])
+
+        # ocorrência = primeira palavra depois da data (quando a data vem antes)
+        depois = [p for p in palavras if p["x0"] > data["x1"]]
+        if depois:
+            x_ocorrencia.append(depois[0]["x0"])
+
+    if not x_funcional:
+        return None
+
+    return {
+        "funcional": median(x_funcional),
+        "data": median(x_data),
+        "ocorrencia": median(x_ocorrencia) if x_ocorrencia else None,
+    }
+
+
+def descobrir_layout(pdf_path):
+    with pdfplumber.open(pdf_path) as pdf:
+        for pagina in pdf.pages:
+            layout = aprender_layout(pagina)
+            if layout:
+                return layout
+
+    return None
+
+
+def _na_coluna(palavra, x):
+    return x is not None and abs(palavra["x0"] - x) <= TOLERANCIA_COLUNA
+
+
+def _procurar(palavras, padrao, x):
+    # prefere a palavra na coluna aprendida; senão qualquer uma que case
+    candidatas = [p for p in palavras if padrao.fullmatch(p["text"])]
+    na_coluna = [p for p in candidatas if _na_coluna(p, x)]
+
+    if na_coluna:
+        return na_coluna[0]
+    if candidatas:
+        return candidatas[0]
+    return None
+
+
+def processar_pagina_palavras(pagina, layout):
+    """
+    Devolve (dados, redefine, ultimo_funcional), no mesmo formato de
+    frequencia_v2.processar_pagina_secretaria. Linhas com data e sem
+    funcional (célula vazia na coluna funcional) herdam a anterior.
+    """
+    dados = []
+    ultimo_funcional = None
+    anterior = None
+
+    for linha in agrupar_linhas(pagina.extract_words()):
+        palavras = linha["palavras"]
+        texto = " ".join(p["text"] for p in palavras)
+
+        if any(x in texto.upper() for x in IGNORAR_LINHAS):
+            anterior = None
+            continue
+
+        funcional = _procurar(palavras, PADRAO_FUNCIONAL, layout["funcional"])
+        data = _procurar(palavras, PADRAO_DATA, layout["data"])
+
+        if layout["ocorrencia"] is None:
+            resto = palavras
+        elif data:
+            # ocorrência fica à direita da data
+            resto = [p for p in palavras if p["x0"] > data["x1"]]
+        else:
+            resto = [p for p in palavras if p["x0"] >= layout["ocorrencia"] - TOLERANCIA_COLUNA]
+        resto = [p for p in resto if p is not funcional and p is not data]
+        texto_ocorrencia = " ".join(p["text"] for p in resto)
+
+        if funcional:
+            ultimo_funcional = funcional["text"]
+
+        if not data:
+            # célula de ocorrência quebrada em duas linhas
+            if (
+                not funcional and anterior is not None and texto_ocorrencia
+                and linha["top"] - anterior["top"] <= DISTANCIA_QUEBRA
+            ):
+                anterior["texto"] += " " + texto_ocorrencia
+                anterior["top"] = linha["top"]
+            continue
+
+        anterior = {
+            "funcional": ultimo_funcional,
+            "data": data["text"],
+            "texto": texto_ocorrencia,
+            "top": linha["top"],
+        }
+        dados.append(anterior)
+
+    linhas = [
+        {
+            "funcional": d["funcional"],
+            "data": d["data"],
+            "ocorrencia": classificar_ocorrencia(d["texto"]),
+            "origem": "secretaria",
+        }
+        for d in dados
+    ]
+
+    return linhas, False, ultimo_funcional
+
+
+def extrair_secretaria_palavras(pdf_path, workers=None, layout=None):
+    if layout is None:
+        layout = descobrir_layout(pdf_path)
+
+    if layout is None:
+        return pd.DataFrame(columns=["funcional", "data", "ocorrencia", "origem"])
+
+    paginas = extrair_paginas(
+        pdf_path, partial(processar_pagina_palavras, layout=layout), workers
+    )
+
+    return pd.DataFrame(juntar_paginas_secretaria(paginas))
@@ -1,10 +1,20 @@
-import pdfplumber
+import argparse
+import numpy as np
+import os
 import pandas as pd
 import re
-import odf
-import unicodedata
+import sys
 
-import unicodedata
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ocr
+from aviso_retificacao import carregar_nomes, montar_aviso, salvar_aviso
+from calendario import comparar_calendario
+from exclusao import REGRAS_EXCLUSAO, aplicar_exclusao, regras_por_argumentos, resumo_exclusao
+from intervalos import comparar_intervalos
+from ocorrencias import classificar_ocorrencia
+from paralelo import extrair_paginas, workers_padrao
+from comum.leitor_ods import ler_ods
 
 def linha_util_texto(linha_txt):
     if not linha_txt:
@@ -21,113 +31,10 @@ def linha_util_texto(linha_txt):
     return True
 
     
-def normalizar_texto(txt):
-    if not txt:
-        return ""
-    
-    txt = txt.upper()
-    
-    # remove acentos
-    txt = unicodedata.normalize('NFKD', txt)
-    txt = txt.encode('ASCII', 'ignore').decode('ASCII')
-    
-    # remove espaços duplicados
-    txt = " ".join(txt.split())
-    
-    return txt
-
 # =========================
 # PADRÕES
 # =========================
 
-MAPA_OCORRENCIAS = {
-    "ABONO": ["ABONO"],
-    
-    "FÉRIAS REGULAMENTARES": [
-        "FÉRIAS REGULAMENTARES",
-        "FERIAS REGULAMENTARES"
-    ],
-    
-    "DOAÇÃO DE SANGUE": [
-        "DOAÇÃO DE SANGUE",
-        "DOACAO DE SANGUE"
-    ],
-    
-    "TRATAMENTO DE SAÚDE": [
-        "TRATAMENTO DE SAÚDE",
-        "TRATAMENTO DE SAUDE",
-        "TRATAMENTO DE"
-    ],
-    
-    "AUXÍLIO DOENÇA": [
-        "AUXÍLIO DOENÇA",
-        "AUXILIO DOENCA"
-    ],
-    
-    "LICENÇA MÉDICA": [
-        "LICENÇA MÉDICA",
-        "LICENCA MEDICA"
-    ],
-    
-    "AFASTAMENTO SEM VENCIMENTOS": [
-        "AFASTAMENTO SEM VENCIMENTOS",
-        "AFASTAMENTO SEM VENCIMENTO",
-        "AFASTAMENTO S/VENCIMENTOS",
-        "AFASTAMENTO SEM VENC",
-        "SEM VENCIMENTOS"
-    ],
-
-    "FALTA": [
-        "FALTA",
-        "FALTAS EFETIVOS",
-        "FALT"
-    ],
-
-    "CEDIDO SEM ÔNUS PARA CEDENTE": [
-        "CEDIDO SEM ÔNUS PARA CEDENTE",
-        "CEDIDO SEM ÔNUS",
-        "CEDIDO"
-    ],
-
-    "AFASTAMENTO POR MANDADO JUDICIAL": [
-        "AFASTAMENTO POR MANDADO JUDICIAL",
-        "MANDADO JUDICIAL"
-    ],
-
-    "DOENÇA EM PESSOA DA FAMÍLIA": [
-        "DOENÇA EM PESSOA DA FAMÍLIA",
-        "DOENÇA EM PESSOA"
-    ],
-
-    "NOJO": [
-        "NOJO"
-    ],
-
-    "AGUARDANDO PERÍCIA SEMPEM": [
-        "AGUARDANDO PERÍCIA SEMPEM",
-        "AGUARDANDO PERÍCIA",
-        "PERICIA",
-        "PERÍCIA"
-    ],
-
-    "Férias prêmio": [
-        "Férias prêmio",
-        "PREMIO",
-        "PRÊMIO"
-    ],
-
-    "Licença maternidade prorrogação": [
-        "Licença maternidade prorrogação"
-    ],
-
-    "Licença maternidade": [
-        "Licença maternidade"
-    ]
-
-
-}
-
-
 PADRAO_FUNCIONAL = re.compile(r"\d{2}\.\d{3}-\d")
 PADRAO_DATA = re.compile(r"\d{2}/\d{2}/\d{4}")
 
@@ -165,125 +72,177 @@ def linha_util(linha):
 
 
 def extrair_ocorrencia(texto):
-    texto = normalizar_texto(texto)
-
-    for padrao, variacoes in MAPA_OCORRENCIAS.items():
-        for v in variacoes:
-            if normalizar_texto(v) in texto:
-                return padrao
-
-    return "NÃO IDENTIFICADO"
+    return classificar_ocorrencia(texto)
 
     
 # =========================
 # EXTRAÇÃO - SECRETARIA
 # =========================
-def extrair_secretaria(pdf_path):
+def processar_pagina_secretaria(pagina):
+    """
+    Extrai as linhas de uma página.
+
+    Devolve (dados, redefine, ultimo_funcional). Em páginas de texto as
+    linhas anteriores à primeira funcional ficam com funcional None e
+    herdam a funcional da página anterior em juntar_paginas_secretaria.
+    """
     dados = []
+    ultimo_funcional = None
     
-    with pdfplumber.open(pdf_path) as pdf:
-        for pagina in pdf.pages:
-            
-            tabelas = pagina.extract_tables()
+    tabelas = pagina.extract_tables()
+    
+    if tabelas:
+        for tabela in tabelas:
+            ultimo_funcional = None
             
-            if tabelas:
-                for tabela in tabelas:
-                    ultimo_funcional = None
-                    
-                    for linha in tabela:
-                        if not linha:
-                            continue
-        
-                        linha_txt = " ".join([str(x) for x in linha if x])
-        
-                        if not linha_util_texto(linha_txt):
-                            continue
-        
-                        funcional = None
-                        data = None
-        
-                        for item in linha:
-                            if not item:
-                                continue
-        
-                            # 🔥 extrai funcional
-                            m_func = PADRAO_FUNCIONAL.search(item)
-                            if m_func:
-                                funcional = m_func.group()
-                                ultimo_funcional = funcional
-        
-                            # 🔥 extrai data
-                            m_data = PADRAO_DATA.search(item)
-                            if m_data:
-                                data = m_data.group()
-        
-                        # 🔥 fallback de funcional (linhas quebradas no PDF)
-                        if not funcional:
-                            funcional = ultimo_funcional
-        
-                        # 🔥 validação mínima
-                        if not funcional or not data:
-                            continue
-        
-                        ocorrencia = extrair_ocorrencia(linha_txt)
-        
-                        dados.append({
-                            "funcional": funcional,
-                            "data": data,
-                            "ocorrencia": ocorrencia,
-                            "origem": "secretaria"
-                        })
+            for linha in tabela:
+                if not linha:
+                    continue
 
+                linha_txt = " ".join([str(x) for x in linha if x])
 
-            else:
-                texto = pagina.extract_text()
-                if not texto:
+                if not linha_util_texto(linha_txt):
                     continue
 
+                funcional = None
+                data = None
 
-                for linha in texto.split("\n"):
-                
-                    if not linha:
+                for item in linha:
+                    if not item:
                         continue
 
-                    linha_upper = linha.upper()
+                    # 🔥 extrai funcional
+                    m_func = PADRAO_FUNCIONAL.search(item)
+                    if m_func:
+                        funcional = m_func.group()
+                        ultimo_funcional = funcional
 
-                    if any(x in linha_upper for x in IGNORAR_LINHAS):
-                        continue
+                    # 🔥 extrai data
+                    m_data = PADRAO_DATA.search(item)
+                    if m_data:
+                        data = m_data.group()
 
-                    m_func = PADRAO_FUNCIONAL.search(linha)
-                    m_data = PADRAO_DATA.search(linha)
+                # 🔥 fallback de funcional (linhas quebradas no PDF)
+                if not funcional:
+                    funcional = ultimo_funcional
 
-                    if m_func:
-                        ultimo_funcional = m_func.group()
+                # 🔥 validação mínima
+                if not funcional or not data:
+                    continue
 
-                    if not m_data:
-                        continue
+                ocorrencia = extrair_ocorrencia(linha_txt)
 
-                    if not ultimo_funcional:
-                        continue
+                dados.append({
+                    "funcional": funcional,
+                    "data": data,
+                    "ocorrencia": ocorrencia,
+                    "origem": "secretaria"
+                })
 
-                    funcional = ultimo_funcional
-                    data = m_data.group()
-                    ocorrencia = extrair_ocorrencia(linha)
-
-                    dados.append({
-                        "funcional": funcional,
-                        "data": data,
-                        "ocorrencia": ocorrencia,
-                        "origem": "secretaria"
-                    })
-                            
+        # página de tabelas sempre redefine a última funcional
+        return dados, True, ultimo_funcional
+
+    return linhas_texto_secretaria(pagina.extract_text())
+
+
+def linhas_texto_secretaria(texto):
+    # página sem tabela: texto extraído ou reconhecido pelo OCR
+    dados = []
+    ultimo_funcional = None
+
+    if not texto:
+        return dados, False, None
+
+    for linha in texto.split("\n"):
+    
+        if not linha:
+            continue
+
+        linha_upper = linha.upper()
+
+        if any(x in linha_upper for x in IGNORAR_LINHAS):
+            continue
+
+        m_func = PADRAO_FUNCIONAL.search(linha)
+        m_data = PADRAO_DATA.search(linha)
+
+        if m_func:
+            ultimo_funcional = m_func.group()
+
+        if not m_data:
+            continue
+
+        # sem funcional ainda nesta página: resolve na junção
+        funcional = ultimo_funcional
+        data = m_data.group()
+        ocorrencia = extrair_ocorrencia(linha)
+
+        dados.append({
+            "funcional": funcional,
+            "data": data,
+            "ocorrencia": ocorrencia,
+            "origem": "secretaria"
+        })
+
+    return dados, False, ultimo_funcional
+
+
+def juntar_paginas_secretaria(paginas):
+    dados = []
+    ultimo_funcional = None
+    
+    for linhas, redefine, fim in paginas:
+        for linha in linhas:
+            if not linha["funcional"]:
+                if not ultimo_funcional:
+                    continue
+                linha = {**linha, "funcional": ultimo_funcional}
+            dados.append(linha)
+        
+        if redefine or fim:
+            ultimo_funcional = fim
+    
+    return dados
+
+
+def extrair_secretaria(pdf_path, workers=None):
+    paginas = extrair_paginas(pdf_path, processar_pagina_secretaria, workers)
+
+    # páginas digitalizadas: OCR no lugar da página (herdam a funcional da anterior)
+    vazias = [i for i, (linhas, redefine, _) in enumerate(paginas) if not linhas and not redefine]
+    paginas = ocr.completar_paginas(pdf_path, paginas, vazias, linhas_texto_secretaria, workers)
                                 
-    return pd.DataFrame(dados)
+    return pd.DataFrame(juntar_paginas_secretaria(paginas))
 
 
 # =========================
 # EXTRAÇÃO - SISTEMA (ODS)
 # =========================
+COLUNAS_DATA_FIM = ["DATA FINAL", "DATA FIM", "DATA TÉRMINO"]
+COLUNAS_DIAS = ["DIAS", "QTDE DIAS", "QTD DIAS", "QUANTIDADE DE DIAS", "NRO DIAS"]
+
+
+def fim_periodo(df, inicio):
+    for coluna in COLUNAS_DATA_FIM:
+        if coluna in df.columns:
+            fim = pd.to_datetime(df[coluna], errors="coerce")
+            return fim.fillna(inicio)
+    
+    for coluna in COLUNAS_DIAS:
+        if coluna in df.columns:
+            dias = pd.to_numeric(df[coluna], errors="coerce").fillna(1).clip(lower=1)
+            return inicio + pd.to_timedelta(dias - 1, unit="D")
+    
+    return inicio
+
+
 def extrair_sistema_ods(arquivo_ods):
     
-    df = pd.read_excel(arquivo_ods, engine="odf")
+    # leitura em streaming, só das colunas usadas
+    df = ler_ods(
+        arquivo_ods,
+        colunas=["FUNCIONÁRIO", "DATA INICIAL", "DESCRIÇÃO"] + COLUNAS_DATA_FIM + COLUNAS_DIAS
+    )
     
     df.columns = df.columns.str.upper().str.strip()
     
@@ -298,7 +257,11 @@ def extrair_sistema_ods(arquivo_ods):
     df["funcional"] = df["funcional"].astype(str).str.strip()
     
     # 🔥 CORREÇÃO PRINCIPAL
-    df["data"] = pd.to_datetime(df["data"], errors="coerce").dt.strftime("%d/%m/%Y")
+    inicio = pd.to_datetime(df["data"], errors="coerce")
+    df["data"] = inicio.dt.strftime("%d/%m/%Y")
+    
+    # 🔥 fim do período (data final ou quantidade de dias, se houver)
+    df["data_fim"] = fim_periodo(df, inicio).dt.strftime("%d/%m/%Y")
     
     df["ocorrencia"] = df["ocorrencia"].astype(str).str.strip()
     
@@ -306,7 +269,7 @@ def extrair_sistema_ods(arquivo_ods):
 
     print(df.columns)
     
-    return df[["funcional", "data", "ocorrencia", "origem"]]
+    return df[["funcional", "data", "data_fim", "ocorrencia", "origem"]]
 
 # =========================
 # NORMALIZAÇÃO
@@ -333,6 +296,28 @@ def normalizar(df):
 # =========================
 # COMPARAÇÃO
 # =========================
+def classificar_status(merge):
+    """
+    Status de cada linha do merge, calculado por colunas inteiras
+    (sem apply linha a linha).
+    """
+    origem = merge["_merge"]
+    
+    return np.select(
+        [
+            origem == "left_only",
+            origem == "right_only",
+            merge["ocorrencia_sec"] != merge["ocorrencia_sis"],
+        ],
+        [
+            "SÓ_SECRETARIA",
+            "SÓ_SISTEMA",
+            "DIVERGENCIA_OCORRENCIA",
+        ],
+        default="OK"
+    )
+
+
 def comparar(df_sec, df_sis):
     
     merge = pd.merge(
@@ -344,17 +329,7 @@ def comparar(df_sec, df_sis):
         indicator=True
     )
     
-    def classificar(row):
-        if row["_merge"] == "left_only":
-            return "SÓ_SECRETARIA"
-        elif row["_merge"] == "right_only":
-            return "SÓ_SISTEMA"
-        else:
-            if row["ocorrencia_sec"] != row["ocorrencia_sis"]:
-                return "DIVERGENCIA_OCORRENCIA"
-            return "OK"
-    
-    merge["status"] = merge.apply(classificar, axis=1)
+    merge["status"] = classificar_status(merge)
     
     print(merge.columns)
 
@@ -363,35 +338,131 @@ def comparar(df_sec, df_sis):
 # =========================
 # EXECUÇÃO
 # =========================
+def salvar_intervalos(df_sec, df_sis):
+    print("Comparando por período...")
+    df_sec, df_periodos = comparar_intervalos(df_sec, df_sis)
+    
+    df_divergencias = df_sec[df_sec["status"] != "OK"][[
+        "funcional", "data", "ocorrencia", "ocorrencia_sis", "status"
+    ]].sort_values(by=["funcional", "data"])
+    
+    df_parciais = df_periodos[df_periodos["status"] != "OK"].sort_values(by=["funcional", "data"])
+    
+    print("Salvando Excel...")
+    with pd.ExcelWriter("resultado_comparacao.xlsx") as writer:
+        df_sec.to_excel(writer, sheet_name="Secretaria", index=False)
+        df_periodos.to_excel(writer, sheet_name="Sistema", index=False)
+        df_divergencias.to_excel(writer, sheet_name="DIVERGENCIAS", index=False)
+        df_parciais.to_excel(writer, sheet_name="PERIODOS", index=False)
+    
+    return df_divergencias
+
+
+def gerar_aviso(df_divergencias, arquivo_nomes, saida="aviso_retificacao.txt"):
+    print("Gerando aviso de retificação...")
+    try:
+        nomes = carregar_nomes(arquivo_nomes)
+    except (ValueError, OSError) as e:
+        print(f"⚠ aviso sem nomes: {e}")
+        nomes = None
+    
+    salvar_aviso(montar_aviso(df_divergencias, nomes), saida)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compara frequência secretaria x sistema")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="processos para extrair páginas em paralelo (0 = todos os núcleos)"
+    )
+    parser.add_argument(
+        "--intervalos", action="store_true",
+        help="compara cada dia da secretaria com o período do sistema que o cobre"
+    )
+    parser.add_argument(
+        "--calendario", action="store_true",
+        help="compara por máscaras de dias (funcional x ocorrência) em vez do merge por chave"
+    )
+    parser.add_argument(
+        "--palavras", action="store_true",
+        help="extrai a secretaria por caixas de palavras (uma leitura por página)"
+    )
+    parser.add_argument(
+        "--excluir", nargs="+", metavar="OCORRENCIA",
+        help="tipos retirados antes da comparação (padrão: " + ", ".join(REGRAS_EXCLUSAO) + ")"
+    )
+    parser.add_argument(
+        "--sem-exclusao", action="store_true",
+        help="compara todos os tipos de ocorrência"
+    )
+    parser.add_argument(
+        "--aviso", action="store_true",
+        help="gera aviso_retificacao.txt (Favor retificar as seguintes frequências)"
+    )
+    parser.add_argument(
+        "--nomes",
+        help="planilha com funcional e nome para o aviso (padrão: o ODS do sistema)"
+    )
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+    workers = args.workers if args.workers > 0 else workers_padrao()
+    
     arquivo_secretaria = "116 - secretaria.pdf"
     arquivo_sistema = "116 - sistema.ods"
     
     print("Lendo secretaria...")
-    df_sec = extrair_secretaria(arquivo_secretaria)
+    if args.palavras:
+        # import aqui: extrator_palavras importa este módulo
+        from extrator_palavras import extrair_secretaria_palavras
+        df_sec = extrair_secretaria_palavras(arquivo_secretaria, workers)
+    else:
+        df_sec = extrair_secretaria(arquivo_secretaria, workers)
     
     print("Lendo sistema...")
     df_sis = extrair_sistema_ods(arquivo_sistema)
     
+    regras = regras_por_argumentos(args.excluir, args.sem_exclusao)
+    if regras:
+        print("Excluindo tipos que não impactam no salário...")
+        df_sec, removidas_sec = aplicar_exclusao(df_sec, regras)
+        df_sis, removidas_sis = aplicar_exclusao(df_sis, regras)
+        resumo_exclusao({"secretaria": removidas_sec, "sistema": removidas_sis})
+    
     print("Normalizando...")
     df_sec = normalizar(df_sec)
     df_sis = normalizar(df_sis)
     
-    print("Comparando...")
-    df_resultado = comparar(df_sec, df_sis)
-    
-    df_divergencias = df_resultado[
-        df_resultado["status"] != "OK"
-    ].copy()
+    if args.intervalos:
+        df_divergencias = salvar_intervalos(df_sec, df_sis)
+        if args.aviso:
+            gerar_aviso(df_divergencias, args.nomes or arquivo_sistema)
+        print("✔ Finalizado!")
+        return
     
-    
-    df_divergencias = df_divergencias[[
-        "funcional_sec",
-        "data_sec",
-        "ocorrencia_sec",
-        "ocorrencia_sis",
-        "status"
-    ]].sort_values(by=["funcional_sec", "data_sec"])
+    print("Comparando...")
+    if args.calendario:
+        df_divergencias = comparar_calendario(df_sec, df_sis)
+        df_aviso = df_divergencias
+    else:
+        df_resultado = comparar(df_sec, df_sis)
+        
+        df_divergencias = df_resultado[
+            df_resultado["status"] != "OK"
+        ].copy()
+        
+        # aviso precisa de funcional/data dos dois lados (SÓ_SISTEMA)
+        df_aviso = df_divergencias
+        
+        df_divergencias = df_divergencias[[
+            "funcional_sec",
+            "data_sec",
+            "ocorrencia_sec",
+            "ocorrencia_sis",
+            "status"
+        ]].sort_values(by=["funcional_sec", "data_sec"])
 
     print("Salvando Excel...")
     with pd.ExcelWriter("resultado_comparacao.xlsx") as writer:
@@ -399,6 +470,9 @@ def main():
         df_sis.to_excel(writer, sheet_name="Sistema", index=False)
         df_divergencias.to_excel(writer, sheet_name="DIVERGENCIAS", index=False)
     
+    if args.aviso:
+        gerar_aviso(df_aviso, args.nomes or arquivo_sistema)
+    
     print("✔ Finalizado!")
 
 
@@ -1,13 +1,30 @@
-import pdfplumber
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 import re
 
+import cache_extracao
+import ocr
+from esquema import Colunas, chave_inteira, compactar, expandir, linhas_para_dataframe, transformar_categorias
+from exclusao import REGRAS_EXCLUSAO, aplicar_exclusao, regras_por_argumentos, resumo_exclusao
+from frequencia_v2 import extrair_sistema_ods
+from historico import BANCO_PADRAO, gravar_execucao
+from instrumentacao import Perfil, caminho_relatorio, modo_por_ambiente
+from comum.leitor_pdf import motor_para
+from paralelo import extrair_paginas, extrair_paginas_fluxo, workers_padrao
+from saida import FORMATOS, salvar_resultado
+
 # =========================
 # PADRÕES
 # =========================
 PADRAO_FUNCIONAL = re.compile(r"\d{2}\.\d{3}-\d")
 PADRAO_DATA = re.compile(r"\d{2}/\d{2}/\d{4}")
 
+# mudar sempre que a extração mudar (invalida o cache)
+VERSAO_EXTRATOR = "5.2"
+
 IGNORAR_LINHAS = [
     "REFERENTE",
     "DATA IMPRESS",
@@ -62,168 +79,222 @@ def limpar_ocorrencia(ocorrencia, funcional, data):
 # =========================
 # EXTRAÇÃO - SECRETARIA
 # =========================
-def extrair_secretaria(pdf_path):
+def processar_pagina_secretaria(pagina):
     dados = []
     
-    with pdfplumber.open(pdf_path) as pdf:
-        for pagina in pdf.pages:
-            
-            tabelas = pagina.extract_tables()
-            
-            if tabelas:
-                for tabela in tabelas:
-                    for linha in tabela:
-                        if not linha:
-                            continue
-                        
-                        linha_txt = " ".join([str(x) for x in linha if x])
-                        
-                        if not linha_util(linha_txt):
-                            continue
-                        
-                        funcional = None
-                        data = None
-                        
-                        for item in linha:
-                            if not item:
-                                continue
-                            
-                            if not funcional:
-                                m = PADRAO_FUNCIONAL.search(item)
-                                if m:
-                                    funcional = m.group()
-                            
-                            if not data:
-                                m = PADRAO_DATA.search(item)
-                                if m:
-                                    data = m.group()
-                        
-                        ocorrencia = limpar_ocorrencia(linha_txt, funcional, data)
-                        
-                        dados.append({
-                            "funcional": funcional,
-                            "data": data,
-                            "ocorrencia": ocorrencia,
-                            "origem": "secretaria"
-                        })
-            
-            else:
-                texto = pagina.extract_text()
-                if not texto:
+    tabelas = pagina.extract_tables()
+    
+    if tabelas:
+        for tabela in tabelas:
+            for linha in tabela:
+                if not linha:
                     continue
                 
-                for linha in texto.split("\n"):
-                    
-                    if not linha_util(linha):
+                linha_txt = " ".join([str(x) for x in linha if x])
+                
+                if not linha_util(linha_txt):
+                    continue
+                
+                funcional = None
+                data = None
+                
+                for item in linha:
+                    if not item:
                         continue
                     
-                    m_func = PADRAO_FUNCIONAL.search(linha)
-                    m_data = PADRAO_DATA.search(linha)
+                    if not funcional:
+                        m = PADRAO_FUNCIONAL.search(item)
+                        if m:
+                            funcional = m.group()
+                    
+                    if not data:
+                        m = PADRAO_DATA.search(item)
+                        if m:
+                            data = m.group()
+                
+                ocorrencia = limpar_ocorrencia(linha_txt, funcional, data)
+                
+                dados.append({
+                    "funcional": funcional,
+                    "data": data,
+                    "ocorrencia": ocorrencia,
+                    "origem": "secretaria"
+                })
+    
+    else:
+        dados = linhas_texto_secretaria(pagina.extract_text())
+    
+    return dados
 
-                    if not m_func or not m_data:
-                        continue
 
-                    funcional = m_func.group()
-                    data = m_data.group()
-                    
-                    ocorrencia = limpar_ocorrencia(linha, funcional, data)
-                    
-                    dados.append({
-                        "funcional": funcional,
-                        "data": data,
-                        "ocorrencia": ocorrencia,
-                        "origem": "secretaria"
-                    })
+def linhas_texto_secretaria(texto):
+    # página sem tabela: texto extraído ou reconhecido pelo OCR
+    dados = []
+    
+    if not texto:
+        return dados
+    
+    for linha in texto.split("\n"):
+        
+        if not linha_util(linha):
+            continue
+        
+        m_func = PADRAO_FUNCIONAL.search(linha)
+        m_data = PADRAO_DATA.search(linha)
+
+        if not m_func or not m_data:
+            continue
+
+        funcional = m_func.group()
+        data = m_data.group()
+        
+        ocorrencia = limpar_ocorrencia(linha, funcional, data)
+        
+        dados.append({
+            "funcional": funcional,
+            "data": data,
+            "ocorrencia": ocorrencia,
+            "origem": "secretaria"
+        })
+    
+    return dados
+
+
+def linhas_ocr(pdf_path, vazias, workers=None):
+    """
+    Linhas das páginas digitalizadas entre `vazias`: {indice: linhas}.
+    """
+    return ocr.completar_paginas(pdf_path, {}, vazias, linhas_texto_secretaria, workers)
+
+
+def completar_ocr(pdf_path, paginas, workers=None):
+    # as páginas digitalizadas entram na posição delas
+    vazias = [i for i, linhas in enumerate(paginas) if not linhas]
+    return ocr.completar_paginas(pdf_path, paginas, vazias, linhas_texto_secretaria, workers)
+
+
+def extrator_secretaria():
+    # sem OCR as páginas digitalizadas ficam vazias: não reaproveita esse cache depois
+    return "secretaria_ocr" if ocr.disponivel() else "secretaria"
+
+
+def extrair_secretaria(pdf_path, workers=None, tempos=None):
+    paginas = extrair_paginas(pdf_path, processar_pagina_secretaria, workers, tempos)
     
-    return pd.DataFrame(dados)
+    return linhas_para_dataframe(completar_ocr(pdf_path, paginas, workers))
 
 
 # =========================
 # EXTRAÇÃO - SISTEMA
 # =========================
-def extrair_sistema(pdf_path):
+def processar_pagina_sistema(pagina):
     dados = []
     
-    with pdfplumber.open(pdf_path) as pdf:
-        for pagina in pdf.pages:
-            texto = pagina.extract_text()
-            if not texto:
-                continue
-            
-            for linha in texto.split("\n"):
-                
-                if not linha_util(linha):
-                    continue
-                
-                m_func = PADRAO_FUNCIONAL.search(linha)
-                m_data = PADRAO_DATA.search(linha)
+    texto = pagina.extract_text()
+    if not texto:
+        return dados
+    
+    for linha in texto.split("\n"):
+        
+        if not linha_util(linha):
+            continue
+        
+        m_func = PADRAO_FUNCIONAL.search(linha)
+        m_data = PADRAO_DATA.search(linha)
 
-                if not m_func or not m_data:
-                    continue
+        if not m_func or not m_data:
+            continue
 
-                funcional = m_func.group()
-                data = m_data.group()
-                
-                ocorrencia = limpar_ocorrencia(linha, funcional, data)
-                
-                dados.append({
-                    "funcional": funcional,
-                    "data": data,
-                    "ocorrencia": ocorrencia,
-                    "origem": "sistema"
-                })
+        funcional = m_func.group()
+        data = m_data.group()
+        
+        ocorrencia = limpar_ocorrencia(linha, funcional, data)
+        
+        dados.append({
+            "funcional": funcional,
+            "data": data,
+            "ocorrencia": ocorrencia,
+            "origem": "sistema"
+        })
+    
+    return dados
+
+
+def extrair_sistema(pdf_path, workers=None, tempos=None):
+    # relatório só de texto: pode usar o motor calibrado (comum/leitor_pdf.py)
+    paginas = extrair_paginas(pdf_path, processar_pagina_sistema, workers, tempos, motor=motor_para("sistema"))
     
-    return pd.DataFrame(dados)
+    return linhas_para_dataframe(paginas)
 
 
 # =========================
 # NORMALIZAÇÃO
 # =========================
-def normalizar(df):
-    df["ocorrencia"] = (
-        df["ocorrencia"]
-        .astype(str)
-        .str.upper()
-        .str.replace(r"\s+", " ", regex=True)
-        .str.strip()
+def normalizar_linhas(df):
+    # esquema tipado: as transformações de texto rodam só nas categorias
+    df = compactar(df)
+    
+    df["ocorrencia"] = transformar_categorias(
+        df["ocorrencia"],
+        lambda s: s.astype(str).str.upper().str.replace(r"\s+", " ", regex=True).str.strip()
     )
     
     # 🔥 REMOVE NOMES (sem destruir ocorrência)
-    df["ocorrencia_limpa"] = (
-        df["ocorrencia"]
-        .str.replace(r"\b[A-ZÀ-Ú]{2,}\b", "", regex=True)
+    df["ocorrencia_limpa"] = transformar_categorias(
+        df["ocorrencia"],
+        lambda s: s.str.replace(r"\b[A-ZÀ-Ú]{2,}\b", "", regex=True)
         .str.replace(r"\s+", " ", regex=True)
         .str.strip()
     )
     
-    # chave baseada no essencial
-    df["chave"] = (
-        df["funcional"].astype(str).str.strip() + "_" +
-        df["ocorrencia_limpa"]
-    )
-    
-    df = df.drop_duplicates(subset=["chave"])
+    # chave baseada no essencial (funcional + ocorrência limpa, em inteiro)
+    df["chave"] = chave_inteira(df["funcional"], df["ocorrencia_limpa"])
     
     return df
 
 
+def normalizar(df):
+    # uma linha por chave (funcional + ocorrência limpa) para a comparação
+    return normalizar_linhas(df).drop_duplicates(subset=["chave"])
+
+
+def status_nas_linhas(linhas, comparado):
+    """
+    Leva o status de `comparado` (uma linha por chave) para todas as
+    `linhas` normalizadas, sem deduplicar, com a mesma chave.
+    """
+    status = pd.Series(comparado["status"].to_numpy(), index=comparado["chave"].to_numpy())
+    return linhas.assign(status=pd.Categorical(linhas["chave"].map(status), categories=STATUS))
+
+
 # =========================
 # COMPARAÇÃO
 # =========================
-def comparar(df_sec, df_sis):
+def chaves_em_comum(chaves_a, chaves_b):
+    """
+    Máscaras booleanas: quais chaves de A existem em B e vice-versa.
+
+    As chaves dos dois lados viram códigos inteiros num único factorize
+    e o teste de pertinência é feito em numpy, sem laço em Python.
+    """
+    codigos, _ = pd.factorize(pd.concat([chaves_a, chaves_b], ignore_index=True))
     
-    sec_keys = set(df_sec["chave"])
-    sis_keys = set(df_sis["chave"])
+    codigos_a = codigos[:len(chaves_a)]
+    codigos_b = codigos[len(chaves_a):]
     
-    iguais = sec_keys & sis_keys
+    return np.isin(codigos_a, codigos_b), np.isin(codigos_b, codigos_a)
+
+
+STATUS = ["OK", "SÓ_SECRETARIA", "SÓ_SISTEMA"]
+
+
+def comparar(df_sec, df_sis):
     
-    df_sec["status"] = df_sec["chave"].apply(
-        lambda x: "OK" if x in iguais else "SÓ_SECRETARIA"
-    )
+    # chave presente nos dois lados = OK
+    em_sis, em_sec = chaves_em_comum(df_sec["chave"], df_sis["chave"])
     
-    df_sis["status"] = df_sis["chave"].apply(
-        lambda x: "OK" if x in iguais else "SÓ_SISTEMA"
-    )
+    df_sec["status"] = pd.Categorical(np.where(em_sis, "OK", "SÓ_SECRETARIA"), categories=STATUS)
+    df_sis["status"] = pd.Categorical(np.where(em_sec, "OK", "SÓ_SISTEMA"), categories=STATUS)
     
     return df_sec, df_sis
 
@@ -231,23 +302,130 @@ def comparar(df_sec, df_sis):
 # =========================
 # EXECUÇÃO
 # =========================
-def main():
-    arquivo_secretaria = "116 - secretaria.pdf"
-    arquivo_sistema = "116 - sistema.pdf"
-    
-    print("Lendo secretaria...")
-    df_sec = extrair_secretaria(arquivo_secretaria)
-    
-    print("Lendo sistema...")
-    df_sis = extrair_sistema(arquivo_sistema)
-    
-    print("Normalizando...")
-    df_sec = normalizar(df_sec)
-    df_sis = normalizar(df_sis)
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compara frequência secretaria x sistema")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="processos para extrair páginas em paralelo (0 = todos os núcleos)"
+    )
+    parser.add_argument(
+        "--sem-cache", action="store_true",
+        help="ignora o cache de extração e relê os PDFs"
+    )
+    parser.add_argument(
+        "--limpar-cache", action="store_true",
+        help="apaga o cache de extração antes de rodar"
+    )
+    parser.add_argument(
+        "--perfil", action="store_const", const="json",
+        help="grava tempo/linhas/memória por etapa em resultado_comparacao_perfil.json"
+    )
+    parser.add_argument(
+        "--perfil-resumo", dest="perfil", action="store_const", const="resumo",
+        help="igual a --perfil e mostra a tabela no terminal"
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="reextrai só as páginas alteradas e gera a aba DELTA em relação à última execução"
+    )
+    parser.add_argument(
+        "--formato", choices=FORMATOS, default="xlsx",
+        help="xlsx (padrão) ou um arquivo parquet/csv por aba"
+    )
+    parser.add_argument(
+        "--so-divergencias", action="store_true",
+        help="grava só DIVERGENCIAS e um RESUMO com as contagens"
+    )
+    parser.add_argument(
+        "--excluir", nargs="+", metavar="OCORRENCIA",
+        help="tipos retirados antes da comparação (padrão: " + ", ".join(REGRAS_EXCLUSAO) + ")"
+    )
+    parser.add_argument(
+        "--sem-exclusao", action="store_true",
+        help="compara todos os tipos de ocorrência"
+    )
+    parser.add_argument(
+        "--historico", nargs="?", const=BANCO_PADRAO,
+        help=f"acrescenta a execução ao histórico SQLite (padrão: {BANCO_PADRAO})"
+    )
+    return parser.parse_args()
+
+
+def ler_entrada(caminho, extrator, extrair, usar_cache=True):
+    if not usar_cache:
+        return extrair()
     
-    print("Comparando...")
-    df_sec, df_sis = comparar(df_sec, df_sis)
+    return cache_extracao.com_cache(caminho, extrator, VERSAO_EXTRATOR, extrair)
+
+
+def extrair_sistema_arquivo(caminho, workers=None, tempos=None):
+    # sistema pode vir em PDF (relatório) ou ODS (exportação)
+    if caminho.lower().endswith(".ods"):
+        return compactar(extrair_sistema_ods(caminho))
     
+    return extrair_sistema(caminho, workers, tempos)
+
+
+def _consumir_paginas(fluxo, tempos=None, completar=None):
+    # monta as colunas tipadas enquanto as páginas seguintes ainda são extraídas;
+    # `completar(vazias)` devolve {indice: linhas} para as páginas que vieram vazias
+    colunas = Colunas()
+    vazias = []
+    contagens = []
+    for i, (resultado, segundos) in enumerate(fluxo):
+        colunas.adicionar_linhas(resultado)
+        contagens.append(len(resultado))
+        if not resultado:
+            vazias.append(i)
+        if tempos is not None:
+            tempos.append(round(segundos, 4))
+    
+    ocr_linhas = {}
+    if completar is not None:
+        ocr_linhas = {i: linhas for i, linhas in completar(vazias).items() if linhas}
+    
+    if not ocr_linhas:
+        return colunas.para_dataframe()
+    
+    # as linhas do OCR entram no fim das colunas: volta para a ordem das páginas
+    paginas = list(range(len(contagens))) + sorted(ocr_linhas)
+    for i in sorted(ocr_linhas):
+        colunas.adicionar_linhas(ocr_linhas[i])
+        contagens.append(len(ocr_linhas[i]))
+    
+    ordem = np.argsort(np.repeat(paginas, contagens), kind="stable")
+    return colunas.para_dataframe().iloc[ordem].reset_index(drop=True)
+
+
+def ler_entradas(arquivo_secretaria, arquivo_sistema, workers=1, usar_cache=True, tempos=None):
+    """
+    Lê secretaria e sistema ao mesmo tempo, num pool de `workers`
+    processos só (reconciliar só chama com workers > 1).
+
+    Cada arquivo tem uma thread que manda blocos de páginas para o pool
+    (fila limitada, ver extrair_paginas_fluxo) e vai montando o DataFrame
+    com o que já voltou. O ODS do sistema vai inteiro para um processo.
+    O tempo total fica perto do arquivo mais lento, não da soma.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor, ThreadPoolExecutor(max_workers=2) as threads:
+        def secretaria():
+            fluxo = extrair_paginas_fluxo(arquivo_secretaria, processar_pagina_secretaria, executor)
+            return _consumir_paginas(fluxo, tempos, lambda vazias: linhas_ocr(arquivo_secretaria, vazias, workers))
+
+        def sistema():
+            if arquivo_sistema.lower().endswith(".ods"):
+                return executor.submit(extrair_sistema_arquivo, arquivo_sistema).result()
+            fluxo = extrair_paginas_fluxo(
+                arquivo_sistema, processar_pagina_sistema, executor, motor=motor_para("sistema")
+            )
+            return _consumir_paginas(fluxo, tempos)
+
+        futuro_sec = threads.submit(ler_entrada, arquivo_secretaria, extrator_secretaria(), secretaria, usar_cache)
+        futuro_sis = threads.submit(ler_entrada, arquivo_sistema, "sistema", sistema, usar_cache)
+        return futuro_sec.result(), futuro_sis.result()
+
+
+def montar_divergencias(df_sec, df_sis):
     divergencias_sec = df_sec[df_sec["status"] == "SÓ_SECRETARIA"].copy()
     divergencias_sis = df_sis[df_sis["status"] == "SÓ_SISTEMA"].copy()
     
@@ -256,15 +434,144 @@ def main():
     
     df_divergencias = pd.concat([divergencias_sec, divergencias_sis])
     
-    df_divergencias = df_divergencias[[
+    return df_divergencias[[
         "funcional", "data", "ocorrencia", "tipo_erro"
     ]].sort_values(by=["funcional", "data"])
+
+
+def excluir_ocorrencias(df_sec, df_sis, regras, log=print):
+    df_sec, removidas_sec = aplicar_exclusao(df_sec, regras)
+    df_sis, removidas_sis = aplicar_exclusao(df_sis, regras)
+    
+    resumo_exclusao({"secretaria": removidas_sec, "sistema": removidas_sis}, log)
+    
+    return df_sec, df_sis
+
+
+def reconciliar(arquivo_secretaria, arquivo_sistema, workers=1, usar_cache=True, log=print, perfil=None,
+                regras=REGRAS_EXCLUSAO, concorrente=True, brutos=None):
+    """
+    `brutos` (dict), se informado, recebe as linhas de cada lado depois da
+    exclusão, normalizadas mas sem deduplicar (um registro por dia), com
+    o status da comparação: é o que vai para o aviso e o histórico.
+    """
+    if perfil is None:
+        perfil = Perfil()
+    
+    # leitura simultânea só quando o usuário pediu mais de um processo
+    if concorrente and workers > 1:
+        log("Lendo secretaria e sistema...")
+        with perfil.etapa("extração secretaria + sistema") as etapa:
+            etapa["paginas"] = []
+            df_sec, df_sis = ler_entradas(
+                arquivo_secretaria, arquivo_sistema, workers, usar_cache, etapa["paginas"]
+            )
+            etapa["linhas"] = len(df_sec) + len(df_sis)
+    else:
+        log("Lendo secretaria...")
+        with perfil.etapa("extração secretaria") as etapa:
+            etapa["paginas"] = []
+            df_sec = ler_entrada(
+                arquivo_secretaria, extrator_secretaria(),
+                lambda: extrair_secretaria(arquivo_secretaria, workers, etapa["paginas"]),
+                usar_cache
+            )
+            etapa["linhas"] = len(df_sec)
+    
+        log("Lendo sistema...")
+        with perfil.etapa("extração sistema") as etapa:
+            etapa["paginas"] = []
+            df_sis = ler_entrada(
+                arquivo_sistema, "sistema",
+                lambda: extrair_sistema_arquivo(arquivo_sistema, workers, etapa["paginas"]),
+                usar_cache
+            )
+            etapa["linhas"] = len(df_sis)
+    
+    if regras:
+        log("Excluindo tipos que não impactam no salário...")
+        with perfil.etapa("exclusão") as etapa:
+            df_sec, df_sis = excluir_ocorrencias(df_sec, df_sis, regras, log)
+            etapa["linhas"] = len(df_sec) + len(df_sis)
+    
+    log("Normalizando...")
+    with perfil.etapa("normalização") as etapa:
+        linhas_sec = normalizar_linhas(df_sec)
+        linhas_sis = normalizar_linhas(df_sis)
+        df_sec = linhas_sec.drop_duplicates(subset=["chave"])
+        df_sis = linhas_sis.drop_duplicates(subset=["chave"])
+        etapa["linhas"] = len(df_sec) + len(df_sis)
+    
+    log("Comparando...")
+    with perfil.etapa("comparação") as etapa:
+        df_sec, df_sis = comparar(df_sec, df_sis)
+        df_divergencias = montar_divergencias(df_sec, df_sis)
+        etapa["linhas"] = len(df_divergencias)
+    
+    if brutos is not None:
+        brutos["secretaria"] = status_nas_linhas(linhas_sec, df_sec)
+        brutos["sistema"] = status_nas_linhas(linhas_sis, df_sis)
+    
+    return df_sec, df_sis, df_divergencias
+
+
+def main():
+    args = parse_args()
+    workers = args.workers if args.workers > 0 else workers_padrao()
+    usar_cache = not args.sem_cache
+    regras = regras_por_argumentos(args.excluir, args.sem_exclusao)
+    
+    if args.limpar_cache:
+        removidas = cache_extracao.invalidar_cache()
+        print(f"Cache limpo ({removidas} entradas)")
+    
+    arquivo_secretaria = "116 - secretaria.pdf"
+    arquivo_sistema = "116 - sistema.pdf"
     
-    print("Salvando Excel...")
-    with pd.ExcelWriter("resultado_comparacao.xlsx") as writer:
-        df_sec.to_excel(writer, sheet_name="Secretaria", index=False)
-        df_sis.to_excel(writer, sheet_name="Sistema", index=False)
-        df_divergencias.to_excel(writer, sheet_name="DIVERGENCIAS", index=False)
+    arquivo_saida = "resultado_comparacao.xlsx"
+    
+    perfil = Perfil(args.perfil or modo_por_ambiente())
+    
+    # o histórico guarda todas as linhas (um registro por dia), não só as deduplicadas
+    brutos = {} if args.historico else None
+    
+    df_delta = None
+    if args.incremental:
+        # import local: incremental importa este módulo
+        import incremental
+        with perfil.etapa("reconciliação incremental") as etapa:
+            df_sec, df_sis, df_divergencias, df_delta = incremental.reconciliar(
+                arquivo_secretaria, arquivo_sistema, workers, regras=regras, brutos=brutos
+            )
+            etapa["linhas"] = len(df_divergencias)
+    else:
+        df_sec, df_sis, df_divergencias = reconciliar(
+            arquivo_secretaria, arquivo_sistema, workers, usar_cache, perfil=perfil, regras=regras,
+            brutos=brutos
+        )
+    
+    print(f"Salvando resultado ({args.formato})...")
+    with perfil.etapa("escrita resultado") as etapa:
+        # planilha em texto, no formato de sempre
+        df_sec, df_sis, df_divergencias = expandir(df_sec), expandir(df_sis), expandir(df_divergencias)
+        extras = {"DELTA": expandir(df_delta)} if df_delta is not None else None
+        
+        salvar_resultado(
+            arquivo_saida, df_sec, df_sis, df_divergencias, extras,
+            formato=args.formato, so_divergencias=args.so_divergencias
+        )
+        etapa["linhas"] = len(df_divergencias) if args.so_divergencias else len(df_sec) + len(df_sis) + len(df_divergencias)
+    
+    if args.historico:
+        print("Gravando histórico...")
+        with perfil.etapa("histórico sqlite") as etapa:
+            gravar_execucao(
+                brutos["secretaria"], brutos["sistema"], df_divergencias,
+                arquivo_secretaria, arquivo_sistema, args.historico
+            )
+            etapa["linhas"] = len(brutos["secretaria"]) + len(brutos["sistema"]) + len(df_divergencias)
+    
+    perfil.salvar(caminho_relatorio(arquivo_saida))
     
     print("✔ Finalizado!")
 
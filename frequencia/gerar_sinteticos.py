@@ -0,0 +1,190 @@
+import argparse
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Table, TableStyle
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from comum.benchmark_ods import escrever_ods
+
+
+# =========================
+# GERADOR DE ARQUIVOS SINTÉTICOS
+# =========================
+# Gera "secretaria.pdf" e "sistema.(ods|pdf)" parecidos com os reais,
+# sem dados de servidores, para medir a extração e a comparação.
+OCORRENCIAS = [
+    "TRATAMENTO DE SAÚDE",
+    "FALTA",
+    "ABONO",
+    "LICENÇA MÉDICA",
+    "DOENÇA EM PESSOA DA FAMÍLIA",
+    "AGUARDANDO PERÍCIA SEMPEM",
+    "Licença maternidade prorrogação",
+    "NOJO",
+]
+
+NOMES = ["ANA", "JOAO", "MARIA", "JOSE", "LUCIANA", "MARCO", "PAULO", "SILVA", "SOUZA", "COSTA", "LIMA"]
+
+LINHAS_POR_PAGINA = 30
+
+
+def funcional(i):
+    n = 100000 + i * 7
+    return f"{n // 10000:02d}.{n // 10 % 1000:03d}-{n % 10}"
+
+
+def gerar_ocorrencias(funcionarios, mes=date(2026, 4, 1), media=3, semente=0):
+    """
+    "Verdade" do mês: [(funcional, nome, data, ocorrencia)], ordenado.
+    """
+    rng = random.Random(semente)
+    linhas = []
+
+    for i in range(funcionarios):
+        nome = " ".join(rng.sample(NOMES, 3))
+        dias = rng.sample(range(28), min(28, rng.randint(0, media * 2)))
+        ocorrencia = rng.choice(OCORRENCIAS)
+
+        for d in sorted(dias):
+            linhas.append((funcional(i), nome, mes + timedelta(days=d), ocorrencia))
+
+    return linhas
+
+
+def aplicar_divergencias(linhas, taxa, semente=1):
+    """
+    Cópia das linhas para o sistema com uma fração `taxa` de divergências:
+    linhas faltando, ocorrências trocadas e linhas a mais.
+    """
+    rng = random.Random(semente)
+    sistema = []
+
+    for func, nome, data, ocorrencia in linhas:
+        sorteio = rng.random()
+        if sorteio < taxa / 3:
+            continue  # só na secretaria
+        if sorteio < 2 * taxa / 3:
+            ocorrencia = rng.choice([o for o in OCORRENCIAS if o != ocorrencia])
+        sistema.append((func, nome, data, ocorrencia))
+
+        if rng.random() < taxa / 3:
+            sistema.append((func, nome, data + timedelta(days=1), ocorrencia))  # só no sistema
+
+    return sistema
+
+
+def _quebrar(linhas, tamanho):
+    for i in range(0, len(linhas), tamanho):
+        yield linhas[i:i + tamanho]
+
+
+def gerar_pdf_secretaria(caminho, linhas, layout="misto", quebradas=0.1, semente=2):
+    """
+    layout: "tabela", "texto" ou "misto" (páginas alternadas). Em
+    `quebradas` das linhas da tabela a célula funcional vem vazia, como
+    nas linhas quebradas dos PDFs reais.
+    """
+    rng = random.Random(semente)
+    estilo = getSampleStyleSheet()["Normal"]
+    elementos = []
+
+    for n, pagina in enumerate(_quebrar(linhas, LINHAS_POR_PAGINA)):
+        usar_tabela = layout == "tabela" or (layout == "misto" and n % 2 == 0)
+
+        elementos.append(Paragraph(f"SECRETARIA SINTÉTICA - PÁGINA {n + 1}", estilo))
+
+        if usar_tabela:
+            dados = [["Funcional", "Nome", "Data", "Ocorrência"]]
+            anterior = None
+            for func, nome, data, ocorrencia in pagina:
+                mostra = func if func != anterior or rng.random() >= quebradas else ""
+                dados.append([mostra, nome, f"{data:%d/%m/%Y}", ocorrencia])
+                anterior = func
+
+            tabela = Table(dados)
+            tabela.setStyle(TableStyle([
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+                ("FONTSIZE", (0, 0), (-1, -1), 7),
+            ]))
+            elementos.append(tabela)
+        else:
+            for func, nome, data, ocorrencia in pagina:
+                elementos.append(Paragraph(f"{func} {nome} {data:%d/%m/%Y} {ocorrencia}", estilo))
+
+        elementos.append(PageBreak())
+
+    SimpleDocTemplate(caminho, pagesize=A4).build(elementos)
+
+
+def gerar_pdf_sistema(caminho, linhas):
+    estilo = getSampleStyleSheet()["Normal"]
+    elementos = []
+
+    for pagina in _quebrar(linhas, LINHAS_POR_PAGINA):
+        for func, nome, data, ocorrencia in pagina:
+            elementos.append(Paragraph(f"{func} {nome} {data:%d/%m/%Y} {ocorrencia}", estilo))
+        elementos.append(PageBreak())
+
+    SimpleDocTemplate(caminho, pagesize=A4).build(elementos)
+
+
+def gerar_ods_sistema(caminho, linhas):
+    escrever_ods(
+        caminho,
+        ["FUNCIONÁRIO", "NOME", "DATA INICIAL", "QTDE DIAS", "DESCRIÇÃO"],
+        [[func, nome, data, 1, ocorrencia] for func, nome, data, ocorrencia in linhas],
+    )
+
+
+def gerar_conjunto(pasta, codigo="999", funcionarios=200, divergencia=0.05, layout="misto", quebradas=0.1, semente=0):
+    """
+    Grava "<codigo> - secretaria.pdf", "<codigo> - sistema.pdf" e
+    "<codigo> - sistema.ods" em `pasta` e devolve os caminhos.
+    """
+    os.makedirs(pasta, exist_ok=True)
+
+    secretaria = gerar_ocorrencias(funcionarios, semente=semente)
+    sistema = aplicar_divergencias(secretaria, divergencia, semente=semente + 1)
+
+    caminhos = {
+        "secretaria": os.path.join(pasta, f"{codigo} - secretaria.pdf"),
+        "sistema_pdf": os.path.join(pasta, f"{codigo} - sistema.pdf"),
+        "sistema_ods": os.path.join(pasta, f"{codigo} - sistema.ods"),
+    }
+
+    gerar_pdf_secretaria(caminhos["secretaria"], secretaria, layout, quebradas, semente + 2)
+    gerar_pdf_sistema(caminhos["sistema_pdf"], sistema)
+    gerar_ods_sistema(caminhos["sistema_ods"], sistema)
+
+    return caminhos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera PDFs/ODS sintéticos de frequência")
+    parser.add_argument("pasta", nargs="?", default="sinteticos")
+    parser.add_argument("--codigo", default="999")
+    parser.add_argument("--funcionarios", type=int, default=200)
+    parser.add_argument("--divergencia", type=float, default=0.05)
+    parser.add_argument("--layout", choices=["tabela", "texto", "misto"], default="misto")
+    parser.add_argument("--quebradas", type=float, default=0.1)
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    caminhos = gerar_conjunto(
+        args.pasta, args.codigo, args.funcionarios, args.divergencia,
+        args.layout, args.quebradas, args.semente
+    )
+
+    for caminho in caminhos.values():
+        print(caminho)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+import argparse
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+
+from esquema import expandir
+from intervalos import expandir_periodos
+from ocorrencias import classificar_ocorrencia, classificar_serie
+
+
+# =========================
+# HISTÓRICO EM SQLITE
+# =========================
+# Cada execução grava as linhas da secretaria, do sistema e as
+# divergências num banco local, para consultar meses anteriores sem
+# abrir as planilhas.
+BANCO_PADRAO = os.environ.get("FREQUENCIA_HISTORICO", "historico_frequencia.db")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id INTEGER PRIMARY KEY,
+    secretaria TEXT,
+    competencia TEXT,
+    arquivo_secretaria TEXT,
+    arquivo_sistema TEXT,
+    executado_em TEXT
+);
+
+CREATE TABLE IF NOT EXISTS ocorrencias (
+    execucao_id INTEGER REFERENCES execucoes(id),
+    origem TEXT,
+    funcional TEXT,
+    data TEXT,
+    ocorrencia TEXT,
+    texto TEXT,
+    status TEXT
+);
+
+CREATE TABLE IF NOT EXISTS divergencias (
+    execucao_id INTEGER REFERENCES execucoes(id),
+    funcional TEXT,
+    data TEXT,
+    ocorrencia TEXT,
+    tipo_erro TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_ocorrencias_funcional_data ON ocorrencias (funcional, data);
+CREATE INDEX IF NOT EXISTS idx_ocorrencias_ocorrencia_data ON ocorrencias (ocorrencia, data);
+CREATE INDEX IF NOT EXISTS idx_divergencias_funcional_data ON divergencias (funcional, data);
+CREATE INDEX IF NOT EXISTS idx_divergencias_execucao ON divergencias (execucao_id);
+"""
+
+PADRAO_CODIGO = re.compile(r"^(\d+)")
+
+
+def conectar(banco=BANCO_PADRAO):
+    conexao = sqlite3.connect(banco)
+    conexao.executescript(ESQUEMA)
+    return conexao
+
+
+def codigo_secretaria(caminho):
+    # "116 - secretaria.pdf" -> "116"
+    m = PADRAO_CODIGO.match(os.path.basename(caminho))
+    return m.group(1) if m else os.path.basename(caminho)
+
+
+def data_iso(datas):
+    """
+    dd/mm/aaaa -> aaaa-mm-dd (ordena e filtra por ano/mês no índice).
+    """
+    datas = datas.astype(str).str.strip()
+    iso = datas.str[6:10] + "-" + datas.str[3:5] + "-" + datas.str[0:2]
+    return iso.where(datas.str.match(r"^\d{2}/\d{2}/\d{4}$"), None)
+
+
+def _linhas_ocorrencias(execucao_id, df, origem):
+    if df.empty:
+        return []
+
+    texto = df["ocorrencia"].astype(object)
+
+    tabela = pd.DataFrame({
+        "execucao_id": execucao_id,
+        "origem": origem,
+        "funcional": df["funcional"].astype(object),
+        "data": data_iso(df["data"]),
+        "ocorrencia": classificar_serie(texto),
+        "texto": texto,
+        "status": df["status"].astype(object) if "status" in df else None,
+    })
+
+    # em ordem de (funcional, data) o índice principal cresce quase em sequência
+    tabela = tabela.sort_values(["funcional", "data"], kind="stable")
+
+    return list(tabela.astype(object).where(tabela.notna(), None).itertuples(index=False, name=None))
+
+
+def gravar_execucao(df_sec, df_sis, df_divergencias, arquivo_secretaria, arquivo_sistema, banco=BANCO_PADRAO):
+    """
+    Acrescenta uma execução ao histórico e devolve o id dela.
+
+    df_sec e df_sis são as linhas sem deduplicar (`brutos` de
+    reconciliar); períodos do sistema (data_fim) viram um dia por linha.
+    """
+    df_sec = expandir_periodos(expandir(df_sec))
+    df_sis = expandir_periodos(expandir(df_sis))
+    df_divergencias = expandir(df_divergencias)
+
+    datas = data_iso(df_sec["data"]) if not df_sec.empty else pd.Series(dtype=object)
+    competencia = datas.dropna().str[:7].mode()
+    competencia = competencia.iloc[0] if not competencia.empty else None
+
+    with closing(conectar(banco)) as conexao, conexao:
+        cursor = conexao.execute(
+            "INSERT INTO execucoes (secretaria, competencia, arquivo_secretaria, arquivo_sistema, executado_em) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                codigo_secretaria(arquivo_secretaria), competencia,
+                os.path.basename(arquivo_secretaria), os.path.basename(arquivo_sistema),
+                datetime.now().isoformat(timespec="seconds"),
+            )
+        )
+        execucao_id = cursor.lastrowid
+
+        conexao.executemany(
+            "INSERT INTO ocorrencias VALUES (?, ?, ?, ?, ?, ?, ?)",
+            _linhas_ocorrencias(execucao_id, df_sec, "secretaria") + _linhas_ocorrencias(execucao_id, df_sis, "sistema")
+        )
+
+        if not df_divergencias.empty:
+            divergencias = pd.DataFrame({
+                "execucao_id": execucao_id,
+                "funcional": df_divergencias["funcional"].astype(object),
+                "data": data_iso(df_divergencias["data"]),
+                "ocorrencia": df_divergencias["ocorrencia"].astype(object),
+                "tipo_erro": df_divergencias["tipo_erro"].astype(object),
+            })
+            conexao.executemany(
+                "INSERT INTO divergencias VALUES (?, ?, ?, ?, ?)",
+                divergencias.astype(object).where(divergencias.notna(), None).itertuples(index=False, name=None)
+            )
+
+        # estatísticas para o planejador escolher o índice (funcional, data)
+        # quando a consulta filtra por funcional e ocorrência ao mesmo tempo
+        conexao.execute("PRAGMA analysis_limit = 1000")
+        conexao.execute("ANALYZE")
+
+    return execucao_id
+
+
+# =========================
+# CONSULTAS
+# =========================
+def _intervalo_ano(ano):
+    if ano is None:
+        return "0000-00-00", "9999-99-99"
+    return f"{ano}-01-01", f"{ano}-12-31"
+
+
+def ocorrencias_funcional(funcional, ocorrencia=None, ano=None, origem=None, banco=BANCO_PADRAO):
+    """
+    Ex.: todos os TRATAMENTO DE SAÚDE da funcional X em 2026.
+    """
+    inicio, fim = _intervalo_ano(ano)
+
+    sql = """
+        SELECT e.secretaria, e.competencia, o.origem, o.funcional, o.data, o.ocorrencia, o.texto, o.status
+        FROM ocorrencias o JOIN execucoes e ON e.id = o.execucao_id
+        WHERE o.funcional = ? AND o.data BETWEEN ? AND ?
+    """
+    parametros = [funcional, inicio, fim]
+
+    if ocorrencia:
+        sql += " AND o.ocorrencia = ?"
+        parametros.append(classificar_ocorrencia(ocorrencia))
+    if origem:
+        sql += " AND o.origem = ?"
+        parametros.append(origem)
+
+    sql += " ORDER BY o.data, o.origem"
+
+    with closing(conectar(banco)) as conexao:
+        return pd.read_sql_query(sql, conexao, params=parametros)
+
+
+def ocorrencias_por_tipo(ocorrencia, ano=None, banco=BANCO_PADRAO):
+    """
+    Todas as linhas de uma categoria (usa o índice ocorrencia, data).
+    """
+    inicio, fim = _intervalo_ano(ano)
+
+    with closing(conectar(banco)) as conexao:
+        return pd.read_sql_query(
+            """
+            SELECT e.secretaria, o.origem, o.funcional, o.data, o.texto, o.status
+            FROM ocorrencias o JOIN execucoes e ON e.id = o.execucao_id
+            WHERE o.ocorrencia = ? AND o.data BETWEEN ? AND ?
+            ORDER BY o.data, o.funcional
+            """,
+            conexao, params=[classificar_ocorrencia(ocorrencia), inicio, fim]
+        )
+
+
+def secretarias_mais_divergencias(ano=None, limite=10, banco=BANCO_PADRAO):
+    inicio, fim = _intervalo_ano(ano)
+
+    with closing(conectar(banco)) as conexao:
+        return pd.read_sql_query(
+            """
+            SELECT e.secretaria, COUNT(*) AS divergencias,
+                   COUNT(DISTINCT d.funcional) AS funcionais,
+                   COUNT(DISTINCT e.competencia) AS competencias
+            FROM divergencias d JOIN execucoes e ON e.id = d.execucao_id
+            WHERE d.data BETWEEN ? AND ?
+            GROUP BY e.secretaria
+            ORDER BY divergencias DESC
+            LIMIT ?
+            """,
+            conexao, params=[inicio, fim, limite]
+        )
+
+
+def execucoes(banco=BANCO_PADRAO):
+    with closing(conectar(banco)) as conexao:
+        return pd.read_sql_query("SELECT * FROM execucoes ORDER BY id", conexao)
+
+
+# =========================
+# EXECUÇÃO
+# =========================
+def main():
+    parser = argparse.ArgumentParser(description="Consulta o histórico de frequência (SQLite)")
+    parser.add_argument("--banco", default=BANCO_PADRAO)
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    funcional = comandos.add_parser("funcional", help="ocorrências de uma funcional")
+    funcional.add_argument("funcional")
+    funcional.add_argument("--ocorrencia", help='ex.: "TRATAMENTO DE SAÚDE"')
+    funcional.add_argument("--ano", type=int)
+    funcional.add_argument("--origem", choices=["secretaria", "sistema"])
+
+    tipo = comandos.add_parser("tipo", help="todas as linhas de um tipo de ocorrência")
+    tipo.add_argument("ocorrencia")
+    tipo.add_argument("--ano", type=int)
+
+    ranking = comandos.add_parser("ranking", help="secretarias com mais divergências")
+    ranking.add_argument("--ano", type=int)
+    ranking.add_argument("--limite", type=int, default=10)
+
+    comandos.add_parser("execucoes", help="execuções gravadas")
+
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    if args.comando == "funcional":
+        df = ocorrencias_funcional(args.funcional, args.ocorrencia, args.ano, args.origem, args.banco)
+    elif args.comando == "tipo":
+        df = ocorrencias_por_tipo(args.ocorrencia, args.ano, args.banco)
+    elif args.comando == "ranking":
+        df = secretarias_mais_divergencias(args.ano, args.limite, args.banco)
+    else:
+        df = execucoes(args.banco)
+    tempo = time.perf_counter() - inicio
+
+    with pd.option_context("display.max_rows", 200, "display.width", 200):
+        print(df.to_string(index=False) if not df.empty else "(nenhum resultado)")
+    print(f"\n{len(df)} linhas em {tempo * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
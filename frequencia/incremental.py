@@ -0,0 +1,238 @@
+import hashlib
+import os
+import pickle
+import sys
+
+import pandas as pd
+import pdfplumber
+from pdfminer.pdftypes import resolve1
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import cache_extracao
+import frequencia_v5
+import ocr
+from comum.leitor_pdf import REFERENCIA, motor_para
+from esquema import linhas_para_dataframe
+from exclusao import REGRAS_EXCLUSAO
+from frequencia_v5 import (
+    chaves_em_comum, comparar, excluir_ocorrencias, montar_divergencias, normalizar_linhas, status_nas_linhas
+)
+from paralelo import extrair_paginas
+
+
+# =========================
+# MODO INCREMENTAL
+# =========================
+# Quando a secretaria reenvia o PDF corrigido, só as páginas cujo
+# conteúdo mudou são extraídas de novo; as outras vêm da execução
+# anterior. A comparação é refeita só para os funcionais que mudaram e
+# o DELTA diz o que foi corrigido e o que passou a divergir.
+PASTA_INCREMENTAL = os.path.join(cache_extracao.PASTA_CACHE, "incremental")
+
+COLUNAS_DELTA = ["funcional", "data", "ocorrencia", "tipo_erro"]
+
+
+def impressao_pagina(pagina):
+    """
+    sha256 do content stream da página (+ tamanho, fontes e imagens).
+    """
+    h = hashlib.sha256()
+
+    objeto = pagina.page_obj
+    h.update(repr(objeto.mediabox).encode())
+    h.update(repr(sorted(resolve1(objeto.resources.get("Font")) or {})).encode())
+
+    for stream in objeto.contents:
+        h.update(resolve1(stream).get_data())
+
+    # páginas escaneadas têm o mesmo content stream; o que muda é a imagem
+    if pagina.images:
+        h.update(ocr.impressao_imagens(pagina).encode())
+
+    return h.hexdigest()
+
+
+def impressoes_paginas(pdf_path):
+    with pdfplumber.open(pdf_path) as pdf:
+        return [impressao_pagina(p) for p in pdf.pages]
+
+
+def _arquivo_estado(*partes, pasta=PASTA_INCREMENTAL):
+    nome = "__".join(os.path.basename(p) for p in partes)
+    return os.path.join(pasta, nome + ".pkl")
+
+
+def carregar_estado(arquivo):
+    if not os.path.exists(arquivo):
+        return None
+
+    with open(arquivo, "rb") as f:
+        return pickle.load(f)
+
+
+def gravar_estado(estado, arquivo):
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+
+    temporario = arquivo + ".tmp"
+    with open(temporario, "wb") as f:
+        pickle.dump(estado, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporario, arquivo)
+
+
+# =========================
+# EXTRAÇÃO POR PÁGINA
+# =========================
+def extrair_paginas_incremental(pdf_path, processar_pagina, extrator, versao, workers=None, pasta=PASTA_INCREMENTAL,
+                                motor=REFERENCIA):
+    """
+    Igual a `extrair_paginas`, mas reaproveita o resultado das páginas
+    cuja impressão já apareceu na versão anterior do mesmo arquivo.
+
+    Devolve (resultados, quantidade de páginas reextraídas).
+    """
+    arquivo = _arquivo_estado(f"{pdf_path}_{extrator}_v{versao}", pasta=pasta)
+    anteriores = carregar_estado(arquivo) or {}
+
+    impressoes = impressoes_paginas(pdf_path)
+    alteradas = [i for i, impressao in enumerate(impressoes) if impressao not in anteriores]
+
+    novas = extrair_paginas(pdf_path, processar_pagina, workers, paginas=alteradas, motor=motor)
+    anteriores.update(zip((impressoes[i] for i in alteradas), novas))
+
+    # guarda só as páginas da versão atual
+    atuais = {impressao: anteriores[impressao] for impressao in impressoes}
+    gravar_estado(atuais, arquivo)
+
+    return [atuais[impressao] for impressao in impressoes], len(alteradas)
+
+
+def extrair_secretaria(pdf_path, workers=None, log=print):
+    paginas, alteradas = extrair_paginas_incremental(
+        pdf_path, frequencia_v5.processar_pagina_secretaria,
+        "secretaria", frequencia_v5.VERSAO_EXTRATOR, workers
+    )
+    log(f"  {alteradas} de {len(paginas)} páginas reextraídas")
+
+    return linhas_para_dataframe(frequencia_v5.completar_ocr(pdf_path, paginas, workers))
+
+
+def extrair_sistema(caminho, workers=None, log=print):
+    # a exportação ODS não tem páginas: usa o cache do arquivo inteiro
+    if caminho.lower().endswith(".ods"):
+        return frequencia_v5.ler_entrada(
+            caminho, "sistema", lambda: frequencia_v5.extrair_sistema_arquivo(caminho)
+        )
+
+    paginas, alteradas = extrair_paginas_incremental(
+        caminho, frequencia_v5.processar_pagina_sistema,
+        "sistema", frequencia_v5.VERSAO_EXTRATOR, workers, motor=motor_para("sistema")
+    )
+    log(f"  {alteradas} de {len(paginas)} páginas reextraídas")
+    return linhas_para_dataframe(paginas)
+
+
+# =========================
+# COMPARAÇÃO INCREMENTAL
+# =========================
+def funcionais_alterados(df_novo, df_anterior):
+    """
+    Funcionais cujo conjunto de chaves mudou entre as duas execuções.
+    """
+    mudancas = df_novo[["funcional", "chave"]].merge(
+        df_anterior[["funcional", "chave"]], how="outer", indicator=True
+    )
+    return set(mudancas.loc[mudancas["_merge"] != "both", "funcional"])
+
+
+def comparar_incremental(df_sec, df_sis, anterior):
+    """
+    Reaproveita o status da execução anterior e roda `comparar` só nas
+    linhas dos funcionais que mudaram em algum dos lados.
+
+    Devolve (df_sec, df_sis, quantidade de funcionais recomparados).
+    """
+    if anterior is None:
+        df_sec, df_sis = comparar(df_sec, df_sis)
+        return df_sec, df_sis, df_sec["funcional"].nunique()
+
+    alterados = funcionais_alterados(df_sec, anterior["sec"]) | funcionais_alterados(df_sis, anterior["sis"])
+    alterados = pd.Series(sorted(alterados))
+
+    mascara_sec, _ = chaves_em_comum(df_sec["funcional"], alterados)
+    mascara_sis, _ = chaves_em_comum(df_sis["funcional"], alterados)
+
+    parte_sec, parte_sis = comparar(df_sec[mascara_sec].copy(), df_sis[mascara_sis].copy())
+
+    # funcionais sem mudança têm as mesmas chaves: o status não muda
+    df_sec["status"] = df_sec["chave"].map(anterior["sec"].set_index("chave")["status"])
+    df_sis["status"] = df_sis["chave"].map(anterior["sis"].set_index("chave")["status"])
+
+    df_sec.loc[mascara_sec, "status"] = parte_sec["status"]
+    df_sis.loc[mascara_sis, "status"] = parte_sis["status"]
+
+    return df_sec, df_sis, len(alterados)
+
+
+def montar_delta(div_anterior, div_atual):
+    """
+    CORRIGIDA: divergia na execução anterior e não diverge mais.
+    NOVA: passou a divergir nesta execução.
+    """
+    if div_anterior is None:
+        div_anterior = div_atual.iloc[0:0]
+
+    delta = div_anterior[COLUNAS_DELTA].merge(div_atual[COLUNAS_DELTA], how="outer", indicator=True)
+    delta = delta[delta["_merge"] != "both"].copy()
+
+    delta["situacao"] = delta["_merge"].map({"left_only": "CORRIGIDA", "right_only": "NOVA"}).astype(str)
+
+    return delta.drop(columns="_merge").sort_values(by=["situacao", "funcional", "data"])
+
+
+# =========================
+# EXECUÇÃO
+# =========================
+def reconciliar(arquivo_secretaria, arquivo_sistema, workers=1, log=print, pasta=PASTA_INCREMENTAL,
+                regras=REGRAS_EXCLUSAO, brutos=None):
+    """
+    Mesmo resultado de `frequencia_v5.reconciliar`, mais o DELTA em
+    relação à última execução com os mesmos nomes de arquivo.
+    `brutos` funciona como em `frequencia_v5.reconciliar`.
+    """
+    log("Lendo secretaria (incremental)...")
+    df_sec = extrair_secretaria(arquivo_secretaria, workers, log)
+
+    log("Lendo sistema (incremental)...")
+    df_sis = extrair_sistema(arquivo_sistema, workers, log)
+
+    # o estado por página guarda as linhas sem filtro; a exclusão vem depois
+    if regras:
+        log("Excluindo tipos que não impactam no salário...")
+        df_sec, df_sis = excluir_ocorrencias(df_sec, df_sis, regras, log)
+
+    log("Normalizando...")
+    linhas_sec = normalizar_linhas(df_sec)
+    linhas_sis = normalizar_linhas(df_sis)
+    df_sec = linhas_sec.drop_duplicates(subset=["chave"])
+    df_sis = linhas_sis.drop_duplicates(subset=["chave"])
+
+    arquivo = _arquivo_estado(
+        arquivo_secretaria, f"{arquivo_sistema}_v{frequencia_v5.VERSAO_EXTRATOR}", pasta=pasta
+    )
+    anterior = carregar_estado(arquivo)
+
+    log("Comparando...")
+    df_sec, df_sis, recomparados = comparar_incremental(df_sec, df_sis, anterior)
+    log(f"  comparação refeita para {recomparados} funcionais")
+
+    df_divergencias = montar_divergencias(df_sec, df_sis)
+    df_delta = montar_delta(None if anterior is None else anterior["divergencias"], df_divergencias)
+
+    gravar_estado({"sec": df_sec, "sis": df_sis, "divergencias": df_divergencias}, arquivo)
+
+    if brutos is not None:
+        brutos["secretaria"] = status_nas_linhas(linhas_sec, df_sec)
+        brutos["sistema"] = status_nas_linhas(linhas_sis, df_sis)
+
+    return df_sec, df_sis, df_divergencias, df_delta
@@ -0,0 +1,158 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# =========================
+# INSTRUMENTAÇÃO POR ETAPA
+# =========================
+# Liga com FREQUENCIA_PERFIL=1 (só o JSON) ou FREQUENCIA_PERFIL=resumo
+# (JSON + tabela no terminal), ou pelas flags --perfil / --perfil-resumo.
+VARIAVEL_AMBIENTE = "FREQUENCIA_PERFIL"
+
+
+def modo_por_ambiente():
+    valor = os.environ.get(VARIAVEL_AMBIENTE, "").strip().lower()
+
+    if valor in ("", "0", "nao", "não", "false"):
+        return None
+    if valor == "resumo":
+        return "resumo"
+    return "json"
+
+
+def rss_atual_mb():
+    """
+    RSS do processo agora (psutil, ou /proc no Linux). None se não der.
+    """
+    if psutil is not None:
+        return round(psutil.Process().memory_info().rss / 1024 / 1024, 1)
+
+    try:
+        with open("/proc/self/statm") as f:
+            paginas = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+
+    return round(paginas * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024, 1)
+
+
+def pico_rss_mb(filhos=False):
+    """
+    Pico de RSS desde o início do processo (ru_maxrss): só sobe, não é
+    da etapa. Com `filhos`, o maior pico entre os processos filhos já
+    encerrados (pools). None no Windows.
+    """
+    if resource is None:
+        return None
+
+    quem = resource.RUSAGE_CHILDREN if filhos else resource.RUSAGE_SELF
+    pico = resource.getrusage(quem).ru_maxrss
+
+    # Linux informa em KB, macOS em bytes
+    if sys.platform == "darwin":
+        return round(pico / 1024 / 1024, 1)
+    return round(pico / 1024, 1)
+
+
+class Perfil:
+    """
+    Registra tempo, linhas produzidas e memória de cada etapa: RSS no fim
+    e variação durante a etapa (só deste processo), além do pico
+    acumulado do processo e dos filhos até ali.
+
+    Desligado, `etapa()` só devolve um dict descartável, sem medir nada.
+    """
+
+    def __init__(self, modo=None):
+        self.modo = modo
+        self.etapas = []
+        self.inicio = datetime.now()
+
+    @property
+    def ativo(self):
+        return self.modo is not None
+
+    @contextmanager
+    def etapa(self, nome):
+        registro = {"etapa": nome, "linhas": None}
+
+        if not self.ativo:
+            yield registro
+            return
+
+        rss_inicio = rss_atual_mb()
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro["segundos"] = round(time.perf_counter() - inicio, 3)
+            registro["rss_mb"] = rss_atual_mb()
+            registro["variacao_rss_mb"] = (
+                None if rss_inicio is None or registro["rss_mb"] is None
+                else round(registro["rss_mb"] - rss_inicio, 1)
+            )
+            registro["pico_rss_acumulado_mb"] = pico_rss_mb()
+            registro["pico_rss_acumulado_filhos_mb"] = pico_rss_mb(filhos=True)
+            self.etapas.append(registro)
+
+    def relatorio(self):
+        return {
+            "inicio": self.inicio.isoformat(timespec="seconds"),
+            "total_segundos": round(sum(e["segundos"] for e in self.etapas), 3),
+            "etapas": self.etapas,
+        }
+
+    def salvar(self, caminho):
+        if not self.ativo:
+            return
+
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(self.relatorio(), f, ensure_ascii=False, indent=2)
+
+        if self.modo == "resumo":
+            print(self.resumo())
+
+    def resumo(self):
+        def valor(v):
+            return "" if v is None else v
+
+        linhas = [
+            f"{'etapa':<28}{'segundos':>10}{'linhas':>10}{'RSS (MB)':>10}{'Δ RSS':>8}"
+            f"{'pico acumulado':>16}"
+        ]
+
+        for e in self.etapas:
+            linhas.append(
+                f"{e['etapa']:<28}{e['segundos']:>10.3f}{valor(e['linhas']):>10}"
+                f"{valor(e['rss_mb']):>10}{valor(e['variacao_rss_mb']):>8}"
+                f"{valor(e['pico_rss_acumulado_mb']):>16}"
+            )
+
+            paginas = e.get("paginas")
+            if paginas:
+                lenta = max(range(len(paginas)), key=paginas.__getitem__)
+                linhas.append(
+                    f"  {len(paginas)} páginas, média {sum(paginas) / len(paginas):.3f}s, "
+                    f"mais lenta {lenta + 1} ({paginas[lenta]:.3f}s)"
+                )
+
+        linhas.append("(RSS e Δ RSS: este processo; pico acumulado: desde o início, não por etapa)")
+        return "\n".join(linhas)
+
+
+def caminho_relatorio(caminho_saida):
+    return os.path.splitext(caminho_saida)[0] + "_perfil.json"
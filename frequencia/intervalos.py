@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+
+
+# =========================
+# RECONCILIAÇÃO POR PERÍODO
+# =========================
+# O sistema lança afastamentos como períodos (data inicial + fim), a
+# secretaria lista um dia por linha. Aqui cada dia da secretaria é
+# procurado no período do sistema que o cobre, em vez de casar só
+# funcional + data inicial.
+FORMATO_DATA = "%d/%m/%Y"
+
+# espaçamento entre funcionais na chave numérica (maior que qualquer dia)
+_PASSO = 1 << 20
+
+
+def _dias(serie):
+    datas = pd.to_datetime(serie, format=FORMATO_DATA, errors="coerce")
+    return (datas - pd.Timestamp("1970-01-01")).dt.days
+
+
+def expandir_periodos(df):
+    """
+    Linhas com data_fim depois de data viram uma linha por dia do
+    período (data_fim = data em cada uma); as demais ficam como estão.
+    """
+    if "data_fim" not in df.columns or df.empty:
+        return df
+
+    df = df.reset_index(drop=True)
+    inicio = pd.to_datetime(df["data"].astype(str), format=FORMATO_DATA, errors="coerce")
+    fim = pd.to_datetime(df["data_fim"].astype(str), format=FORMATO_DATA, errors="coerce")
+
+    dias = (fim - inicio).dt.days.where(fim > inicio, 0).fillna(0).astype(int) + 1
+    if (dias == 1).all():
+        return df
+
+    df = df.loc[df.index.repeat(dias)]
+    deslocamento = pd.to_timedelta(df.groupby(level=0).cumcount().to_numpy(), unit="D")
+    datas = inicio.loc[df.index].to_numpy() + deslocamento
+
+    periodo = (dias > 1).loc[df.index].to_numpy()
+    texto = pd.Series(datas, index=df.index).dt.strftime(FORMATO_DATA)
+    df["data"] = df["data"].astype(object).where(~periodo, texto)
+    df["data_fim"] = df["data_fim"].astype(object).where(~periodo, texto)
+
+    return df.reset_index(drop=True)
+
+
+def montar_indice(df_sis):
+    """
+    Índice ordenado dos períodos do sistema.
+
+    Cada período vira uma chave (codigo_funcional * _PASSO + dia_inicial);
+    com as chaves ordenadas, achar o período que cobre um dia é um
+    searchsorted (O(log n)) para todas as consultas de uma vez.
+    """
+    fim = df_sis["data_fim"] if "data_fim" in df_sis.columns else df_sis["data"]
+
+    periodos = pd.DataFrame({
+        "linha": np.arange(len(df_sis)),
+        "funcional": df_sis["funcional"].astype(str).str.strip().to_numpy(),
+        "inicio": _dias(df_sis["data"]).to_numpy(),
+        "fim": _dias(fim).to_numpy(),
+        "ocorrencia": df_sis["ocorrencia"].to_numpy(),
+    }).dropna(subset=["inicio"])
+
+    periodos["fim"] = periodos["fim"].fillna(periodos["inicio"])
+    periodos["fim"] = periodos[["inicio", "fim"]].max(axis=1)
+    periodos = periodos.astype({"inicio": "int64", "fim": "int64"})
+
+    periodos = periodos.sort_values(["funcional", "inicio", "fim"]).reset_index(drop=True)
+
+    funcionais = pd.Index(periodos["funcional"].unique())
+    codigo = funcionais.get_indexer(periodos["funcional"])
+
+    # maior fim até cada posição, dentro da mesma funcional (para sobreposições)
+    fim_acumulado = periodos.groupby("funcional", sort=False)["fim"].cummax().to_numpy()
+
+    return {
+        "periodos": periodos,
+        "funcionais": funcionais,
+        "chaves": codigo * _PASSO + periodos["inicio"].to_numpy(),
+        "fim_acumulado": fim_acumulado,
+    }
+
+
+def localizar(indice, funcional, dia):
+    """
+    Para cada (funcional, dia) devolve a posição do período que cobre o
+    dia no índice, ou -1.
+    """
+    periodos = indice["periodos"]
+    inicio = periodos["inicio"].to_numpy()
+    fim = periodos["fim"].to_numpy()
+    fim_acumulado = indice["fim_acumulado"]
+
+    codigo = indice["funcionais"].get_indexer(funcional)
+    dia = np.asarray(dia)
+    valido = (codigo >= 0) & (dia >= 0)
+
+    posicao = np.searchsorted(indice["chaves"], codigo * _PASSO + dia, side="right") - 1
+    posicao = np.where(valido, posicao, -1)
+
+    mesma_funcional = np.zeros(len(posicao), dtype=bool)
+    mesma_funcional[posicao >= 0] = (
+        indice["chaves"][posicao[posicao >= 0]] // _PASSO == codigo[posicao >= 0]
+    )
+    posicao = np.where(valido & mesma_funcional, posicao, -1)
+
+    cobre = np.zeros(len(posicao), dtype=bool)
+    cobre[posicao >= 0] = fim[posicao[posicao >= 0]] >= dia[posicao >= 0]
+
+    # sobreposição: o último período iniciado não cobre, mas um anterior pode
+    recuar = np.flatnonzero((posicao >= 0) & ~cobre)
+    recuar = recuar[fim_acumulado[posicao[recuar]] >= dia[recuar]]
+
+    for i in recuar:
+        p = posicao[i]
+        while p >= 0 and indice["chaves"][p] // _PASSO == codigo[i]:
+            if inicio[p] <= dia[i] <= fim[p]:
+                cobre[i] = True
+                posicao[i] = p
+                break
+            p -= 1
+
+    return np.where(cobre, posicao, -1)
+
+
+def comparar_intervalos(df_sec, df_sis):
+    """
+    Reconcilia dias da secretaria com períodos do sistema.
+
+    Devolve (df_sec com status/periodo_sistema, df_periodos com os dias
+    cobertos e faltantes de cada período).
+    """
+    indice = montar_indice(df_sis)
+    periodos = indice["periodos"]
+
+    dia_sec = _dias(df_sec["data"]).fillna(-1).astype("int64").to_numpy()
+    funcional_sec = df_sec["funcional"].astype(str).str.strip()
+
+    posicao = localizar(indice, funcional_sec, dia_sec)
+    achou = posicao >= 0
+
+    ocorrencia_sis = np.full(len(df_sec), None, dtype=object)
+    ocorrencia_sis[achou] = periodos["ocorrencia"].to_numpy()[posicao[achou]]
+
+    df_sec = df_sec.copy()
+    df_sec["ocorrencia_sis"] = ocorrencia_sis
+    df_sec["periodo_sistema"] = np.where(achou, posicao, -1)
+    df_sec["status"] = np.select(
+        [~achou, df_sec["ocorrencia"].to_numpy() != ocorrencia_sis],
+        ["SÓ_SECRETARIA", "DIVERGENCIA_OCORRENCIA"],
+        default="OK"
+    )
+
+    # dias de cada período que a secretaria informou
+    cobertos = pd.DataFrame({"posicao": posicao[achou], "dia": dia_sec[achou]})
+    cobertos = cobertos.drop_duplicates()
+    contagem = cobertos.groupby("posicao").size()
+
+    df_periodos = periodos.copy()
+    df_periodos["dias_periodo"] = df_periodos["fim"] - df_periodos["inicio"] + 1
+    df_periodos["dias_cobertos"] = contagem.reindex(df_periodos.index, fill_value=0).to_numpy()
+    df_periodos["status"] = np.select(
+        [
+            df_periodos["dias_cobertos"] == 0,
+            df_periodos["dias_cobertos"] < df_periodos["dias_periodo"],
+        ],
+        ["SÓ_SISTEMA", "PARCIAL"],
+        default="OK"
+    )
+
+    df_periodos["dias_faltantes"] = _dias_faltantes(df_periodos, cobertos)
+
+    epoca = pd.Timestamp("1970-01-01")
+    for coluna in ["inicio", "fim"]:
+        df_periodos[coluna] = (epoca + pd.to_timedelta(df_periodos[coluna], unit="D")).dt.strftime(FORMATO_DATA)
+
+    df_periodos = df_periodos.rename(columns={"inicio": "data", "fim": "data_fim"})
+
+    return df_sec, df_periodos.drop(columns=["linha"])
+
+
+def _dias_faltantes(df_periodos, cobertos):
+    # só os períodos parciais precisam listar os dias
+    por_periodo = cobertos.groupby("posicao")["dia"].apply(set)
+    epoca = pd.Timestamp("1970-01-01")
+
+    faltantes = []
+    for posicao, inicio, fim, status in zip(
+        df_periodos.index, df_periodos["inicio"], df_periodos["fim"], df_periodos["status"]
+    ):
+        if status != "PARCIAL":
+            faltantes.append("")
+            continue
+
+        vistos = por_periodo.get(posicao, set())
+        dias = [d for d in range(inicio, fim + 1) if d not in vistos]
+        faltantes.append(", ".join(
+            (epoca + pd.Timedelta(days=d)).strftime(FORMATO_DATA) for d in dias
+        ))
+
+    return faltantes
@@ -0,0 +1,209 @@
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from aviso_retificacao import carregar_nomes, divergencias_por_dia, montar_avisos, salvar_aviso
+from esquema import expandir
+from exclusao import REGRAS_EXCLUSAO, regras_por_argumentos
+from frequencia_v5 import reconciliar
+from historico import BANCO_PADRAO, gravar_execucao
+from paralelo import workers_padrao
+from saida import FORMATOS, escrever_arquivos, escrever_xlsx
+
+
+# =========================
+# LOTE - TODAS AS SECRETARIAS DE UMA PASTA
+# =========================
+PADRAO_SECRETARIA = re.compile(r"^(\d+) - secretaria\.pdf$", re.IGNORECASE)
+PADRAO_SISTEMA = re.compile(r"^(\d+) - sistema\.(pdf|ods)$", re.IGNORECASE)
+
+
+def descobrir_pares(pasta):
+    """
+    Devolve [(codigo, arquivo_secretaria, arquivo_sistema)] ordenado por
+    código. Com PDF e ODS do sistema para o mesmo código, usa o ODS.
+    """
+    secretarias = {}
+    sistemas = {}
+
+    for nome in os.listdir(pasta):
+        m = PADRAO_SECRETARIA.match(nome)
+        if m:
+            secretarias[m.group(1)] = os.path.join(pasta, nome)
+            continue
+
+        m = PADRAO_SISTEMA.match(nome)
+        if m:
+            codigo = m.group(1)
+            if codigo not in sistemas or m.group(2).lower() == "ods":
+                sistemas[codigo] = os.path.join(pasta, nome)
+
+    sem_par = sorted(set(secretarias) ^ set(sistemas))
+    for codigo in sem_par:
+        print(f"⚠ {codigo}: falta o arquivo da secretaria ou do sistema")
+
+    return [
+        (codigo, secretarias[codigo], sistemas[codigo])
+        for codigo in sorted(secretarias.keys() & sistemas.keys(), key=int)
+    ]
+
+
+def _reconciliar_par(args):
+    codigo, arquivo_secretaria, arquivo_sistema, usar_cache, historico, regras, avisos = args
+
+    inicio = time.perf_counter()
+    # linhas sem deduplicar (um registro por dia) para o aviso e o histórico
+    brutos = {} if avisos or historico else None
+    # o lote já roda uma secretaria por processo: aqui a leitura é sequencial
+    df_sec, df_sis, df_divergencias = reconciliar(
+        arquivo_secretaria, arquivo_sistema, workers=1,
+        usar_cache=usar_cache, log=lambda *_: None, regras=regras, concorrente=False, brutos=brutos
+    )
+
+    resumo = {
+        "secretaria": codigo,
+        "linhas_secretaria": len(df_sec),
+        "linhas_sistema": len(df_sis),
+        "ok_secretaria": int((df_sec["status"] == "OK").sum()),
+        "so_secretaria": int((df_sec["status"] == "SÓ_SECRETARIA").sum()),
+        "so_sistema": int((df_sis["status"] == "SÓ_SISTEMA").sum()),
+        "divergencias": len(df_divergencias),
+        "segundos": round(time.perf_counter() - inicio, 2),
+        "erro": "",
+    }
+
+    # o histórico é gravado no processo principal (um só escritor no SQLite)
+    if historico:
+        historico = (brutos["secretaria"], brutos["sistema"], df_divergencias.copy(), arquivo_secretaria, arquivo_sistema)
+
+    df_divergencias.insert(0, "secretaria", codigo)
+
+    # aviso: dia a dia, nas linhas sem deduplicar (as divergências acima
+    # têm uma linha por funcional/ocorrência)
+    df_aviso = None
+    if avisos:
+        df_aviso = divergencias_por_dia(brutos["secretaria"], brutos["sistema"])
+        df_aviso.insert(0, "secretaria", codigo)
+
+    return resumo, df_divergencias, historico, df_aviso
+
+
+def processar_lote(pasta, workers=1, usar_cache=True, banco_historico=None, regras=REGRAS_EXCLUSAO,
+                   avisos=False):
+    """
+    Devolve (resumo, divergências, divergências para o aviso). As do
+    aviso só são montadas com `avisos`; senão vêm None. `workers` = 0
+    usa todos os núcleos.
+    """
+    pares = descobrir_pares(pasta)
+    workers = workers if workers > 0 else workers_padrao()
+
+    resumos = []
+    divergencias = []
+    divergencias_aviso = []
+
+    tarefas = [
+        (codigo, sec, sis, usar_cache, bool(banco_historico), regras, avisos)
+        for codigo, sec, sis in pares
+    ]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(tarefas)) or 1) as executor:
+        futuros = {executor.submit(_reconciliar_par, t): t[0] for t in tarefas}
+
+        for futuro in as_completed(futuros):
+            codigo = futuros[futuro]
+            try:
+                resumo, df_divergencias, historico, df_aviso = futuro.result()
+            except Exception as e:
+                # uma secretaria com problema não derruba o lote
+                print(f"✖ {codigo}: {e}")
+                resumos.append({"secretaria": codigo, "erro": str(e)})
+                continue
+
+            print(f"✔ {codigo}: {resumo['divergencias']} divergências")
+            if historico:
+                gravar_execucao(*historico, banco=banco_historico)
+            resumos.append(resumo)
+            divergencias.append(df_divergencias)
+            if df_aviso is not None:
+                divergencias_aviso.append(df_aviso)
+
+    df_resumo = pd.DataFrame(resumos)
+    if not df_resumo.empty:
+        df_resumo = df_resumo.sort_values(
+            by="secretaria", key=lambda s: s.astype(int)
+        ).reset_index(drop=True)
+
+    if divergencias:
+        df_divergencias = expandir(pd.concat(divergencias, ignore_index=True).sort_values(
+            by=["secretaria", "funcional", "data"]
+        ))
+    else:
+        df_divergencias = pd.DataFrame(
+            columns=["secretaria", "funcional", "data", "ocorrencia", "tipo_erro"]
+        )
+
+    df_aviso = None
+    if avisos:
+        df_aviso = pd.concat(divergencias_aviso, ignore_index=True) if divergencias_aviso else pd.DataFrame(
+            columns=["secretaria", "funcional", "data", "ocorrencia_sec", "ocorrencia_sis"]
+        )
+
+    return df_resumo, df_divergencias, df_aviso
+
+
+# =========================
+# EXECUÇÃO
+# =========================
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compara todas as secretarias de uma pasta (<codigo> - secretaria.pdf / <codigo> - sistema.pdf|ods)"
+    )
+    parser.add_argument("pasta", nargs="?", default=".")
+    parser.add_argument("--workers", type=int, default=1, help="processos, um por secretaria (0 = todos os núcleos)")
+    parser.add_argument("--saida", default="resultado_lote.xlsx")
+    parser.add_argument("--formato", choices=FORMATOS, default="xlsx", help="xlsx ou um arquivo parquet/csv por aba")
+    parser.add_argument("--sem-cache", action="store_true")
+    parser.add_argument("--avisos", help="pasta onde gravar '<codigo> - aviso.txt' de cada secretaria")
+    parser.add_argument("--nomes", help="planilha com funcional e nome para os avisos")
+    parser.add_argument("--excluir", nargs="+", metavar="OCORRENCIA", help="tipos retirados antes da comparação")
+    parser.add_argument("--sem-exclusao", action="store_true", help="compara todos os tipos de ocorrência")
+    parser.add_argument(
+        "--historico", nargs="?", const=BANCO_PADRAO,
+        help=f"grava cada secretaria no histórico SQLite (padrão: {BANCO_PADRAO})"
+    )
+    args = parser.parse_args()
+
+    regras = regras_por_argumentos(args.excluir, args.sem_exclusao)
+
+    print(f"Processando lote em {args.pasta}...")
+    df_resumo, df_divergencias, df_aviso = processar_lote(
+        args.pasta, args.workers, usar_cache=not args.sem_cache,
+        banco_historico=args.historico, regras=regras, avisos=bool(args.avisos)
+    )
+
+    print(f"Salvando resultado ({args.formato})...")
+    abas = {"RESUMO": df_resumo, "DIVERGENCIAS": df_divergencias}
+    if args.formato == "xlsx":
+        escrever_xlsx(args.saida, abas)
+    else:
+        escrever_arquivos(os.path.splitext(args.saida)[0], abas, args.formato)
+
+    if args.avisos:
+        print("Gerando avisos de retificação...")
+        nomes = carregar_nomes(args.nomes) if args.nomes else None
+        avisos = montar_avisos(df_aviso, nomes)
+
+        os.makedirs(args.avisos, exist_ok=True)
+        for codigo, texto in avisos.items():
+            salvar_aviso(texto, os.path.join(args.avisos, f"{codigo} - aviso.txt"))
+
+    print("✔ Finalizado!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import re
+import unicodedata
+
+import pandas as pd
+
+
+def normalizar_texto(txt):
+    if not txt:
+        return ""
+    
+    txt = txt.upper()
+    
+    # remove acentos
+    txt = unicodedata.normalize('NFKD', txt)
+    txt = txt.encode('ASCII', 'ignore').decode('ASCII')
+    
+    # remove espaços duplicados
+    txt = " ".join(txt.split())
+    
+    return txt
+
+
+# =========================
+# MAPA DE OCORRÊNCIAS
+# =========================
+# A ordem importa: a primeira categoria com alguma variação contida
+# no texto vence (ex.: "prorrogação" antes de "Licença maternidade").
+MAPA_OCORRENCIAS = {
+    "ABONO ELEITORAL": [
+        "ABONO ELEITORAL"
+    ],
+
+    "ABONO": ["ABONO"],
+    
+    "FÉRIAS REGULAMENTARES": [
+        "FÉRIAS REGULAMENTARES",
+        "FERIAS REGULAMENTARES"
+    ],
+    
+    "DOAÇÃO DE SANGUE": [
+        "DOAÇÃO DE SANGUE",
+        "DOACAO DE SANGUE"
+    ],
+    
+    "TRATAMENTO DE SAÚDE": [
+        "TRATAMENTO DE SAÚDE",
+        "TRATAMENTO DE SAUDE",
+        "TRATAMENTO DE"
+    ],
+    
+    "AUXÍLIO DOENÇA": [
+        "AUXÍLIO DOENÇA",
+        "AUXILIO DOENCA"
+    ],
+    
+    "LICENÇA MÉDICA": [
+        "LICENÇA MÉDICA",
+        "LICENCA MEDICA"
+    ],
+    
+    "AFASTAMENTO SEM VENCIMENTOS": [
+        "AFASTAMENTO SEM VENCIMENTOS",
+        "AFASTAMENTO SEM VENCIMENTO",
+        "AFASTAMENTO S/VENCIMENTOS",
+        "AFASTAMENTO SEM VENC",
+        "SEM VENCIMENTOS"
+    ],
+
+    "FALTA": [
+        "FALTA",
+        "FALTAS EFETIVOS",
+        "FALT"
+    ],
+
+    "CEDIDO SEM ÔNUS PARA CEDENTE": [
+        "CEDIDO SEM ÔNUS PARA CEDENTE",
+        "CEDIDO SEM ÔNUS",
+        "CEDIDO"
+    ],
+
+    "AFASTAMENTO POR MANDADO JUDICIAL": [
+        "AFASTAMENTO POR MANDADO JUDICIAL",
+        "MANDADO JUDICIAL"
+    ],
+
+    "DOENÇA EM PESSOA DA FAMÍLIA": [
+        "DOENÇA EM PESSOA DA FAMÍLIA",
+        "DOENÇA EM PESSOA"
+    ],
+
+    "NOJO": [
+        "NOJO"
+    ],
+
+    "AGUARDANDO PERÍCIA SEMPEM": [
+        "AGUARDANDO PERÍCIA SEMPEM",
+        "AGUARDANDO PERÍCIA",
+        "PERICIA",
+        "PERÍCIA"
+    ],
+
+    "Férias prêmio": [
+        "Férias prêmio",
+        "PREMIO",
+        "PRÊMIO"
+    ],
+
+    "Licença maternidade prorrogação": [
+        "Licença maternidade prorrogação"
+    ],
+
+    "Licença maternidade": [
+        "Licença maternidade"
+    ],
+
+    "GALA": [
+        "LICENÇA GALA",
+        "GALA"  # só a palavra inteira (ver PALAVRA_INTEIRA)
+    ],
+
+    # depois de "FÉRIAS REGULAMENTARES" e "Férias prêmio"
+    "FÉRIAS": [
+        "FÉRIAS",
+        "FERIAS"
+    ]
+
+
+}
+
+
+# variações curtas que aparecem dentro de nomes (GALANTE, GALASSI): o
+# texto das linhas inclui o nome do servidor, então só valem como
+# palavra inteira
+PALAVRA_INTEIRA = {"GALA"}
+
+NAO_IDENTIFICADO = "NÃO IDENTIFICADO"
+
+
+# =========================
+# CLASSIFICADOR COMPILADO
+# =========================
+def compilar_classificador(mapa=None, padrao=NAO_IDENTIFICADO):
+    """
+    Compila o mapa uma vez e devolve uma função texto -> categoria.
+
+    As variações são normalizadas só na compilação e ficam numa lista em
+    ordem de prioridade; vence a primeira contida no texto, igual ao laço
+    antigo. As de PALAVRA_INTEIRA só valem como palavra inteira.
+    Variações que contêm uma variação anterior (de substring) nunca
+    venceriam e são descartadas.
+    """
+    if mapa is None:
+        mapa = MAPA_OCORRENCIAS
+
+    inteiras = {normalizar_texto(v) for v in PALAVRA_INTEIRA}
+    variacoes = []
+
+    for categoria, lista in mapa.items():
+        for v in lista:
+            v = normalizar_texto(v)
+            if any(anterior in v for anterior, _, palavra in variacoes if palavra is None):
+                continue
+            palavra = re.compile(rf"\b{re.escape(v)}\b") if v in inteiras else None
+            variacoes.append((v, categoria, palavra))
+
+    variacoes = tuple(variacoes)
+
+    def classificar(texto):
+        texto = normalizar_texto(texto)
+
+        for v, categoria, palavra in variacoes:
+            if v in texto and (palavra is None or palavra.search(texto)):
+                return categoria
+
+        return padrao
+
+    return classificar
+
+
+classificar_ocorrencia = compilar_classificador()
+
+
+def classificar_serie(textos):
+    """
+    classificar_ocorrencia numa coluna inteira: cada texto distinto é
+    classificado uma vez só. Devolve um array de categorias.
+    """
+    codigos, unicos = pd.factorize(textos.astype(object).fillna("").astype(str))
+    categorias = pd.Series([classificar_ocorrencia(t) for t in unicos], dtype=object).to_numpy()
+    return categorias[codigos]
+
+
+def resolver_categoria(nome, mapa=None):
+    """
+    "ferias premio" -> "Férias prêmio": acha a categoria do mapa pelo
+    nome sem acento/caixa. Devolve None se não existir.
+    """
+    if mapa is None:
+        mapa = MAPA_OCORRENCIAS
+
+    procurado = normalizar_texto(nome)
+    for categoria in mapa:
+        if normalizar_texto(categoria) == procurado:
+            return categoria
+
+    return None
@@ -0,0 +1,147 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import pdfplumber
+
+import cache_extracao
+from paralelo import workers_padrao
+
+try:
+    import pytesseract
+except ImportError:  # sem OCR as páginas digitalizadas só geram aviso
+    pytesseract = None
+
+
+# =========================
+# OCR DAS PÁGINAS DIGITALIZADAS
+# =========================
+# Folha de frequência escaneada não tem camada de texto: extract_text()
+# volta vazio e a página sumia da comparação. Só essas páginas são
+# rasterizadas e passam pelo tesseract; o texto reconhecido fica em
+# cache pelo hash das imagens da página.
+PASTA_OCR = os.path.join(cache_extracao.PASTA_CACHE, "ocr")
+RESOLUCAO = 300
+IDIOMA = os.environ.get("FREQUENCIA_OCR_IDIOMA", "por")
+
+
+@lru_cache(maxsize=None)
+def disponivel():
+    if pytesseract is None:
+        return False
+
+    try:
+        pytesseract.get_tesseract_version()
+    except pytesseract.TesseractNotFoundError:
+        return False
+
+    return True
+
+
+def sem_texto(pagina):
+    # digitalizada: nenhum caractere na camada de texto, só imagem
+    return not pagina.chars and bool(pagina.images)
+
+
+def impressao_imagens(pagina):
+    """
+    sha256 das imagens da página (o content stream de duas páginas
+    escaneadas costuma ser igual; o que muda é a imagem).
+    """
+    h = hashlib.sha256()
+    h.update(repr(pagina.page_obj.mediabox).encode())
+
+    for imagem in pagina.images:
+        h.update(imagem["stream"].get_rawdata() or b"")
+
+    return h.hexdigest()
+
+
+def _arquivo_cache(impressao, pasta=PASTA_OCR):
+    return os.path.join(pasta, f"{impressao}_{IDIOMA}_{RESOLUCAO}.txt")
+
+
+def _ler_texto(arquivo):
+    with open(arquivo, encoding="utf-8") as f:
+        return f.read()
+
+
+def _gravar_texto(texto, arquivo):
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+
+    temporario = arquivo + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(texto)
+    os.replace(temporario, arquivo)
+
+
+def _ocr_pagina(args):
+    # roda no processo filho
+    pdf_path, indice = args
+
+    with pdfplumber.open(pdf_path) as pdf:
+        imagem = pdf.pages[indice].to_image(resolution=RESOLUCAO).original
+
+    return indice, pytesseract.image_to_string(imagem, lang=IDIOMA)
+
+
+def ocr_paginas(pdf_path, indices, workers=None, log=print, pasta=PASTA_OCR):
+    """
+    Texto das páginas digitalizadas entre `indices` (as que voltaram sem
+    nenhuma linha da extração normal): {indice: texto}.
+
+    Páginas com texto (cabeçalho, totais) são ignoradas; as já vistas
+    saem do cache sem passar pelo OCR.
+    """
+    if not indices:
+        return {}
+
+    with pdfplumber.open(pdf_path) as pdf:
+        impressoes = {
+            i: impressao_imagens(pdf.pages[i])
+            for i in indices
+            if sem_texto(pdf.pages[i])
+        }
+
+    textos = {}
+    pendentes = []
+
+    for i, impressao in impressoes.items():
+        arquivo = _arquivo_cache(impressao, pasta)
+        if os.path.exists(arquivo):
+            textos[i] = _ler_texto(arquivo)
+        else:
+            pendentes.append(i)
+
+    if not pendentes:
+        return textos
+
+    nome = os.path.basename(pdf_path)
+
+    if not disponivel():
+        log(f"⚠ {nome}: {len(pendentes)} páginas sem texto (digitalizadas?) ficaram de fora; "
+            f"instale pytesseract e o tesseract para ler por OCR")
+        return textos
+
+    log(f"  OCR em {len(pendentes)} páginas de {nome}...")
+
+    workers = min(workers or workers_padrao(), len(pendentes))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for i, texto in executor.map(_ocr_pagina, [(pdf_path, i) for i in pendentes]):
+            _gravar_texto(texto, _arquivo_cache(impressoes[i], pasta))
+            textos[i] = texto
+
+    return textos
+
+
+def completar_paginas(pdf_path, paginas, vazias, ler_texto, workers=None, log=print):
+    """
+    Põe em paginas[i] o `ler_texto(texto)` de cada página digitalizada
+    entre `vazias`. Fica no lugar da página, não no fim: a extração da
+    secretaria herda a funcional da página anterior.
+    """
+    for i, texto in ocr_paginas(pdf_path, vazias, workers, log).items():
+        paginas[i] = ler_texto(texto)
+
+    return paginas
@@ -0,0 +1,119 @@
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pdfplumber
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from comum.leitor_pdf import REFERENCIA, abrir
+
+
+# =========================
+# EXTRAÇÃO PARALELA DE PÁGINAS
+# =========================
+def contar_paginas(pdf_path):
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def dividir_intervalos(total, partes):
+    """
+    Divide range(total) em até `partes` blocos contíguos [inicio, fim).
+    """
+    partes = max(1, min(partes, total))
+    tamanho, resto = divmod(total, partes)
+
+    intervalos = []
+    inicio = 0
+    for i in range(partes):
+        fim = inicio + tamanho + (1 if i < resto else 0)
+        if fim > inicio:
+            intervalos.append((inicio, fim))
+        inicio = fim
+
+    return intervalos
+
+
+def _processar_intervalo(args):
+    # cada worker abre o próprio handle do PDF
+    pdf_path, indices, processar_pagina, motor = args
+
+    resultados = []
+    with abrir(pdf_path, motor) as paginas:
+        for i in indices:
+            t = time.perf_counter()
+            resultado = processar_pagina(paginas[i])
+            resultados.append((resultado, time.perf_counter() - t))
+
+    return resultados
+
+
+def extrair_paginas(pdf_path, processar_pagina, workers=None, tempos=None, paginas=None, motor=REFERENCIA):
+    """
+    Aplica `processar_pagina(pagina)` em todas as páginas do PDF (ou só
+    nos índices de `paginas`) e devolve a lista de resultados na ordem.
+
+    Com workers > 1 as páginas são divididas em blocos contíguos e
+    processadas em um pool de processos. `processar_pagina` precisa ser
+    uma função de módulo (picklable). Se `tempos` for uma lista, recebe
+    os segundos gastos em cada página. `motor`: ver comum/leitor_pdf.py
+    (só o pdfplumber tem extract_tables).
+    """
+    if paginas is None:
+        paginas = range(contar_paginas(pdf_path))
+    paginas = list(paginas)
+
+    if not workers or workers <= 1:
+        blocos = [_processar_intervalo((pdf_path, paginas, processar_pagina, motor))]
+    else:
+        # mais blocos que workers para balancear páginas pesadas
+        intervalos = dividir_intervalos(len(paginas), workers * 4)
+        tarefas = [(pdf_path, paginas[inicio:fim], processar_pagina, motor) for inicio, fim in intervalos]
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map preserva a ordem dos blocos
+            blocos = list(executor.map(_processar_intervalo, tarefas))
+
+    resultados = []
+    for bloco in blocos:
+        for resultado, segundos in bloco:
+            resultados.append(resultado)
+            if tempos is not None:
+                tempos.append(round(segundos, 4))
+
+    return resultados
+
+
+def extrair_paginas_fluxo(pdf_path, processar_pagina, executor, bloco=16, max_pendentes=4, motor=REFERENCIA):
+    """
+    Gerador: manda blocos de `bloco` páginas para o `executor` e devolve
+    (resultado, segundos) de cada página, na ordem, assim que o bloco
+    dela termina.
+
+    No máximo `max_pendentes` blocos ficam na fila; quem consome devagar
+    segura a extração em vez de acumular páginas na memória.
+    """
+    total = contar_paginas(pdf_path)
+    inicios = iter(range(0, total, bloco))
+    pendentes = deque()
+
+    def enviar():
+        for inicio in inicios:
+            paginas = range(inicio, min(inicio + bloco, total))
+            pendentes.append(executor.submit(_processar_intervalo, (pdf_path, paginas, processar_pagina, motor)))
+            return
+
+    for _ in range(max_pendentes):
+        enviar()
+
+    while pendentes:
+        futuro = pendentes.popleft()
+        enviar()
+        yield from futuro.result()
+
+
+def workers_padrao():
+    return os.cpu_count() or 1
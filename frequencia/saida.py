@@ -0,0 +1,115 @@
+import math
+import os
+
+import pandas as pd
+
+try:
+    import xlsxwriter
+except ImportError:  # sem xlsxwriter cai no pd.ExcelWriter (openpyxl)
+    xlsxwriter = None
+
+
+# =========================
+# ESCRITA DOS RESULTADOS
+# =========================
+# xlsx em modo constant_memory (linha a linha, sem montar a planilha
+# inteira na memória), com filtro e cabeçalho congelado em cada aba.
+# parquet/csv gravam um arquivo por aba: <base>_<ABA>.parquet|csv.
+FORMATOS = ["xlsx", "parquet", "csv"]
+
+
+def montar_resumo(df_sec, df_sis, df_divergencias):
+    contagens = [
+        ("linhas secretaria", len(df_sec)),
+        ("linhas sistema", len(df_sis)),
+        ("ok", int((df_sec["status"] == "OK").sum())),
+        ("só secretaria", int((df_sec["status"] == "SÓ_SECRETARIA").sum())),
+        ("só sistema", int((df_sis["status"] == "SÓ_SISTEMA").sum())),
+        ("divergências", len(df_divergencias)),
+    ]
+
+    if "tipo_erro" in df_divergencias and len(df_divergencias):
+        for tipo, n in df_divergencias["tipo_erro"].value_counts().items():
+            contagens.append((f"divergências - {tipo}", int(n)))
+
+    return pd.DataFrame(contagens, columns=["item", "quantidade"])
+
+
+def _valor(v):
+    # células vazias em vez de "nan"/"None"
+    if v is None or (isinstance(v, float) and math.isnan(v)) or v is pd.NaT:
+        return None
+    return v
+
+
+def _escrever_aba(workbook, nome, df, negrito):
+    aba = workbook.add_worksheet(nome)
+
+    colunas = [str(c) for c in df.columns]
+    aba.write_row(0, 0, colunas, negrito)
+
+    for i, linha in enumerate(df.itertuples(index=False, name=None), start=1):
+        aba.write_row(i, 0, [_valor(v) for v in linha])
+
+    if colunas:
+        aba.autofilter(0, 0, max(len(df), 1), len(colunas) - 1)
+    aba.freeze_panes(1, 0)
+
+
+def escrever_xlsx(caminho, abas):
+    """
+    abas: {nome: DataFrame}, na ordem em que devem aparecer.
+    """
+    if xlsxwriter is None:
+        with pd.ExcelWriter(caminho) as writer:
+            for nome, df in abas.items():
+                df.to_excel(writer, sheet_name=nome, index=False)
+        return
+
+    workbook = xlsxwriter.Workbook(caminho, {"constant_memory": True, "nan_inf_to_errors": True})
+    negrito = workbook.add_format({"bold": True})
+
+    try:
+        for nome, df in abas.items():
+            _escrever_aba(workbook, nome, df, negrito)
+    finally:
+        workbook.close()
+
+
+def escrever_arquivos(base, abas, formato):
+    """
+    Um arquivo por aba; devolve os caminhos gravados.
+    """
+    caminhos = []
+
+    for nome, df in abas.items():
+        caminho = f"{base}_{nome}.{formato}"
+        if formato == "parquet":
+            df.to_parquet(caminho, index=False)
+        else:
+            df.to_csv(caminho, index=False, encoding="utf-8-sig")
+        caminhos.append(caminho)
+
+    return caminhos
+
+
+def salvar_resultado(caminho, df_sec, df_sis, df_divergencias, extras=None, formato="xlsx", so_divergencias=False):
+    """
+    Grava Secretaria, Sistema e DIVERGENCIAS (+ `extras`), ou só
+    DIVERGENCIAS + RESUMO com `so_divergencias`.
+    """
+    if so_divergencias:
+        abas = {
+            "DIVERGENCIAS": df_divergencias,
+            "RESUMO": montar_resumo(df_sec, df_sis, df_divergencias),
+        }
+    else:
+        abas = {"Secretaria": df_sec, "Sistema": df_sis, "DIVERGENCIAS": df_divergencias}
+
+    abas.update(extras or {})
+
+    if formato == "xlsx":
+        escrever_xlsx(caminho, abas)
+        return [caminho]
+
+    return escrever_arquivos(os.path.splitext(caminho)[0], abas, formato)
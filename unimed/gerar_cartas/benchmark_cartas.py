@@ -0,0 +1,240 @@
+import argparse
+import os
+import re
+import tempfile
+import time
+
+import pandas as pd
+from docx import Document
+from docx.shared import Pt
+
+import unimed_final_v2
+from unimed_final_v2 import (
+    capitalize_name, number_to_currency_text_extended, replace_paragraph_text_preserve_style
+)
+
+
+# =========================
+# BENCHMARK GERAÇÃO DE CARTAS
+# =========================
+# Template sintético com os mesmos campos do template_base.docx (inclusive
+# campo quebrado em dois runs, tabela, cabeçalho e rodapé). Compara o
+# generate_document antigo (abre o template e salva a cada parágrafo)
+# com o novo (template em cache, uma passada, um save).
+PARAGRAFOS_FIXOS = 30
+
+
+def gerar_modelo(caminho):
+    d = Document()
+    d.sections[0].header.paragraphs[0].text = "UNIMED - [mês atual]/[ano atual]"
+    d.sections[0].footer.paragraphs[0].text = "Vencimento: [ultimo dia do mês atual] de [mês vencimento] de [ano vencimento]"
+
+    d.add_paragraph("Piracicaba, [dia atual] de [mês atual] de [ano atual].")
+    d.add_paragraph("Ilmo(a) Senhor(a): [nome do servidor]")
+    d.add_paragraph("[endereço do servidor]")
+    d.add_paragraph("[cidade] - CEP [CEP do servidor]")
+
+    p = d.add_paragraph("Prezado(a) ")
+    p.add_run("[nome do servidor").bold = True
+    p.add_run(" cap]").bold = True
+    p.add_run(", informamos o débito de R$ [valor numérico] ([valor por extenso]).")
+
+    d.add_paragraph(
+        "Informamos que notificação semelhante foi enviada ao email cadastrado no sistema ([r-mail]), "
+        "em 20 de [mês atual] de [ano atual]."
+    )
+    d.add_paragraph("Solicitamos o pagamento até [ultimo dia do mês atual] de [mês vencimento] de [ano vencimento].")
+
+    tabela = d.add_table(rows=2, cols=2)
+    tabela.cell(0, 0).text = "Servidor"
+    tabela.cell(0, 1).text = "[nome do servidor upper]"
+    tabela.cell(1, 0).text = "Valor"
+    tabela.cell(1, 1).text = "R$ [valor numérico]"
+
+    for i in range(PARAGRAFOS_FIXOS):
+        d.add_paragraph(f"Texto fixo da carta, parágrafo {i + 1}, sem campos.")
+
+    d.add_paragraph("E-mail recebido em [dia email] de [mês email] de [ano email].")
+    d.save(caminho)
+
+
+def replace_text_in_paragraph(paragraph, key, value):
+    """
+    Substitui uma chave (placeholder) por um valor em um parágrafo do python-docx,
+    preservando formatação mesmo que o placeholder não esteja em um run específico.
+    """
+
+    if key not in paragraph.text:
+        return  # nada a substituir
+
+    # Tenta substituir apenas dentro do run que contém o placeholder
+    for run in paragraph.runs:
+        if key in run.text:
+            run.text = run.text.replace(key, str(value))
+            return  # terminou com sucesso
+
+    # Se chegou aqui, o placeholder não estava dentro de um run específico.
+    # Vamos então substituir o texto inteiro, mas mantendo a formatação base.
+    new_text = paragraph.text.replace(key, str(value))
+
+    # Salva formatação base do primeiro run (se existir)
+    if paragraph.runs:
+        base_run = paragraph.runs[0]
+        base_font_name = base_run.font.name
+        base_font_size = base_run.font.size
+        base_bold = base_run.bold
+        base_italic = base_run.italic
+    else:
+        base_font_name = None
+        base_font_size = None
+        base_bold = None
+        base_italic = None
+
+    # Limpa o conteúdo anterior do parágrafo
+    paragraph.clear()
+
+    # Cria novo run com o texto substituído
+    new_run = paragraph.add_run(new_text)
+
+    # Aplica a formatação base (quando existir)
+    if base_font_name:
+        new_run.font.name = base_font_name
+    if base_font_size:
+        new_run.font.size = base_font_size
+    if base_bold is not None:
+        new_run.bold = base_bold
+    if base_italic is not None:
+        new_run.italic = base_italic
+
+
+def generate_document_antigo(data_row, email_date_info, current_date_info, due_date_info, template_path):
+    """
+    generate_document de antes do cache de template, só para comparação:
+    abre o template a cada carta, testa cada campo em cada parágrafo e
+    salva a cada parágrafo.
+    """
+    document = Document(template_path)
+
+    funcionario_raw = data_row['Funcionário']
+    funcionario_capitalized = capitalize_name(funcionario_raw)
+    total = data_row['Total']
+    endereco_completo = f"{data_row['endereço']} – {data_row['bairro']}"
+    email_address_from_excel = data_row['mail']
+
+    _, _, email_month_portugues, email_day, email_year, email_date_formatted = email_date_info
+    current_day, current_month_portugues, current_year, current_date_formatted = current_date_info
+    due_day, due_month_portugues, due_year, _ = due_date_info
+
+    replacements = {
+        '[dia atual]': str(current_day),
+        '[mês atual]': current_month_portugues,
+        '[ano atual]': str(current_year),
+        'Piracicaba, [dia atual] de [mês atual] de [ano atual].': f'Piracicaba, {current_date_formatted}.',
+        '[ultimo dia do mês atual]': str(due_day),
+        '[mês vencimento]': due_month_portugues,
+        '[ano vencimento]': str(due_year),
+        '[dia email]': str(email_day),
+        '[mês email]': email_month_portugues,
+        '[ano email]': str(email_year),
+        '[r-mail]': email_address_from_excel,
+        '[valor numérico]': f'{total:.2f}'.replace('.', ','),
+        '[valor por extenso]': number_to_currency_text_extended(total),
+        '[nome do servidor upper]': funcionario_raw.upper(),
+        '[nome do servidor cap]': funcionario_capitalized,
+        '[endereço do servidor]': endereco_completo,
+        '[cidade]': data_row['cidade'],
+        '[CEP do servidor]': data_row['CEP'],
+    }
+
+    for paragraph in document.paragraphs:
+        if 'Ilmo(a) Senhor(a):' in paragraph.text and '[nome do servidor]' in paragraph.text:
+            paragraph.clear()
+            paragraph.add_run('Ilmo(a) Senhor(a):\n').bold = False
+            run_name = paragraph.add_run(funcionario_capitalized)
+            run_name.bold = False
+            run_name.font.size = Pt(12)
+            run_name.font.name = 'Calibri'
+            continue
+
+        if 'Informamos que notificação semelhante foi enviada ao email cadastrado no sistema ([r-mail]), em' in paragraph.text:
+            novo_texto = paragraph.text.replace('[r-mail]', email_address_from_excel)
+            novo_texto = re.sub(r'em .*?\.', f'em {email_date_formatted}.', novo_texto)
+            replace_paragraph_text_preserve_style(paragraph, novo_texto)
+            continue
+
+        for key, value in replacements.items():
+            if key in paragraph.text:
+                replace_text_in_paragraph(paragraph, key, value)
+
+        document.save(os.path.join('../output/cartas', f'{funcionario_raw}.docx'))
+
+
+def gerar_funcionarios(n):
+    return pd.DataFrame({
+        "Nro Funcional": range(1, n + 1),
+        "Funcionário": [f"SERVIDOR TESTE {i:05d}" for i in range(1, n + 1)],
+        "Total": [100 + i * 0.37 for i in range(n)],
+        "endereço": "Rua A, 1",
+        "bairro": "Centro",
+        "cidade": "Piracicaba",
+        "CEP": "13400-000",
+        "mail": "servidor@exemplo.com",
+    })
+
+
+def medir(generate_document, df, modelo, datas):
+    inicio = time.perf_counter()
+    for _, row in df.iterrows():
+        generate_document(row, *datas, template_path=modelo)
+    return time.perf_counter() - inicio
+
+
+def textos(caminho):
+    return [p.text for p in Document(caminho).paragraphs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generate_document antigo x novo")
+    parser.add_argument("--cartas", type=int, default=500)
+    args = parser.parse_args()
+
+    email = unimed_final_v2.extract_info_from_pdf_content("Data 09/02/2026")
+    datas = (
+        email,
+        (18, "outubro", 2026, "18 de outubro de 2026"),
+        (30, "outubro", 2026, "30 de outubro de 2026"),
+    )
+    df = gerar_funcionarios(args.cartas)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        # os scripts gravam em ../output/cartas
+        trabalho = os.path.join(pasta, "gerar_cartas")
+        saida = os.path.join(pasta, "output", "cartas")
+        os.makedirs(trabalho)
+        os.makedirs(saida)
+        modelo = os.path.join(pasta, "template_base.docx")
+        gerar_modelo(modelo)
+
+        atual = os.getcwd()
+        os.chdir(trabalho)
+        try:
+            print(f"Gerando {args.cartas} cartas com o generate_document antigo...")
+            t_antigo = medir(generate_document_antigo, df, modelo, datas)
+            antigos = {f: textos(os.path.join(saida, f)) for f in os.listdir(saida)}
+
+            print(f"Gerando {args.cartas} cartas com o novo...")
+            t_novo = medir(unimed_final_v2.generate_document, df, modelo, datas)
+            novos = {f: textos(os.path.join(saida, f)) for f in os.listdir(saida)}
+        finally:
+            os.chdir(atual)
+
+    iguais = antigos == novos
+
+    print(f"{'versão':<10}{'tempo (s)':>12}{'ms/carta':>12}")
+    print(f"{'antigo':<10}{t_antigo:>12.2f}{t_antigo / args.cartas * 1000:>12.1f}")
+    print(f"{'novo':<10}{t_novo:>12.2f}{t_novo / args.cartas * 1000:>12.1f}")
+    print(f"ganho: {t_antigo / t_novo:.1f}x  |  texto do corpo igual: {iguais}")
+
+
+if __name__ == "__main__":
+    main()
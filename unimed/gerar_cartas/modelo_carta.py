@@ -0,0 +1,181 @@
+import copy
+import re
+from functools import lru_cache
+
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.ns import qn
+
+
+# =========================
+# CACHE DE MODELOS DOCX
+# =========================
+# Cada template é aberto (unzip + parse) uma vez por processo. Cada carta
+# recebe uma cópia do XML original do corpo, dos cabeçalhos e dos
+# rodapés; o resto do pacote (estilos, imagens, numeração) é o mesmo.
+# A posição de cada campo [...] é calculada uma vez no XML original.
+PADRAO_CAMPO = re.compile(r"\[[^\[\]]+\]")
+
+PARAGRAFO = qn("w:p")
+RUN = qn("w:r")
+TEXTO = qn("w:t")
+ESPACO_XML = "{http://www.w3.org/XML/1998/namespace}space"
+
+
+def _proprios(elemento, tag, limite):
+    """
+    Descendentes `tag` de `elemento` que não estão dentro de outro
+    `limite` aninhado: os runs de um parágrafo passam por w:hyperlink e
+    w:smartTag mas não entram nos parágrafos de uma caixa de texto.
+    """
+    for filho in elemento.iter(tag):
+        pai = filho.getparent()
+        while pai is not elemento and pai.tag != limite:
+            pai = pai.getparent()
+        if pai is elemento:
+            yield filho
+
+
+def runs_paragrafo(paragrafo):
+    return list(_proprios(paragrafo, RUN, PARAGRAFO))
+
+
+def textos_run(run):
+    # mesma travessia para ler e para escrever
+    return list(_proprios(run, TEXTO, RUN))
+
+
+def texto_run(run):
+    return "".join(t.text or "" for t in textos_run(run))
+
+
+def localizar_campos(paragrafo):
+    """
+    Campos [...] de um parágrafo (elemento w:p), com o run onde cada um
+    começa e termina: [(campo, run inicial, posição, run final, posição)].
+    Um campo pode estar quebrado em vários runs.
+    """
+    runs = runs_paragrafo(paragrafo)
+    textos = [texto_run(r) for r in runs]
+
+    # posição de cada caractere do parágrafo -> (run, posição no run)
+    posicoes = [(i, j) for i, texto in enumerate(textos) for j in range(len(texto))]
+
+    campos = []
+    for m in PADRAO_CAMPO.finditer("".join(textos)):
+        run_inicio, pos_inicio = posicoes[m.start()]
+        run_fim, pos_fim = posicoes[m.end() - 1]
+        campos.append((m.group(), run_inicio, pos_inicio, run_fim, pos_fim + 1))
+
+    return campos
+
+
+def mapear_campos(elemento):
+    """
+    {índice do parágrafo em elemento.iter(w:p): campos}, só dos
+    parágrafos que têm algum campo.
+    """
+    mapa = {}
+    for i, paragrafo in enumerate(elemento.iter(PARAGRAFO)):
+        campos = localizar_campos(paragrafo)
+        if campos:
+            mapa[i] = campos
+    return mapa
+
+
+class ModeloCarta:
+    """
+    Template aberto uma vez. `novo_documento()` devolve o documento com
+    o XML original restaurado; ele vale até a próxima chamada (o pacote
+    é reaproveitado).
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.documento = Document(caminho)
+
+        parte = self.documento.part
+        self.partes = [parte] + [
+            rel.target_part
+            for rel in parte.rels.values()
+            if rel.reltype in (RT.HEADER, RT.FOOTER)
+        ]
+
+        self.originais = [copy.deepcopy(p._element) for p in self.partes]
+        self.campos = [mapear_campos(original) for original in self.originais]
+
+    def novo_documento(self):
+        for parte, original in zip(self.partes, self.originais):
+            parte._element = copy.deepcopy(original)
+        return self.partes[0].document
+
+    def paragrafos_com_campos(self):
+        """
+        (elemento w:p, campos) de cada parágrafo com campo no documento
+        atual: corpo (inclusive tabelas), cabeçalhos e rodapés.
+        """
+        for parte, mapa in zip(self.partes, self.campos):
+            if not mapa:
+                continue
+            paragrafos = list(parte._element.iter(PARAGRAFO))
+            for i, campos in mapa.items():
+                yield paragrafos[i], campos
+
+
+# =========================
+# RENDERIZAÇÃO
+# =========================
+def definir_texto_run(run, texto):
+    # o texto todo vai para o primeiro w:t; quebras e tabulações ficam
+    nos = textos_run(run)
+    if not nos:
+        return
+
+    nos[0].text = texto
+    nos[0].set(ESPACO_XML, "preserve")
+    for no in nos[1:]:
+        no.text = ""
+
+
+def substituir_campos(paragrafo, campos, valores):
+    """
+    Troca os `campos` (posições de localizar_campos) pelos `valores`,
+    mexendo só nos runs de cada campo. O valor fica com a formatação do
+    run onde o campo começa; campos sem valor ficam como estão.
+    """
+    runs = runs_paragrafo(paragrafo)
+
+    # de trás para frente: as posições dos campos anteriores continuam valendo
+    for campo, run_inicio, pos_inicio, run_fim, pos_fim in reversed(campos):
+        if campo not in valores:
+            continue
+
+        valor = str(valores[campo])
+        inicio = texto_run(runs[run_inicio])
+
+        if run_inicio == run_fim:
+            definir_texto_run(runs[run_inicio], inicio[:pos_inicio] + valor + inicio[pos_fim:])
+            continue
+
+        definir_texto_run(runs[run_inicio], inicio[:pos_inicio] + valor)
+        for run in runs[run_inicio + 1:run_fim]:
+            definir_texto_run(run, "")
+        definir_texto_run(runs[run_fim], texto_run(runs[run_fim])[pos_fim:])
+
+
+def renderizar(modelo, valores, tratar_paragrafo=None):
+    """
+    Preenche o documento atual do `modelo` (corpo, tabelas, cabeçalhos e
+    rodapés). `tratar_paragrafo(p)` pode resolver sozinho um parágrafo
+    especial e devolver True para que ele seja pulado.
+    """
+    for paragrafo, campos in modelo.paragrafos_com_campos():
+        if tratar_paragrafo is not None and tratar_paragrafo(paragrafo):
+            continue
+        substituir_campos(paragrafo, campos, valores)
+
+
+@lru_cache(maxsize=None)
+def carregar_modelo(caminho):
+    # um por processo e por template
+    return ModeloCarta(caminho)
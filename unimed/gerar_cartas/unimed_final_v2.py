@@ -1,15 +1,26 @@
 import pandas as pd
-from docx import Document
-from docx.shared import Inches, Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Pt
+from docx.text.paragraph import Paragraph
 import re
 import os
-import PyPDF2
 from num2words import num2words
 from datetime import datetime
 import calendar
+import sys
+import time
+import argparse
+import hashlib
+import json
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from comum.leitor_ods import ler_ods
+from comum.leitor_pdf import abrir, motor_para
+from modelo_carta import carregar_modelo, renderizar
+
 # Mapeamento de meses para português
 meses_portugues = {
     1: 'janeiro', 2: 'fevereiro', 3: 'março', 4: 'abril',
@@ -17,21 +28,114 @@ meses_portugues = {
     9: 'setembro', 10: 'outubro', 11: 'novembro', 12: 'dezembro'
 }
 
-def extrair_nome_pdf(pdf):
-    nome = os.path.splitext(pdf)[0]  # remove .pdf
-    nome = nome.split(" - ")[0]      # pega só antes do "-"
-    return normalize_name_for_comparison(nome)
+def tokens_nome(nome):
+    # palavras do nome já normalizadas ("João da Silva" -> ["joao", "da", "silva"])
+    return [t for t in (normalize_name_for_comparison(p) for p in re.split(r'[\s_.-]+', str(nome))) if t]
+
+
+def indexar_planilha(df):
+    """
+    Normaliza cada nome da planilha uma vez só e monta os índices:
+    nome normalizado -> funcionais, palavra -> nomes que a contêm e
+    primeira palavra -> nomes.
+    """
+    exatos = {}
+    por_palavra = {}
+    por_primeira = {}
+
+    for nome, nro_funcional in zip(df['Funcionário'], df['Nro Funcional']):
+        tokens = tokens_nome(nome) if pd.notna(nome) else []
+        if not tokens:
+            continue
+
+        normalizado = ''.join(tokens)
+        if normalizado not in exatos:
+            exatos[normalizado] = []
+            for token in set(tokens):
+                por_palavra.setdefault(token, set()).add(normalizado)
+            por_primeira.setdefault(tokens[0], set()).add(normalizado)
+        exatos[normalizado].append(nro_funcional)
+
+    # a mesma funcional repetida em várias linhas da planilha conta uma vez
+    exatos = {nome: list(dict.fromkeys(funcionais)) for nome, funcionais in exatos.items()}
+
+    return exatos, por_palavra, por_primeira
+
+
+def localizar_nome(tokens_pdf, indice):
+    """
+    Nomes da planilha que batem com o nome do PDF: o igual, se houver;
+    senão os que contêm o nome do PDF ou estão contidos nele (a partir
+    do começo de uma palavra).
+    """
+    exatos, por_palavra, por_primeira = indice
+    nome_pdf = ''.join(tokens_pdf)
+
+    if nome_pdf in exatos:
+        return [nome_pdf]
+
+    # nome da planilha contido no do PDF: começa por alguma palavra do PDF
+    candidatos = set()
+    for token in tokens_pdf:
+        candidatos |= por_primeira.get(token, set())
+
+    # nome do PDF contido no da planilha: tem a palavra mais rara do PDF.
+    # A primeira e a última podem estar cortadas (só parte da palavra):
+    # usa as do meio e, só sem nenhuma delas na planilha, as outras.
+    conhecidos = [t for t in tokens_pdf[1:-1] if t in por_palavra]
+    conhecidos = conhecidos or [t for t in tokens_pdf if t in por_palavra]
+    if conhecidos:
+        rara = min(conhecidos, key=lambda t: len(por_palavra[t]))
+        candidatos |= por_palavra[rara]
+
+    return sorted(c for c in candidatos if c in nome_pdf or nome_pdf in c)
+
+
+def mapear_pdfs(pdf_files, df):
+    """
+    Devolve (pdf_map, sem_par, ambiguos): funcional -> PDF, PDFs sem
+    funcionário e {PDF ou funcional: candidatos} para os casos com mais
+    de uma possibilidade, que ficam fora do mapa.
+    """
+    indice = indexar_planilha(df)
+
+    pdfs_por_funcional = {}
+    sem_par = []
+    ambiguos = {}
+
+    for pdf in sorted(pdf_files):
+        tokens_pdf = tokens_nome(os.path.splitext(pdf)[0].split(" - ")[0])
+        nomes = localizar_nome(tokens_pdf, indice) if tokens_pdf else []
+
+        if not nomes:
+            sem_par.append(pdf)
+            continue
+        if len(nomes) > 1:
+            ambiguos[pdf] = nomes
+            continue
+
+        for nro_funcional in indice[0][nomes[0]]:
+            pdfs_por_funcional.setdefault(nro_funcional, []).append(pdf)
+
+    pdf_map = {}
+    for nro_funcional, pdfs in pdfs_por_funcional.items():
+        if len(pdfs) == 1:
+            pdf_map[nro_funcional] = pdfs[0]
+        else:
+            ambiguos[nro_funcional] = pdfs
+
+    return pdf_map, sem_par, ambiguos
+
+
+def imprimir_relatorio_pdfs(pdf_map, sem_par, ambiguos):
+    print(f"{len(pdf_map)} funcionários com PDF")
+
+    for pdf in sem_par:
+        print(f"⚠ PDF sem funcionário na planilha: {pdf}")
+
+    for chave, candidatos in ambiguos.items():
+        print(f"⚠ mais de uma possibilidade para {chave} (ignorado): {', '.join(map(str, candidatos))}")
 
-def extract_text_from_pdf(pdf_path):
-    text = ''
-    try:
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            for page_num in range(len(reader.pages)):
-                text += reader.pages[page_num].extract_text()
-    except Exception as e:
-        print(f"Erro ao extrair texto do PDF {pdf_path}: {e}")
-    return text
 
 def extract_info_from_pdf_content(pdf_content):
     """
@@ -76,6 +180,109 @@ def extract_info_from_pdf_content(pdf_content):
     )
 
 
+# =========================
+# DATA DO E-MAIL NOS PDFS
+# =========================
+# Só interessa a primeira "Data dd/mm/aaaa": lê página a página e para
+# nela. O resultado fica em cache pelo hash do arquivo, então o lote do
+# mês seguinte não relê os PDFs que já passaram. A chave leva também o
+# motor de leitura e VERSAO_DATAS_EMAIL: um "sem data" de um motor ou de
+# uma versão antiga da busca não vale para outro.
+PADRAO_DATA_EMAIL = re.compile(r'Data\s+(\d{2}/\d{2}/\d{4})')
+CACHE_DATAS_EMAIL = os.environ.get(
+    'UNIMED_CACHE_DATAS',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache_datas_email.json')
+)
+VERSAO_DATAS_EMAIL = 2
+
+
+def hash_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def motor_emails():
+    # motor calibrado com: python comum/leitor_pdf.py <pdf> --tipo email
+    return motor_para('email', padrao='pypdf2')
+
+
+def buscar_data_email(pdf_path, motor=None):
+    """
+    Primeira data "dd/mm/aaaa" depois de "Data" no PDF, ou None.
+    Devolve (data, erro) para o erro voltar do processo filho.
+    """
+    try:
+        with abrir(pdf_path, motor or motor_emails()) as paginas:
+            for pagina in paginas:
+                match = PADRAO_DATA_EMAIL.search(pagina.extract_text() or '')
+                if match:
+                    return match.group(1), None
+        return None, None
+    except Exception as e:
+        return None, f'{type(e).__name__}: {e}'
+
+
+def carregar_cache_datas(caminho=CACHE_DATAS_EMAIL):
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def gravar_cache_datas(datas, caminho=CACHE_DATAS_EMAIL):
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(datas, f, indent=0)
+    os.replace(temporario, caminho)
+
+
+def datas_emails(pdf_paths, workers=1, cache=CACHE_DATAS_EMAIL):
+    """
+    {pdf: email_date_info} do lote inteiro. Só os PDFs que não estão no
+    cache (versão:motor:hash do arquivo -> data) são lidos, em paralelo
+    se workers > 1.
+    """
+    motor = motor_emails()
+    prefixo = f'{VERSAO_DATAS_EMAIL}:'
+
+    # entradas de versões anteriores da busca não servem mais
+    salvos = {k: v for k, v in carregar_cache_datas(cache).items() if k.startswith(prefixo)}
+    hashes = {pdf: f'{prefixo}{motor}:{hash_arquivo(pdf)}' for pdf in pdf_paths}
+
+    # arquivos iguais com nomes diferentes são lidos uma vez só
+    pendentes = {}
+    for pdf, h in hashes.items():
+        if h not in salvos:
+            pendentes.setdefault(h, pdf)
+
+    if pendentes:
+        caminhos = list(pendentes.values())
+        if workers <= 1:
+            encontrados = [buscar_data_email(pdf, motor) for pdf in caminhos]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                encontrados = list(executor.map(buscar_data_email, caminhos, [motor] * len(caminhos)))
+
+        for h, pdf, (data, erro) in zip(pendentes, caminhos, encontrados):
+            if erro:
+                # não vai para o cache: tenta de novo na próxima execução
+                print(f"Erro ao extrair texto do PDF {pdf}: {erro}")
+                continue
+            salvos[h] = data
+
+        gravar_cache_datas(salvos, cache)
+
+    print(f"{len(hashes)} PDFs de e-mail: {len(hashes) - len(pendentes)} do cache, {len(pendentes)} lidos")
+
+    return {
+        pdf: extract_info_from_pdf_content(f'Data {salvos[h]}' if salvos.get(h) else '')
+        for pdf, h in hashes.items()
+    }
+
+
 def number_to_currency_text_extended(number):
     try:
         inteiro = int(number)
@@ -107,54 +314,6 @@ def normalize_name_for_comparison(name):
 def capitalize_name(name):
     return ' '.join([word.capitalize() for word in name.lower().split()])
 
-def replace_text_in_paragraph(paragraph, key, value):
-    """
-    Substitui uma chave (placeholder) por um valor em um parágrafo do python-docx,
-    preservando formatação mesmo que o placeholder não esteja em um run específico.
-    """
-
-    if key not in paragraph.text:
-        return  # nada a substituir
-
-    # Tenta substituir apenas dentro do run que contém o placeholder
-    for run in paragraph.runs:
-        if key in run.text:
-            run.text = run.text.replace(key, str(value))
-            return  # terminou com sucesso
-
-    # Se chegou aqui, o placeholder não estava dentro de um run específico.
-    # Vamos então substituir o texto inteiro, mas mantendo a formatação base.
-    new_text = paragraph.text.replace(key, str(value))
-
-    # Salva formatação base do primeiro run (se existir)
-    if paragraph.runs:
-        base_run = paragraph.runs[0]
-        base_font_name = base_run.font.name
-        base_font_size = base_run.font.size
-        base_bold = base_run.bold
-        base_italic = base_run.italic
-    else:
-        base_font_name = None
-        base_font_size = None
-        base_bold = None
-        base_italic = None
-
-    # Limpa o conteúdo anterior do parágrafo
-    paragraph.clear()
-
-    # Cria novo run com o texto substituído
-    new_run = paragraph.add_run(new_text)
-
-    # Aplica a formatação base (quando existir)
-    if base_font_name:
-        new_run.font.name = base_font_name
-    if base_font_size:
-        new_run.font.size = base_font_size
-    if base_bold is not None:
-        new_run.bold = base_bold
-    if base_italic is not None:
-        new_run.italic = base_italic
-
 def replace_paragraph_text_preserve_style(paragraph, new_text):
     """
     Substitui todo o texto do parágrafo por new_text preservando
@@ -202,8 +361,11 @@ def replace_paragraph_text_preserve_style(paragraph, new_text):
 
 
 
-def generate_document(data_row, email_date_info, current_date_info, due_date_info, template_path='template_base.docx'):
-    document = Document(template_path)
+def generate_document(data_row, email_date_info, current_date_info, due_date_info, template_path='template_base.docx',
+                      output_path=None):
+    # template aberto uma vez só; aqui só copia o XML original
+    modelo = carregar_modelo(template_path)
+    document = modelo.novo_documento()
 
     nro_funcional = data_row['Nro Funcional']
     funcionario_raw = data_row['Funcionário']
@@ -255,8 +417,12 @@ def generate_document(data_row, email_date_info, current_date_info, due_date_inf
         '[CEP do servidor]': cep,
     }
 
-    for paragraph in document.paragraphs:
-        if 'Ilmo(a) Senhor(a):' in paragraph.text and '[nome do servidor]' in paragraph.text:
+    def tratar_paragrafo(p):
+        # parágrafos que não são só troca de campo
+        paragraph = Paragraph(p, document)
+        texto = paragraph.text
+
+        if 'Ilmo(a) Senhor(a):' in texto and '[nome do servidor]' in texto:
             paragraph.clear()
             run_prefix = paragraph.add_run('Ilmo(a) Senhor(a):\n')
             run_prefix.bold = False
@@ -264,45 +430,157 @@ def generate_document(data_row, email_date_info, current_date_info, due_date_inf
             run_name.bold = False
             run_name.font.size = Pt(12)
             run_name.font.name = 'Calibri'
-            continue
+            return True
 
-        if 'Informamos que notificação semelhante foi enviada ao email cadastrado no sistema ([r-mail]), em' in paragraph.text:
-            novo_texto = paragraph.text.replace('[r-mail]', email_address_from_excel)
+        if 'Informamos que notificação semelhante foi enviada ao email cadastrado no sistema ([r-mail]), em' in texto:
+            novo_texto = texto.replace('[r-mail]', email_address_from_excel)
             novo_texto = re.sub(
                 r'em .*?\.',
                 f'em {email_date_formatted}.',
                 novo_texto
             )
             replace_paragraph_text_preserve_style(paragraph, novo_texto)
-            continue
-            
-            
-            # Encontrar a posição do placeholder do email e da data
-            email_placeholder = '[r-mail]'
-            date_placeholder = 'em 20 de [mês atual] de [ano atual].'
+            return True
+
+        return False
+
+    # uma passada pelos campos já localizados no template e um save só
+    renderizar(modelo, replacements, tratar_paragrafo)
+
+    if output_path is None:
+        output_path = os.path.join('../output/cartas', f'{funcionario_raw}.docx')
+
+    document.save(output_path)
+
+
+# =========================
+# GERAÇÃO EM LOTE (SERIAL OU EM PROCESSOS)
+# =========================
+SEM_DATA_EMAIL = ('dia de mês de ano', '', 'mês', 'dia', 'ano', 'dia de mês de ano')
+
+
+def nomes_arquivos(df):
+    """
+    Nome do .docx de cada linha. Nomes repetidos na planilha ganham o
+    número funcional (e um contador, se ainda repetir), na ordem da
+    planilha, para uma carta não sobrescrever a outra.
+    """
+    base = [re.sub(r'[\\/:*?"<>|]', '_', str(nome)).strip() for nome in df['Funcionário']]
+    repetidos = {nome for nome, n in Counter(base).items() if n > 1}
+
+    usados = set()
+    nomes = []
+    for nome, nro_funcional in zip(base, df['Nro Funcional']):
+        if nome in repetidos:
+            nome = f'{nome} - {nro_funcional}'
+
+        candidato, n = nome, 2
+        while candidato.lower() in usados:
+            candidato = f'{nome} ({n})'
+            n += 1
+
+        usados.add(candidato.lower())
+        nomes.append(f'{candidato}.docx')
+
+    return nomes
+
+
+def montar_tarefas(df, pdf_map, pdf_directory, output_directory, current_date_info, due_date_info, email_dates):
+    tarefas = []
+
+    if 'condição' in df:
+        condicoes = df['condição'].fillna('').astype(str).str.strip().str.lower()
+    else:
+        condicoes = pd.Series('', index=df.index)
+
+    # aviso/cancelado não geram carta: ficam fora antes de escolher os
+    # nomes dos arquivos, para não contarem como nome repetido
+    gerar = ~condicoes.isin({'aviso', 'cancelado'})
+    df, condicoes = df[gerar], condicoes[gerar]
+
+    for (_, row), condicao, arquivo in zip(df.iterrows(), condicoes, nomes_arquivos(df)):
+        nro_funcional = row['Nro Funcional']
+
+        if condicao == 'desligado':
+            template_escolhido = '../template/template_desligado.docx'
+        else:
+            template_escolhido = '../template/template_base.docx'
+
+        if nro_funcional in pdf_map:
+            email_date_info = email_dates[os.path.join(pdf_directory, pdf_map[nro_funcional])]
+        else:
+            email_date_info = SEM_DATA_EMAIL
+
+        tarefas.append((
+            row, email_date_info, template_escolhido,
+            os.path.join(output_directory, arquivo),
+            current_date_info, due_date_info,
+        ))
+
+    return tarefas
 
-            # Dividir o texto do parágrafo em partes antes, durante e depois dos placeholders
-            parts = re.split(f'({re.escape(email_placeholder)}|{re.escape(date_placeholder)})', temp_text)
-            
-            for part in parts:
-                if part == email_placeholder:
-                    new_runs.append(email_address_from_excel)
-                elif part == date_placeholder:
-                    new_runs.append(f'em {email_date_formatted}.')
-                else:
-                    new_runs.append(part)
 
-        for key, value in replacements.items():
-            if key in paragraph.text:
-                replace_text_in_paragraph(paragraph, key, value,)
+def gerar_carta(tarefa):
+    """
+    Uma carta; roda no processo do pool (cada processo tem o próprio
+    cache de templates). Devolve (funcional, arquivo, pid, segundos, erro).
+    """
+    row, email_date_info, template_path, output_path, current_date_info, due_date_info = tarefa
+    inicio = time.perf_counter()
+
+    try:
+        generate_document(
+            row,
+            email_date_info,
+            current_date_info,
+            due_date_info,
+            template_path=template_path,
+            output_path=output_path
+        )
+        erro = None
+    except Exception as e:
+        erro = f'{type(e).__name__}: {e}'
+
+    return row['Nro Funcional'], os.path.basename(output_path), os.getpid(), time.perf_counter() - inicio, erro
+
+
+def gerar_cartas(tarefas, workers=1):
+    if workers <= 1:
+        return [gerar_carta(tarefa) for tarefa in tarefas]
+
+    # blocos de cartas por processo: menos ida e volta entre processos
+    blocos = max(1, len(tarefas) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(gerar_carta, tarefas, chunksize=blocos))
 
-        output_filename = f'{funcionario_raw}.docx'
-        output_path = os.path.join('../output/cartas', output_filename)
 
-        document.save(output_path)
+def imprimir_resumo(resultados, tempo_total):
+    por_processo = {}
+    for _, _, pid, segundos, erro in resultados:
+        resumo = por_processo.setdefault(pid, {'cartas': 0, 'segundos': 0.0, 'erros': 0})
+        resumo['cartas'] += 1
+        resumo['segundos'] += segundos
+        resumo['erros'] += erro is not None
+
+    print(f"\n{'processo':<10}{'cartas':>8}{'erros':>8}{'tempo (s)':>12}{'ms/carta':>10}")
+    for pid, resumo in sorted(por_processo.items()):
+        ms = resumo['segundos'] / resumo['cartas'] * 1000
+        print(f"{pid:<10}{resumo['cartas']:>8}{resumo['erros']:>8}{resumo['segundos']:>12.2f}{ms:>10.1f}")
+
+    erros = [(funcional, arquivo, erro) for funcional, arquivo, _, _, erro in resultados if erro]
+    for funcional, arquivo, erro in erros:
+        print(f"⚠ {funcional} ({arquivo}): {erro}")
+
+    print(f"\n{len(resultados) - len(erros)} cartas geradas, {len(erros)} com erro, em {tempo_total:.1f}s")
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera as cartas da Unimed')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='processos em paralelo (0 = todos os núcleos)')
+    args = parser.parse_args()
+    workers = args.workers if args.workers > 0 else os.cpu_count() or 1
+
     output_directory = '../output/cartas'
 
     if not os.path.exists(output_directory):
@@ -329,49 +607,20 @@ if __name__ == '__main__':
     due_date_formatted = f'{due_day} de {due_month_portugues} de {due_year}'
     due_date_info = (due_day, due_month_portugues, due_year, due_date_formatted)
 
-    df = pd.read_excel(ods_path, engine='odf')
+    df = ler_ods(ods_path)
 
     pdf_files = [f for f in os.listdir(pdf_directory) if f.endswith('.pdf')]
 
-    pdf_map = {}
-
-    for pdf in pdf_files:
-        nome_pdf_normalizado = extrair_nome_pdf(pdf)
-
-        for _, row in df.iterrows():
-            nome_planilha = normalize_name_for_comparison(row['Funcionário'])
-            nro_funcional = row['Nro Funcional']
-
-            if nome_planilha in nome_pdf_normalizado or nome_pdf_normalizado in nome_planilha:
-                pdf_map[nro_funcional] = pdf
-
-    # 🔥 AGORA SIM: loop dentro do escopo correto
-    for index, row in df.iterrows():
-        nro_funcional = row['Nro Funcional']
-
-        condicao = ''
-        if 'condição' in row and pd.notna(row['condição']):
-            condicao = str(row['condição']).strip().lower()
-
-        if condicao in {'aviso', 'cancelado'}:
-            continue
+    pdf_map, sem_par, ambiguos = mapear_pdfs(pdf_files, df)
+    imprimir_relatorio_pdfs(pdf_map, sem_par, ambiguos)
 
-        elif condicao == 'desligado':
-            template_escolhido = '../template/template_desligado.docx'
-        else:
-            template_escolhido = '../template/template_base.docx'
+    pdf_paths = [os.path.join(pdf_directory, pdf) for pdf in sorted(set(pdf_map.values()))]
+    email_dates = datas_emails(pdf_paths, workers)
 
-        if nro_funcional in pdf_map:
-            current_pdf_path = os.path.join(pdf_directory, pdf_map[nro_funcional])
-            pdf_content = extract_text_from_pdf(current_pdf_path)
-            email_date_info = extract_info_from_pdf_content(pdf_content)
-        else:
-            email_date_info = ('dia de mês de ano', '', 'mês', 'dia', 'ano', 'dia de mês de ano')
+    tarefas = montar_tarefas(
+        df, pdf_map, pdf_directory, output_directory, current_date_info, due_date_info, email_dates
+    )
 
-        generate_document(
-            row,
-            email_date_info,
-            current_date_info,
-            due_date_info,
-            template_path=template_escolhido
-        )
+    inicio = time.perf_counter()
+    resultados = gerar_cartas(tarefas, workers)
+    imprimir_resumo(resultados, time.perf_counter() - inicio)